@@ -0,0 +1,108 @@
+# -----------------------------------------------------------------------------
+# File Name   : Benchmark/ContentFilterBench.py
+# Description : Micro-benchmark of the content filter: per-message cost of
+#               ContentMatcher versus a naive per-pattern scan as a guild's
+#               blocklist grows from 10 to 100,000 entries (split evenly
+#               between domains, invite codes and keywords). The matcher
+#               should stay flat while the naive scan grows linearly.
+#
+#               It then times max-length hostile messages (punctuation-only
+#               runs that make a backtracking link regex retry from every
+#               position) against a max-length ordinary one. Matching must
+#               stay linear in the message length, so they should cost about
+#               the same; anything over HOSTILE_LIMIT times the baseline is
+#               flagged.
+#
+# Author      : X
+# Created On  : 17/10/2026
+# Last Updated: 17/10/2026
+# Import Style: python -m Benchmark.ContentFilterBench
+# -----------------------------------------------------------------------------
+import random
+import time
+
+from RealTimeProtection.ContentMatcher import ContentMatcher, MAX_SCAN_CHARS
+
+MESSAGES = [
+    "hey everyone, raid boss tonight at 9, who's in?",
+    "check this out https://cdn.example.org/clip/12345 lol",
+    "join my server discord.gg/abcDEF12 we have giveaways",
+    "lorem ipsum dolor sit amet consectetur adipiscing elit " * 6,
+    "free stuff at https://www.totally-legit-site.net/claim?user=me and discord.com/invite/xyz",
+]
+
+HOSTILE_LIMIT = 5
+HOSTILE_MESSAGES = {
+    "commas": "," * MAX_SCAN_CHARS,
+    "a,": "a," * (MAX_SCAN_CHARS // 2),
+    "!a": "!a" * (MAX_SCAN_CHARS // 2),
+    "+a": "+a" * (MAX_SCAN_CHARS // 2),
+    "a@": "a@" * (MAX_SCAN_CHARS // 2),
+    "a.": "a." * (MAX_SCAN_CHARS // 2),
+    "x:/": "x:/" * (MAX_SCAN_CHARS // 3),
+}
+
+
+def _word(rng, length):
+    return "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(length))
+
+
+def blocklist(size: int, seed: int = 7):
+    rng = random.Random(seed)
+    third = size // 3
+    domains = [f"{_word(rng, 9)}.{rng.choice(('com', 'net', 'xyz', 'ru'))}" for _ in range(third)]
+    invites = [_word(rng, 8) for _ in range(third)]
+    keywords = [f"{_word(rng, 6)} {_word(rng, 7)}" for _ in range(size - 2 * third)]
+    return domains, invites, keywords
+
+
+def naive_match(domains, invites, keywords, content):
+    text = content.casefold()
+    for pattern in (*domains, *invites, *keywords):
+        if pattern in text:
+            return pattern
+    return None
+
+
+def bench(fn, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for message in MESSAGES:
+            fn(message)
+    return (time.perf_counter() - start) / (repeat * len(MESSAGES)) * 1e6
+
+
+def per_call(fn, content: str, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(content)
+    return (time.perf_counter() - start) / repeat * 1e3
+
+
+def main():
+    print(f"{'entries':>8} {'build ms':>9} {'matcher us/msg':>15} {'naive us/msg':>13}")
+    for size in (10, 1_000, 10_000, 100_000):
+        domains, invites, keywords = blocklist(size)
+        start = time.perf_counter()
+        matcher = ContentMatcher(domains, invites, keywords)
+        build = (time.perf_counter() - start) * 1e3
+        fast = bench(matcher.match, 2000)
+        slow = bench(lambda m: naive_match(domains, invites, keywords, m), max(1, 20_000 // size))
+        print(f"{size:>8} {build:>9.1f} {fast:>15.1f} {slow:>13.1f}")
+
+    matcher = ContentMatcher(*blocklist(1_000))
+    baseline = per_call(matcher.match, MESSAGES[3] * (MAX_SCAN_CHARS // len(MESSAGES[3]) + 1), 50)
+    print(f"\n{'hostile input':<14} {'ms/msg':>8} {'x baseline':>10}   (baseline: {baseline:.2f} ms, "
+          f"{MAX_SCAN_CHARS}-char prose)")
+    for name, content in HOSTILE_MESSAGES.items():
+        cost = per_call(matcher.match, content, 20)
+        flag = "  SLOW" if cost > baseline * HOSTILE_LIMIT else ""
+        print(f"{name:<14} {cost:>8.2f} {cost / baseline:>10.1f}{flag}")
+
+
+if __name__ == "__main__":
+    main()
+
+# -----------------------------------------------------------------------------
+# End of File: ContentFilterBench.py
+# -----------------------------------------------------------------------------
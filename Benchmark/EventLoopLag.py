@@ -0,0 +1,128 @@
+# -----------------------------------------------------------------------------
+# File Name   : Benchmark/EventLoopLag.py
+# Description : Measures event-loop lag while a sustained spam burst is written
+#               to SQLite, once with the old inline (blocking) writes and once
+#               through the AsyncDatabase writer thread. Uses a throw-away
+#               database file so database.db is never touched.
+#
+# Author      : X
+# Created On  : 17/10/2026
+# Last Updated: 17/10/2026
+# Import Style: python -m Benchmark.EventLoopLag [--rate 200] [--seconds 5]
+# -----------------------------------------------------------------------------
+import argparse
+import asyncio
+import datetime
+import os
+import tempfile
+import time
+
+from Database.MySqlConnect import SQLiteConnectionPool, run_migrations
+from Database.AsyncDatabase import AsyncDatabase
+
+INSERT_EVENT = """
+    INSERT INTO security_events (guild_id, event_type, user_id, details, detected_at)
+    VALUES (?, ?, ?, ?, ?)
+"""
+UPSERT_SPAM = """
+    INSERT INTO anti_spam (guild_id, user_id, warnings, last_warning, timeout_until)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(guild_id, user_id) DO UPDATE SET
+        warnings=excluded.warnings,
+        last_warning=excluded.last_warning,
+        timeout_until=excluded.timeout_until
+"""
+
+
+def _params(i):
+    now = datetime.datetime.utcnow().isoformat()
+    event = (1, "spam_detected", str(i % 500), "4 messages in 10s", now)
+    spam = (1, i % 500, 1, now, None)
+    return event, spam
+
+
+def _sync_handler(pool):
+    """The pre-AsyncDatabase listener: INSERT + commit inline on the loop."""
+    async def handle(i):
+        event, spam = _params(i)
+        with pool.get_connection() as conn:
+            conn.execute(INSERT_EVENT, event)
+            conn.commit()
+        with pool.get_connection() as conn:
+            conn.execute(UPSERT_SPAM, spam)
+            conn.commit()
+    return handle
+
+
+def _async_handler(db):
+    async def handle(i):
+        event, spam = _params(i)
+        await db.execute(INSERT_EVENT, event)
+        await db.execute(UPSERT_SPAM, spam)
+    return handle
+
+
+async def _lag_probe(samples, stop, interval=0.005):
+    """Record how late each sleep(interval) wakes up."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(loop.time() - start - interval)
+
+
+async def _burst(handle, rate, seconds):
+    """Fire `rate` handler calls per second for `seconds`, like on_message would."""
+    tasks = []
+    total = rate * seconds
+    started = time.perf_counter()
+    for i in range(total):
+        tasks.append(asyncio.create_task(handle(i)))
+        target = started + (i + 1) / rate
+        await asyncio.sleep(max(0.0, target - time.perf_counter()))
+    await asyncio.gather(*tasks)
+    return total, time.perf_counter() - started
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def _run(name, handle, rate, seconds):
+    samples, stop = [], asyncio.Event()
+    probe = asyncio.create_task(_lag_probe(samples, stop))
+    total, elapsed = await _burst(handle, rate, seconds)
+    stop.set()
+    await probe
+    print(
+        f"{name:<8} events={total:<6} elapsed={elapsed:6.2f}s "
+        f"lag p50={_percentile(samples, 50) * 1000:7.2f}ms "
+        f"p99={_percentile(samples, 99) * 1000:7.2f}ms "
+        f"max={max(samples, default=0) * 1000:7.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event-loop lag under a spam burst")
+    parser.add_argument("--rate", type=int, default=200, help="spam events per second")
+    parser.add_argument("--seconds", type=int, default=5, help="burst duration")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = SQLiteConnectionPool(db_file=os.path.join(tmp, "bench.db"))
+        run_migrations(pool)
+        db = AsyncDatabase(pool)
+        asyncio.run(_run("sync", _sync_handler(pool), args.rate, args.seconds))
+        asyncio.run(_run("async", _async_handler(db), args.rate, args.seconds))
+        db.shutdown()
+
+
+if __name__ == "__main__":
+    main()
+
+# -----------------------------------------------------------------------------
+# End of File: EventLoopLag.py
+# -----------------------------------------------------------------------------
@@ -0,0 +1,220 @@
+# -----------------------------------------------------------------------------
+# File Name   : Benchmark/FakeDiscord.py
+# Description : Minimal offline stand-ins for the discord.py objects the cogs
+#               touch (guild, channels, roles, members) backed by a FakeHTTP
+#               layer that simulates request latency and per-route rate
+#               limits (raising a 429 with retry_after). Lets lockdown and
+#               moderation paths be benchmarked without a live gateway.
+#
+# Author      : X
+# Created On  : 17/10/2026
+# Last Updated: 17/10/2026
+# Import Style: from Benchmark.FakeDiscord import FakeHTTP, FakeGuild
+# -----------------------------------------------------------------------------
+import asyncio
+import itertools
+import time
+from collections import defaultdict
+
+_ids = itertools.count(10_000_000)
+
+
+class FakeRateLimited(Exception):
+    """Shaped like discord.HTTPException for a 429: has .status and .retry_after."""
+    status = 429
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"429 Too Many Requests (retry after {retry_after:.3f}s)")
+        self.retry_after = retry_after
+
+
+class FakeHTTP:
+    """Fake REST layer: fixed latency plus `rate` requests per `per` seconds per route."""
+
+    def __init__(self, latency: float = 0.02, rate: int = 50, per: float = 1.0):
+        self.latency = latency
+        self.rate = rate
+        self.per = per
+        self._windows = defaultdict(list)
+        self.calls = 0
+        self.rate_limited = 0
+        self.log = []   # (route, op, monotonic time) in completion order
+
+    async def request(self, route: str, op: str):
+        now = time.monotonic()
+        window = [t for t in self._windows[route] if t > now - self.per]
+        self._windows[route] = window
+        if len(window) >= self.rate:
+            self.rate_limited += 1
+            raise FakeRateLimited(window[0] + self.per - now)
+        window.append(now)
+        await asyncio.sleep(self.latency)
+        self.calls += 1
+        self.log.append((route, op, time.monotonic()))
+
+
+class FakePermissions:
+    def __init__(self, **values):
+        self.send_messages = values.get("send_messages", True)
+        self.add_reactions = values.get("add_reactions", True)
+        self.value = values.get("value", 0)
+
+
+class FakeOverwrite:
+    _BITS = {"send_messages": 1 << 11, "add_reactions": 1 << 6}
+
+    def __init__(self, **values):
+        self.send_messages = values.get("send_messages")
+        self.add_reactions = values.get("add_reactions")
+
+    def is_empty(self):
+        return self.send_messages is None and self.add_reactions is None
+
+    def pair(self):
+        allow = sum(bit for name, bit in self._BITS.items() if getattr(self, name) is True)
+        deny = sum(bit for name, bit in self._BITS.items() if getattr(self, name) is False)
+        return FakePermissions(value=allow), FakePermissions(value=deny)
+
+
+class FakeRole:
+    def __init__(self, guild, name: str, role_id: int = None):
+        self.guild = guild
+        self.id = role_id or next(_ids)
+        self.name = name
+        self.permissions = FakePermissions()
+
+    async def edit(self, permissions=None, reason=None):
+        await self.guild.http.request(f"guild:{self.guild.id}:roles", "role_edit")
+        if permissions is not None:
+            self.permissions = permissions
+
+
+class FakeTextChannel:
+    def __init__(self, guild, name: str):
+        self.guild = guild
+        self.id = next(_ids)
+        self.name = name
+        self.overwrites = {}
+        self.sent = []
+
+    def overwrites_for(self, target):
+        current = self.overwrites.get(target.id)
+        return FakeOverwrite(**vars(current)) if current else FakeOverwrite()
+
+    async def set_permissions(self, target, overwrite=None, reason=None):
+        await self.guild.http.request(f"channel:{self.id}:permissions", "set_permissions")
+        if overwrite is None:
+            self.overwrites.pop(target.id, None)
+        else:
+            self.overwrites[target.id] = overwrite
+
+    async def send(self, content=None, embed=None, embeds=None):
+        await self.guild.http.request(f"channel:{self.id}:messages", "send")
+        self.sent.append(embeds or [embed] if (embeds or embed) else content)
+
+
+class FakeUser:
+    def __init__(self, guild, name: str, bot: bool = False, created_at=None, avatar=None, joined_at=None,
+                 pending: bool = False):
+        self.guild = guild
+        self.id = next(_ids)
+        self.name = name
+        self.display_name = name
+        self.bot = bot
+        self.created_at = created_at
+        self.joined_at = joined_at
+        self.pending = pending
+        self.avatar = avatar
+        self.roles = []
+        self.timed_out_until = None
+        self.actions = 0        # moderation calls made against this member
+
+    @property
+    def mention(self):
+        return f"<@{self.id}>"
+
+    async def edit(self, timed_out_until=None, reason=None):
+        await self.guild.http.request(f"guild:{self.guild.id}:members", "member_edit")
+        self.actions += timed_out_until is not None
+        self.timed_out_until = timed_out_until
+
+    async def add_roles(self, *roles, reason=None):
+        await self.guild.http.request(f"guild:{self.guild.id}:members", "add_roles")
+        self.actions += 1
+        self.roles.extend(roles)
+
+    async def remove_roles(self, *roles, reason=None):
+        await self.guild.http.request(f"guild:{self.guild.id}:members", "remove_roles")
+        self.roles = [r for r in self.roles if r not in roles]
+
+    async def kick(self, reason=None):
+        await self.guild.http.request(f"guild:{self.guild.id}:kick", "kick")
+        self.actions += 1
+
+    async def ban(self, reason=None):
+        await self.guild.http.request(f"guild:{self.guild.id}:bans", "ban")
+        self.actions += 1
+
+
+class FakeMessage:
+    def __init__(self, guild, channel, author, content: str = "", mentions=(), role_mentions=(),
+                 mention_everyone: bool = False):
+        self.id = next(_ids)
+        self.guild = guild
+        self.channel = channel
+        self.author = author
+        self.content = content
+        self.mentions = list(mentions)
+        self.role_mentions = list(role_mentions)
+        self.mention_everyone = mention_everyone
+
+    async def delete(self):
+        await self.guild.http.request(f"channel:{self.channel.id}:messages", "delete")
+
+
+class FakeMe:
+    def __init__(self):
+        self.guild_permissions = FakePermissions()
+        self.guild_permissions.moderate_members = True
+
+
+class FakeGuild:
+    def __init__(self, http: FakeHTTP, channels: int = 10, guild_id: int = None):
+        self.http = http
+        self.id = guild_id or next(_ids)
+        self.default_role = FakeRole(self, "@everyone", role_id=self.id)
+        self.roles = [self.default_role]
+        self.text_channels = [FakeTextChannel(self, f"channel-{i}") for i in range(channels)]
+        self.members = {}
+        self.owner_id = None
+        self.me = FakeMe()
+
+    def get_channel(self, channel_id):
+        return next((c for c in self.text_channels if c.id == channel_id), None)
+
+    def get_member(self, member_id):
+        return self.members.get(member_id)
+
+    def add_member(self, name: str, **kwargs) -> FakeUser:
+        member = FakeUser(self, name, **kwargs)
+        self.members[member.id] = member
+        return member
+
+
+class FakeBot:
+    """Just enough of commands.Bot for the cogs: guild lookup and cog registry."""
+
+    def __init__(self, guilds=()):
+        self.guilds = {guild.id: guild for guild in guilds}
+        self.cogs = {}
+        self.user = None
+
+    def get_guild(self, guild_id):
+        return self.guilds.get(guild_id)
+
+    def get_cog(self, name):
+        return self.cogs.get(name)
+
+# -----------------------------------------------------------------------------
+# End of File: FakeDiscord.py
+# -----------------------------------------------------------------------------
@@ -0,0 +1,232 @@
+# -----------------------------------------------------------------------------
+# File Name   : Benchmark/FakeGateway.py
+# Description : Local end-to-end run of the sharded deployment without a
+#               Discord connection. Started normally it acts as the launcher:
+#               it points the pool at a scratch database and runs
+#               Sharding.Launcher with this same module as the worker command.
+#               Every worker then:
+#                 1. attaches to the coordinator (all its writes go there),
+#                 2. materialises FakeDiscord guilds for the guilds its shards
+#                    own (guild g gets snowflake g << 22, so it routes to
+#                    shard g % shards),
+#                 3. checks config propagation: worker 0 writes a setting for
+#                    a guild owned by another worker, whose mirror has to pick
+#                    it up through the coordinator's change relay,
+#                 4. replays its share of one deterministic event stream
+#                    (chatter, a few spammers, a join raid on guild 1) through
+#                    the real cogs and prints throughput and latencies.
+#               Afterwards the launcher prints the coordinator's per-worker
+#               write counts and row totals from the shared database.
+#
+# Author      : X
+# Created On  : 17/10/2026
+# Last Updated: 17/10/2026
+# Import Style: python -m Benchmark.FakeGateway --shards 8 --workers 4
+#               python -m Benchmark.FakeGateway --shards 16 --workers 4 --guilds 2000 --messages 200000
+# -----------------------------------------------------------------------------
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Launcher side: scratch database, inherited by the workers through the environment
+if "SECURITY_BOT_COORDINATOR" not in os.environ:
+    _TMP_DIR = tempfile.mkdtemp(prefix="security-bot-shards-")
+    os.environ["SECURITY_BOT_DB"] = os.path.join(_TMP_DIR, "shards.db")
+
+from Benchmark.FakeDiscord import FakeHTTP, FakeGuild, FakeMessage, FakeBot  # noqa: E402
+from Config.Config import set_config                                          # noqa: E402
+from Database.AsyncDatabase import db                                         # noqa: E402
+from Database.DatabaseHelper.BatchWriter import batch_writer                  # noqa: E402
+from Database.DatabaseHelper.Helper import load_mirrors, get_guild_setting    # noqa: E402
+from Database.DatabaseHelper.SpamStateStore import spam_state                 # noqa: E402
+from RealTimeProtection.ActionScheduler import action_scheduler               # noqa: E402
+from RealTimeProtection.AntiSpam import AntiSpamCog                           # noqa: E402
+from RealTimeProtection.RaidDetection import RaidDetectionCog                 # noqa: E402
+from Sharding.Coordinator import coordinator                                  # noqa: E402
+from Sharding.Launcher import Launcher                                        # noqa: E402
+from Sharding.ShardContext import shard_context, shard_for, shard_ranges      # noqa: E402
+
+PROBE_KEY = "shard_probe"        # scratch setting written by the propagation check
+PROBE_TIMEOUT = 10.0
+COUNTED_TABLES = ("security_events", "anti_spam", "raid_lockdowns", "guild_settings")
+
+
+# -------------------------
+# Event stream (identical in every worker)
+# -------------------------
+def guild_snowflake(index: int) -> int:
+    return index << 22
+
+
+def deployment_trace(guilds: int, messages: int, raid_joins: int, seed: int = 7):
+    """(type, guild snowflake, user) events for the whole deployment."""
+    rng = random.Random(seed)
+    spammers = max(1, guilds // 50)
+    events = []
+    for _ in range(messages):
+        if rng.random() < 0.2:
+            spammer = rng.randrange(spammers)
+            guild, user = spammer * 50 + 1, 1_000_000 + spammer
+        else:
+            guild, user = rng.randrange(1, guilds + 1), rng.randrange(100_000)
+        events.append(("message", guild_snowflake(guild), user))
+    step = max(1, messages // max(1, raid_joins))
+    for i in reversed(range(raid_joins)):
+        events.insert(min(len(events), i * step), ("join", guild_snowflake(1), 2_000_000 + i))
+    return events
+
+
+def owner_of(guild_id: int, shard_count: int, workers: int) -> int:
+    shard = shard_for(guild_id, shard_count)
+    return next(i for i, ids in enumerate(shard_ranges(shard_count, workers)) if shard in ids)
+
+
+# -------------------------
+# Worker
+# -------------------------
+async def check_propagation(workers: int, guilds: int) -> str:
+    """Worker 0 writes a setting for another worker's guild; that guild's owner waits for it."""
+    shard_count = shard_context.shard_count
+    probe = next((guild_snowflake(g) for g in range(1, guilds + 1)
+                  if owner_of(guild_snowflake(g), shard_count, workers) != 0), None)
+    if probe is None:
+        return "skipped (single worker)"
+    if shard_context.worker == 0:
+        deadline = time.monotonic() + PROBE_TIMEOUT
+        while len(coordinator.status()["workers"]) < workers and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        await set_config(probe, PROBE_KEY, repr(time.time()))
+        return f"wrote {PROBE_KEY} for guild {probe}"
+    if not shard_context.owns(probe):
+        return "not involved"
+    deadline = time.monotonic() + PROBE_TIMEOUT
+    while time.monotonic() < deadline:
+        sent = get_guild_setting(probe, PROBE_KEY)
+        if sent is not None:
+            return f"applied {(time.time() - float(sent)) * 1000:.1f} ms after worker 0 wrote it"
+        await asyncio.sleep(0.002)
+    return "TIMEOUT"
+
+
+def _percentile(ordered, pct):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run_worker(args):
+    load_mirrors()
+    http = FakeHTTP(latency=0.0, rate=10_000)
+    bot = FakeBot()
+    anti_spam = AntiSpamCog(bot)
+    raid = RaidDetectionCog(bot)
+    bot.cogs = {"AntiSpamCog": anti_spam, "RaidDetectionCog": raid}
+    await anti_spam.cog_load()
+    await raid.cog_load()
+    # Subscribe only after the mirrors are loaded: the probe can then only arrive as a change event
+    coordinator.start_events(asyncio.get_running_loop())
+    probe = await check_propagation(args.workers, args.guilds)
+
+    members = {}
+    latencies = {"message": [], "join": []}
+    events = [e for e in deployment_trace(args.guilds, args.messages, args.raid_joins) if shard_context.owns(e[1])]
+    writes_before = db.write_transactions
+    started = time.perf_counter()
+    for kind, guild_id, user in events:
+        guild = bot.guilds.get(guild_id)
+        if guild is None:
+            guild = bot.guilds[guild_id] = FakeGuild(http, channels=3, guild_id=guild_id)
+        member = members.get((guild_id, user))
+        if member is None:
+            member = members[(guild_id, user)] = guild.add_member(f"user{user}")
+        t0 = time.perf_counter()
+        if kind == "join":
+            await raid.on_member_join(member)
+        else:
+            message = FakeMessage(guild, guild.text_channels[0], member, "hello")
+            await anti_spam.on_message(message)
+            await raid.on_message(message)
+        latencies[kind].append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+
+    await spam_state.flush()
+    await action_scheduler.drain()
+    await batch_writer.stop()
+    await anti_spam.cog_unload()
+    await raid.cog_unload()
+
+    rate = len(events) / elapsed if elapsed else 0.0
+    lines = [f"[worker {shard_context.worker}] shards {list(shard_context.shard_ids)}: "
+             f"{len(bot.guilds)} guilds, {len(events)} events in {elapsed:.2f}s ({rate:,.0f}/s), "
+             f"{db.write_transactions - writes_before} write tx via coordinator, "
+             f"raids in {len(raid.locked_guilds)} guild(s)"]
+    for kind, values in latencies.items():
+        if values:
+            values.sort()
+            lines.append(f"[worker {shard_context.worker}]   {kind:<7} p50={_percentile(values, 50) * 1e6:7.1f}us "
+                         f"p99={_percentile(values, 99) * 1e6:7.1f}us")
+    lines.append(f"[worker {shard_context.worker}]   config probe: {probe}")
+    print("\n".join(lines), flush=True)
+
+
+def worker_main(args):
+    if not coordinator.connect_from_env(shard_context.worker):
+        sys.exit("FakeGateway worker started without a coordinator")
+    try:
+        asyncio.run(run_worker(args))
+    finally:
+        db.shutdown()
+        coordinator.close()
+
+
+# -------------------------
+# Launcher side
+# -------------------------
+def report_database(path: str):
+    conn = sqlite3.connect(path)
+    try:
+        for table in COUNTED_TABLES:
+            count = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            print(f"{table:<16}: {count} rows")
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the shard workers against a fake gateway")
+    parser.add_argument("--shards", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--guilds", type=int, default=400)
+    parser.add_argument("--messages", type=int, default=50_000, help="messages across the deployment")
+    parser.add_argument("--raid-joins", type=int, default=200, help="joins into guild 1")
+    args = parser.parse_args()
+
+    if "SECURITY_BOT_COORDINATOR" in os.environ:
+        worker_main(args)
+        return
+
+    state_dir = os.path.dirname(os.environ["SECURITY_BOT_DB"])
+    launcher = Launcher([sys.executable, "-m", "Benchmark.FakeGateway", *sys.argv[1:]],
+                        args.shards, args.workers, state_dir=state_dir, stagger=0, restart=False)
+    started = time.perf_counter()
+    launcher.run()
+    status = launcher.server.status()
+    print(f"\nall workers done in {time.perf_counter() - started:.2f}s")
+    print(f"coordinator     : {sum(status['writes'].values())} write tx "
+          f"({', '.join(f'w{w}={n}' for w, n in sorted(status['writes'].items()))}), "
+          f"{status['failed']} failed, {status['published']} change(s) relayed")
+    report_database(os.environ["SECURITY_BOT_DB"])
+    print(f"scratch dir     : {state_dir}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
+
+# -----------------------------------------------------------------------------
+# End of File: FakeGateway.py
+# -----------------------------------------------------------------------------
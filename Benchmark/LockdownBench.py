@@ -0,0 +1,78 @@
+# -----------------------------------------------------------------------------
+# File Name   : Benchmark/LockdownBench.py
+# Description : Offline lockdown latency: locks every text channel of a fake
+#               guild serially (the old RaidDetection loop) and through the
+#               ActionScheduler, while a ban is submitted mid-lockdown, and
+#               reports total time plus how long the ban waited.
+#
+# Author      : X
+# Created On  : 17/10/2026
+# Last Updated: 17/10/2026
+# Import Style: python -m Benchmark.LockdownBench [--channels 300] [--latency 0.05]
+# -----------------------------------------------------------------------------
+import argparse
+import asyncio
+import time
+
+from Benchmark.FakeDiscord import FakeHTTP, FakeGuild
+from RealTimeProtection.ActionScheduler import ActionScheduler, PRIORITY_BAN, PRIORITY_LOCKDOWN
+
+
+def _overwrite(channel, role):
+    overwrite = channel.overwrites_for(role)
+    overwrite.send_messages = False
+    overwrite.add_reactions = False
+    return overwrite
+
+
+async def serial_lockdown(guild, member):
+    start = time.monotonic()
+    for channel in guild.text_channels:
+        await channel.set_permissions(guild.default_role, overwrite=_overwrite(channel, guild.default_role))
+    await member.ban(reason="Raid protection")
+    ban_done = time.monotonic()
+    return ban_done - start, ban_done - start
+
+
+async def scheduled_lockdown(guild, member):
+    scheduler = ActionScheduler()
+    start = time.monotonic()
+    futures = [
+        scheduler.submit(
+            f"channel:{guild.id}",
+            lambda c=channel: c.set_permissions(guild.default_role, overwrite=_overwrite(c, guild.default_role)),
+            PRIORITY_LOCKDOWN, key=("lock", channel.id)
+        )
+        for channel in guild.text_channels
+    ]
+    ban = scheduler.submit(f"member:{guild.id}", lambda: member.ban(reason="Raid protection"), PRIORITY_BAN)
+    await ban
+    ban_done = time.monotonic()
+    await asyncio.gather(*futures)
+    return time.monotonic() - start, ban_done - start
+
+
+async def run(name, fn, channels, latency):
+    http = FakeHTTP(latency=latency)
+    guild = FakeGuild(http, channels=channels)
+    member = guild.add_member("raider")
+    total, ban_wait = await fn(guild, member)
+    print(f"{name:<10} channels={channels:<5} total={total:7.2f}s ban_after={ban_wait:7.3f}s "
+          f"calls={http.calls} 429s={http.rate_limited}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lockdown latency against a fake HTTP layer")
+    parser.add_argument("--channels", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per fake API call")
+    args = parser.parse_args()
+    asyncio.run(run("serial", serial_lockdown, args.channels, args.latency))
+    asyncio.run(run("scheduled", scheduled_lockdown, args.channels, args.latency))
+
+
+if __name__ == "__main__":
+    main()
+
+# -----------------------------------------------------------------------------
+# End of File: LockdownBench.py
+# -----------------------------------------------------------------------------
@@ -0,0 +1,224 @@
+# -----------------------------------------------------------------------------
+# File Name   : Benchmark/RaidScoreEval.py
+# Description : Offline evaluation / tuning harness for the raid score. Replays
+#               join traces through JoinScorer (plus the 60 s join counter the
+#               cog uses) and reports, per guild, whether and how fast a raid
+#               would be declared, next to the old joins-per-minute rule, and
+#               join-level precision/recall across score thresholds.
+#
+#               Traces are JSON lines as written by JoinTraceRecorder
+#               (SECURITY_BOT_JOIN_TRACE), optionally labelled:
+#                 {"guild": 1, "user": 7, "t": 1700000000.0, "age_days": 3.2,
+#                  "default_avatar": true, "name": "raider_12", "label": 1}
+#               Without a trace, built-in synthetic scenarios are used.
+#               --tune runs a seeded random search over RaidScoreWeights and
+#               prints the best weights found. --seeds N replays N synthetic
+#               seeds and prints the mean objective, false lockdowns and
+#               missed raids per threshold; the shipped raid_score_threshold
+#               default is the threshold this selects (weights tuned on one
+#               seed overfit it and false-lock event spikes on the others).
+#
+# Author      : X
+# Created On  : 17/10/2026
+# Last Updated: 17/10/2026
+# Import Style: python -m Benchmark.RaidScoreEval [--trace joins.jsonl] [--tune 500] [--seeds 10]
+# -----------------------------------------------------------------------------
+import argparse
+import json
+import random
+from collections import defaultdict
+from dataclasses import asdict, fields, replace
+
+from RealTimeProtection.RaidScoring import (
+    JoinScorer, JoinSample, RaidScoreWeights, DEFAULT_WEIGHTS, FLOOD_MULTIPLIER
+)
+from RealTimeProtection.SlidingWindow import SlidingWindowCounter
+
+THRESHOLDS = (0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9)
+
+
+# -------------------------
+# Synthetic traces
+# -------------------------
+def _name(rng):
+    syllables = ("ka", "ri", "to", "mel", "zen", "dra", "lu", "vin", "sa", "or", "fi", "nox")
+    name = "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4)))
+    return name + (str(rng.randint(1, 999)) if rng.random() < 0.4 else "")
+
+
+def _member(rng, label, young_share, avatar_share, name=None, age=None):
+    if age is None:
+        age = rng.uniform(0, 6.9) if rng.random() < young_share else rng.lognormvariate(5.5, 1.0)
+    return {"age_days": age, "default_avatar": rng.random() < avatar_share,
+            "name": name or _name(rng), "label": label}
+
+
+def synthetic_trace(seed: int = 7):
+    """One guild per scenario, each with six hours of background joins."""
+    rng = random.Random(seed)
+    events = []
+    scenarios = ("trickle", "event_spike", "fast_raid", "slow_raid", "aged_raid")
+    for guild, scenario in enumerate(scenarios, start=1):
+        t = 0.0
+        while t < 6 * 3600:
+            t += rng.expovariate(1 / 180)
+            events.append({"guild": guild, "t": t, **_member(rng, 0, 0.05, 0.25)})
+        start = 3 * 3600
+        if scenario == "event_spike":
+            t = start
+            for _ in range(80):                         # stream shout-out: real, varied accounts
+                t += rng.expovariate(80 / 240)
+                events.append({"guild": guild, "t": t, **_member(rng, 0, 0.1, 0.3)})
+        elif scenario == "fast_raid":
+            for i in range(60):
+                events.append({"guild": guild, "t": start + i * 0.5 + rng.uniform(0, 0.05),
+                               **_member(rng, 1, 1.0, 0.9, name=f"raider{rng.randint(1000, 9999)}")})
+        elif scenario == "slow_raid":
+            for i in range(40):                         # stays under any joins/min threshold
+                events.append({"guild": guild, "t": start + i * 30 + rng.uniform(-3, 3),
+                               **_member(rng, 1, 0.95, 0.85, name=f"free_nitro_{rng.randint(10, 99)}")})
+        elif scenario == "aged_raid":
+            for i in range(30):                         # bought aged accounts, random names
+                events.append({"guild": guild, "t": start + i * 2 + rng.uniform(0, 0.2),
+                               **_member(rng, 1, 0.0, 0.5, age=rng.uniform(200, 900))})
+    for i, event in enumerate(events):
+        event["user"] = i
+    return scenarios, sorted(events, key=lambda e: e["t"])
+
+
+def load_trace(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# -------------------------
+# Replay
+# -------------------------
+def replay(events, weights: RaidScoreWeights, raid_threshold: int):
+    """Per join: (guild, label, score, joins in the last minute), in trace order."""
+    counters = defaultdict(lambda: SlidingWindowCounter(window=60, capacity=1000))
+    scorers = defaultdict(JoinScorer)
+    out = []
+    for e in events:
+        guild = e["guild"]
+        per_minute = counters[guild].hit(e["t"])
+        scorer = scorers[guild]
+        scorer.add(JoinSample(e["t"], e["age_days"], e["default_avatar"], e["name"]))
+        out.append((guild, e.get("label", 0), scorer.score(per_minute, raid_threshold, weights), per_minute))
+    return out
+
+
+def guild_outcomes(results, threshold: float, raid_threshold: int):
+    """guild -> (has raid label, raid joins seen at the score alarm, same for the old rule, raid joins).
+
+    An alarm at 0 raid joins fired on legitimate traffic: a false lockdown."""
+    outcome = {}
+    for guild, label, score, per_minute in results:
+        raid, score_at, old_at, seen = outcome.get(guild, (False, None, None, 0))
+        raid = raid or bool(label)
+        seen += label
+        if score_at is None and (score >= threshold or per_minute > raid_threshold * FLOOD_MULTIPLIER):
+            score_at = seen
+        if old_at is None and per_minute > raid_threshold:
+            old_at = seen
+        outcome[guild] = (raid, score_at, old_at, seen)
+    return outcome
+
+
+def objective(results, threshold: float, raid_threshold: int) -> float:
+    """Raids caught (earlier is better) minus false lockdowns, which cost double."""
+    total = 0.0
+    for raid, score_at, _, seen in guild_outcomes(results, threshold, raid_threshold).values():
+        if score_at == 0:
+            total -= 2
+        elif raid and score_at is not None:
+            total += 1 - score_at / seen
+    return total
+
+
+def tune(events, iterations: int, threshold: float, raid_threshold: int, seed: int = 11):
+    rng = random.Random(seed)
+    best = DEFAULT_WEIGHTS
+    best_value = objective(replay(events, best, raid_threshold), threshold, raid_threshold)
+    for _ in range(iterations):
+        candidate = replace(best, **{
+            f.name: getattr(best, f.name) + rng.gauss(0, 0.75) for f in fields(RaidScoreWeights)
+        })
+        value = objective(replay(events, candidate, raid_threshold), threshold, raid_threshold)
+        if value > best_value:
+            best, best_value = candidate, value
+    return best, best_value
+
+
+# -------------------------
+# Report
+# -------------------------
+def report(results, names, threshold: float, raid_threshold: int):
+    print(f"{'guild':<14} {'raid':>4} {'max score':>9} {'score alarm':>12} {'old rule alarm':>15}")
+    max_score = defaultdict(float)
+    for guild, _, score, _ in results:
+        max_score[guild] = max(max_score[guild], score)
+
+    def when(at):
+        if at is None:
+            return "-"
+        return f"raid join {at}" if at else "FALSE LOCK"
+
+    for guild, (raid, score_at, old_at, _) in sorted(guild_outcomes(results, threshold, raid_threshold).items()):
+        label = names[guild - 1] if names and 0 < guild <= len(names) else str(guild)
+        print(f"{label:<14} {'yes' if raid else 'no':>4} {max_score[guild]:>9.2f} "
+              f"{when(score_at):>12} {when(old_at):>15}")
+
+    print(f"\n{'threshold':>9} {'precision':>9} {'recall':>7} {'objective':>9}")
+    for t in THRESHOLDS:
+        tp = sum(1 for _, label, score, _ in results if label and score >= t)
+        fp = sum(1 for _, label, score, _ in results if not label and score >= t)
+        positives = sum(1 for _, label, _, _ in results if label)
+        precision = tp / (tp + fp) if tp + fp else 1.0
+        recall = tp / positives if positives else 1.0
+        print(f"{t:>9.1f} {precision:>9.2f} {recall:>7.2f} {objective(results, t, raid_threshold):>9.2f}")
+
+
+def report_seeds(seeds: int, weights: RaidScoreWeights, raid_threshold: int):
+    """Threshold selection over several synthetic seeds (one seed is easy to overfit)."""
+    runs = [replay(synthetic_trace(seed)[1], weights, raid_threshold) for seed in range(1, seeds + 1)]
+    print(f"{'threshold':>9} {'objective':>9} {'false locks':>11} {'missed raids':>12}   ({seeds} seeds)")
+    for t in THRESHOLDS:
+        outcomes = [o for run in runs for o in guild_outcomes(run, t, raid_threshold).values()]
+        false_locks = sum(1 for _, score_at, _, _ in outcomes if score_at == 0)
+        missed = sum(1 for raid, score_at, _, _ in outcomes if raid and score_at is None)
+        mean = sum(objective(run, t, raid_threshold) for run in runs) / len(runs)
+        print(f"{t:>9.1f} {mean:>9.2f} {false_locks:>11} {missed:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate / tune the raid score on join traces")
+    parser.add_argument("--trace", help="JSON-lines join trace (default: synthetic scenarios)")
+    parser.add_argument("--threshold", type=float, default=0.5, help="score threshold (raid_score_threshold / 100)")
+    parser.add_argument("--raid-threshold", type=int, default=5, help="guild raid_threshold (joins/minute)")
+    parser.add_argument("--tune", type=int, default=0, metavar="N", help="random-search iterations")
+    parser.add_argument("--seeds", type=int, default=0, metavar="N", help="select the threshold over N synthetic seeds")
+    args = parser.parse_args()
+
+    if args.seeds:
+        report_seeds(args.seeds, DEFAULT_WEIGHTS, args.raid_threshold)
+        return
+
+    if args.trace:
+        names, events = None, sorted(load_trace(args.trace), key=lambda e: e["t"])
+    else:
+        names, events = synthetic_trace()
+
+    weights = DEFAULT_WEIGHTS
+    if args.tune:
+        weights, value = tune(events, args.tune, args.threshold, args.raid_threshold)
+        print(f"best objective {value:.2f} with weights:\n{json.dumps(asdict(weights), indent=2)}\n")
+    report(replay(events, weights, args.raid_threshold), names, args.threshold, args.raid_threshold)
+
+
+if __name__ == "__main__":
+    main()
+
+# -----------------------------------------------------------------------------
+# End of File: RaidScoreEval.py
+# -----------------------------------------------------------------------------
@@ -0,0 +1,245 @@
+# -----------------------------------------------------------------------------
+# File Name   : Benchmark/Replay.py
+# Description : Offline load generator / trace replayer for the protection
+#               cogs. Drives AntiSpamCog.on_message and RaidDetectionCog
+#               (on_member_join, on_message) with FakeDiscord stand-ins and
+#               a throw-away SQLite file, then reports per-event latency
+#               percentiles, events/sec, DB write transactions/sec and peak
+#               RSS.
+#
+#               Built-in scenarios:
+#                 raid  - N joins into one guild (default 5,000)
+#                 spam  - R msg/s spread over G guilds (default 50 msg/s x 1,000)
+#                 dupraid - chatter in one guild plus A accounts posting
+#                           near-identical text (default 200)
+#               Or replay a JSON-lines trace:
+#                 {"t": 0.01, "type": "join"|"message", "guild": 1, "user": 7, "content": "hi",
+#                  "new": true, "raider": true}
+#               "new" marks a member who joined just now (otherwise a year ago;
+#               join events always create new members) and "raider" labels the
+#               attacking accounts, so actions taken against anyone else are
+#               reported as false positives.
+#
+# Author      : X
+# Created On  : 17/10/2026
+# Last Updated: 17/10/2026
+# Import Style: python -m Benchmark.Replay raid --joins 5000
+#               python -m Benchmark.Replay spam --rate 50 --guilds 1000 --seconds 30
+#               python -m Benchmark.Replay dupraid --authors 200
+#               python -m Benchmark.Replay trace path/to/trace.jsonl [--realtime]
+# -----------------------------------------------------------------------------
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+# Point the shared pool at a scratch database BEFORE any Database module is imported
+_TMP_DIR = tempfile.mkdtemp(prefix="security-bot-bench-")
+os.environ["SECURITY_BOT_DB"] = os.path.join(_TMP_DIR, "bench.db")
+
+from Benchmark.FakeDiscord import FakeHTTP, FakeGuild, FakeMessage, FakeBot  # noqa: E402
+from Database.MySqlConnect import pool, run_migrations                       # noqa: E402
+from Database.AsyncDatabase import db                                         # noqa: E402
+from Database.DatabaseHelper.BatchWriter import batch_writer                  # noqa: E402
+from Database.DatabaseHelper.SpamStateStore import spam_state                 # noqa: E402
+from RealTimeProtection.ActionScheduler import action_scheduler               # noqa: E402
+from RealTimeProtection.AntiSpam import AntiSpamCog                           # noqa: E402
+from RealTimeProtection.RaidDetection import RaidDetectionCog                 # noqa: E402
+from discord.utils import utcnow                                              # noqa: E402
+
+
+# -------------------------
+# Trace generation
+# -------------------------
+def raid_trace(joins: int, seconds: float):
+    step = seconds / joins
+    return [{"t": i * step, "type": "join", "guild": 1, "user": i, "raider": True} for i in range(joins)]
+
+
+def spam_trace(rate: int, guilds: int, seconds: float, spam_share: float = 0.2, seed: int = 7):
+    """Uniform chatter across all guilds plus `spam_share` of traffic from a few spammers."""
+    rng = random.Random(seed)
+    spammers = max(1, guilds // 50)
+    events = []
+    for i in range(int(rate * seconds)):
+        if rng.random() < spam_share:
+            spammer = rng.randrange(spammers)
+            guild, user = spammer * 50, 1_000_000 + spammer
+        else:
+            guild, user = rng.randrange(guilds), rng.randrange(100_000)
+        events.append({"t": i / rate, "type": "message", "guild": guild + 1, "user": user, "content": "hello"})
+    return events
+
+
+def duplicate_raid_trace(authors: int, seconds: float, chatter: int = 2000, seed: int = 7):
+    """Normal chatter in guild 1 with a wave of accounts posting variants of one message."""
+    rng = random.Random(seed)
+    events = [
+        {"t": rng.uniform(0, seconds), "type": "message", "guild": 1, "user": rng.randrange(500),
+         "content": f"talking about topic {rng.randrange(10_000)} with everyone here {i}"}
+        for i in range(chatter)
+    ]
+    start = seconds / 2
+    for i in range(authors):
+        code = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz0123456789") for _ in range(6))
+        events.append({
+            "t": start + i * 0.05, "type": "message", "guild": 1, "user": 1_000_000 + i, "new": True,
+            "raider": True, "content": f"FREE NITRO!! claim yours now at discord-gift.com/{code} before it runs out!!"
+        })
+    events.sort(key=lambda e: e["t"])
+    return events
+
+
+def load_trace(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# -------------------------
+# Replay
+# -------------------------
+class World:
+    """Lazily materialises fake guilds/members/channels for the trace ids."""
+
+    def __init__(self, http: FakeHTTP):
+        self.http = http
+        self.bot = FakeBot()
+        self.users = {}
+        self.raiders = set()    # member ids labelled "raider" in the trace
+
+    def guild(self, guild_id: int) -> FakeGuild:
+        guild = self.bot.guilds.get(guild_id)
+        if guild is None:
+            guild = self.bot.guilds[guild_id] = FakeGuild(self.http, channels=5, guild_id=guild_id)
+        return guild
+
+    def member(self, guild: FakeGuild, event: dict):
+        key = (guild.id, event["user"])
+        member = self.users.get(key)
+        if member is None:
+            now = utcnow()
+            new = event.get("new") or event["type"] == "join"
+            member = self.users[key] = guild.add_member(
+                f"user{event['user']}", joined_at=now if new else now - timedelta(days=365)
+            )
+            if event.get("raider"):
+                self.raiders.add(member.id)
+        return member
+
+    def actioned(self):
+        """(labelled raiders, other members) that had a moderation action applied."""
+        hit = [m.id for m in self.users.values() if m.actions]
+        raiders = sum(1 for member_id in hit if member_id in self.raiders)
+        return raiders, len(hit) - raiders
+
+
+def _percentile(ordered, pct):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def replay(events, realtime: bool, latency: float):
+    world = World(FakeHTTP(latency=latency, rate=10_000))
+    anti_spam = AntiSpamCog(world.bot)
+    raid = RaidDetectionCog(world.bot)
+    world.bot.cogs = {"AntiSpamCog": anti_spam, "RaidDetectionCog": raid}
+    await anti_spam.cog_load()
+    await raid.cog_load()
+
+    latencies = {"message": [], "join": []}
+    writes_before = db.write_transactions
+    started = time.perf_counter()
+    for event in events:
+        if realtime:
+            await asyncio.sleep(max(0.0, started + event["t"] - time.perf_counter()))
+        guild = world.guild(event["guild"])
+        member = world.member(guild, event)
+        t0 = time.perf_counter()
+        if event["type"] == "join":
+            await raid.on_member_join(member)
+        else:
+            message = FakeMessage(guild, guild.text_channels[0], member, event.get("content", ""))
+            await anti_spam.on_message(message)
+            await raid.on_message(message)
+        latencies[event["type"]].append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+
+    await spam_state.flush()
+    await action_scheduler.drain()
+    await batch_writer.stop()
+    await anti_spam.cog_unload()
+    raid.clean_old_joins.cancel()
+    drained = time.perf_counter() - started
+    writes = db.write_transactions - writes_before
+
+    print(f"events        : {len(events)} in {elapsed:.2f}s ({len(events) / elapsed:,.0f} events/s)")
+    for kind, values in latencies.items():
+        if not values:
+            continue
+        values.sort()
+        print(
+            f"{kind:<14}: n={len(values):<7} p50={_percentile(values, 50) * 1e6:8.1f}us "
+            f"p99={_percentile(values, 99) * 1e6:8.1f}us p99.9={_percentile(values, 99.9) * 1e6:8.1f}us "
+            f"max={values[-1] * 1e6:8.1f}us"
+        )
+    print(f"db writes     : {writes} transactions, {batch_writer.rows_written} event rows "
+          f"({writes / drained:,.1f} tx/s incl. drain)")
+    print(f"discord calls : {world.http.calls} (429s: {world.http.rate_limited})")
+    print(f"dup index     : {len(raid.duplicates)} keys, {raid.duplicates.dropped} dropped, "
+          f"raids declared in {len(raid.locked_guilds)} guild(s)")
+    raiders, others = world.actioned()
+    print(f"actioned      : {raiders}/{len(world.raiders)} labelled raiders, {others} other members")
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"peak RSS      : {rss_kb / 1024:.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline replay benchmark for the protection cogs")
+    sub = parser.add_subparsers(dest="scenario", required=True)
+    p_raid = sub.add_parser("raid", help="N joins into one guild")
+    p_raid.add_argument("--joins", type=int, default=5000)
+    p_raid.add_argument("--seconds", type=float, default=60.0)
+    p_spam = sub.add_parser("spam", help="message load across many guilds")
+    p_spam.add_argument("--rate", type=int, default=50)
+    p_spam.add_argument("--guilds", type=int, default=1000)
+    p_spam.add_argument("--seconds", type=float, default=60.0)
+    p_dup = sub.add_parser("dupraid", help="duplicate-content wave in one guild")
+    p_dup.add_argument("--authors", type=int, default=200)
+    p_dup.add_argument("--seconds", type=float, default=60.0)
+    p_trace = sub.add_parser("trace", help="replay a JSON-lines trace")
+    p_trace.add_argument("path")
+    for p in (p_raid, p_spam, p_dup, p_trace):
+        p.add_argument("--realtime", action="store_true", help="pace events by their timestamps")
+        p.add_argument("--latency", type=float, default=0.0, help="fake Discord API latency (s)")
+    args = parser.parse_args()
+
+    if args.scenario == "raid":
+        events = raid_trace(args.joins, args.seconds)
+    elif args.scenario == "spam":
+        events = spam_trace(args.rate, args.guilds, args.seconds)
+    elif args.scenario == "dupraid":
+        events = duplicate_raid_trace(args.authors, args.seconds)
+    else:
+        events = load_trace(args.path)
+
+    run_migrations(pool)
+    try:
+        asyncio.run(replay(events, args.realtime, args.latency))
+    finally:
+        db.shutdown()
+        print(f"scratch db    : {os.environ['SECURITY_BOT_DB']}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
+
+# -----------------------------------------------------------------------------
+# End of File: Replay.py
+# -----------------------------------------------------------------------------
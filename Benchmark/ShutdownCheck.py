@@ -0,0 +1,163 @@
+# -----------------------------------------------------------------------------
+# File Name   : Benchmark/ShutdownCheck.py
+# Description : SIGTERM shutdown check for the real SecurityBot, without a
+#               Discord connection. Started normally it points the bot at a
+#               scratch database and runs itself as a child process. The
+#               child runs main.SecurityBot with login/connect replaced by
+#               offline stand-ins (setup_hook, cogs and the SIGTERM handler
+#               are the real ones), then it queues state that only close()
+#               persists:
+#                 * a dirty anti-spam entry (write-behind, never flushed yet)
+#                 * security events held in the batch writer (flush interval
+#                   raised to HOLD_SECONDS so nothing is written before the
+#                   signal)
+#               and prints READY. The parent sends SIGTERM, waits for the
+#               child to exit and checks that the anti_spam row, every queued
+#               security event and the detector snapshot reached disk.
+#               Exits non-zero when anything is missing.
+#
+# Author      : X
+# Created On  : 17/10/2026
+# Last Updated: 17/10/2026
+# Import Style: python -m Benchmark.ShutdownCheck [--events 200]
+# -----------------------------------------------------------------------------
+import argparse
+import asyncio
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+GUILD_ID = 1 << 22
+USER_ID = 4242
+EVENT_TYPE = "shutdown_check"
+READY_TIMEOUT = 60
+EXIT_TIMEOUT = 30
+HOLD_SECONDS = 5
+
+
+# -------------------------
+# Child: the bot under test
+# -------------------------
+async def stage_state(events: int):
+    from Database.DatabaseHelper.AuditLogger import log_security_event
+    from Database.DatabaseHelper.BatchWriter import batch_writer
+    from Database.DatabaseHelper.SpamStateStore import spam_state
+
+    now = datetime.now(timezone.utc)
+    spam_state.set(GUILD_ID, USER_ID, 3, now, now + timedelta(minutes=10))
+    # Longer than SIGTERM takes to arrive, so only close() writes these rows. stop() waits
+    # out the current batch's deadline, so keep it short enough for the exit timeout.
+    batch_writer._flush_interval = HOLD_SECONDS
+    for i in range(events):
+        await log_security_event(GUILD_ID, EVENT_TYPE, i, "queued before SIGTERM")
+    print(f"READY dirty_spam=1 queued_events={batch_writer.pending}", flush=True)
+
+
+def run_child(events: int):
+    import discord
+    import main
+
+    class OfflineBot(main.SecurityBot):
+        async def login(self, token):
+            await self.setup_hook()
+
+        async def connect(self, *, reconnect=True):
+            await stage_state(events)
+            # Same exit as the gateway loop: return once close() has shut the client down
+            while not self.is_closed():
+                await asyncio.sleep(0.02)
+            await self._closing_task
+
+    bot = OfflineBot(command_prefix="/", intents=discord.Intents.none())
+
+    async def runner():     # what Client.run does
+        async with bot:
+            await bot.start("offline")
+
+    asyncio.run(runner())
+
+
+# -------------------------
+# Parent: signal and verify
+# -------------------------
+def check_database(path: str, events: int) -> list:
+    conn = sqlite3.connect(path)
+    try:
+        failures = []
+        row = conn.execute("SELECT warnings FROM anti_spam WHERE guild_id=? AND user_id=?",
+                           (GUILD_ID, USER_ID)).fetchone()
+        if row is None or int(row[0]) != 3:
+            failures.append(f"anti_spam row missing or stale: {row}")
+        written = conn.execute("SELECT COUNT(*) FROM security_events WHERE event_type=?",
+                               (EVENT_TYPE,)).fetchone()[0]
+        if written != events:
+            failures.append(f"security_events: {written}/{events} queued rows written")
+        return failures
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that SIGTERM flushes the bot's state")
+    parser.add_argument("--events", type=int, default=200, help="security events queued before SIGTERM")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.events)
+        return
+
+    scratch = tempfile.mkdtemp(prefix="security-bot-shutdown-")
+    db_path = os.path.join(scratch, "shutdown.db")
+    snapshot = os.path.join(scratch, "detector_state.bin")
+    env = dict(os.environ,
+               SECURITY_BOT_DB=db_path,
+               SECURITY_BOT_SNAPSHOT=snapshot,
+               SECURITY_BOT_LOG_FILE=os.path.join(scratch, "ConsoleMessage.log"),
+               SECURITY_BOT_METRICS_PORT="0")
+    child = subprocess.Popen([sys.executable, "-m", "Benchmark.ShutdownCheck", "--child",
+                              "--events", str(args.events)],
+                             env=env, stdout=subprocess.PIPE, text=True)
+    deadline = time.monotonic() + READY_TIMEOUT
+    ready = None
+    for line in child.stdout:
+        if line.startswith("READY"):
+            ready = line.strip()
+            break
+        if time.monotonic() > deadline:
+            break
+    if ready is None:
+        child.kill()
+        sys.exit(f"child never became ready (exit code {child.wait()})")
+
+    started = time.perf_counter()
+    child.send_signal(signal.SIGTERM)
+    try:
+        code = child.wait(EXIT_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        child.kill()
+        sys.exit(f"child did not exit within {EXIT_TIMEOUT}s of SIGTERM")
+
+    failures = check_database(db_path, args.events)
+    if not os.path.exists(snapshot):
+        failures.append("detector snapshot not written")
+    if code != 0:
+        failures.append(f"child exit code {code}")
+    print(f"{ready}; exited {time.perf_counter() - started:.2f}s after SIGTERM")
+    print(f"scratch dir     : {scratch}", file=sys.stderr)
+    if failures:
+        sys.exit("FAIL: " + "; ".join(failures))
+    print("PASS: anti-spam state, queued security events and snapshot persisted")
+
+
+if __name__ == "__main__":
+    main()
+
+# -----------------------------------------------------------------------------
+# End of File: ShutdownCheck.py
+# -----------------------------------------------------------------------------
@@ -0,0 +1,61 @@
+# -----------------------------------------------------------------------------
+# File Name   : Benchmark/SlidingWindowBench.py
+# Description : Micro-benchmark of per-join cost: the old list-comprehension +
+#               deque rebuild from RaidDetection versus SlidingWindowCounter.
+#               Prints ns/event for growing flood sizes; the counter should
+#               stay flat while the old path grows with the window population.
+#
+# Author      : X
+# Created On  : 17/10/2026
+# Last Updated: 17/10/2026
+# Import Style: python -m Benchmark.SlidingWindowBench
+# -----------------------------------------------------------------------------
+import time
+from collections import deque
+
+from RealTimeProtection.SlidingWindow import SlidingWindowCounter
+
+
+def old_join_path(events, window=60.0, maxlen=1000):
+    joins = deque(maxlen=maxlen)
+    for now in events:
+        joins.append(now)
+        cutoff = now - window
+        recent = [t for t in joins if t > cutoff]
+        _ = len(recent)
+        joins = deque(recent, maxlen=maxlen)
+
+
+def counter_join_path(events, window=60.0, capacity=1000):
+    counter = SlidingWindowCounter(window=window, capacity=capacity)
+    for now in events:
+        counter.hit(now)
+
+
+def bench(fn, events, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(events)
+        best = min(best, time.perf_counter() - start)
+    return best / len(events) * 1e9
+
+
+def main():
+    print(f"{'joins/60s':>10} {'old ns/join':>14} {'counter ns/join':>16}")
+    for in_window in (10, 100, 500, 1000):
+        # `in_window` joins per 60 s sustained for 5000 events
+        step = 60.0 / in_window
+        events = [i * step for i in range(5000)]
+        print(f"{in_window:>10} {bench(old_join_path, events):>14.0f} {bench(counter_join_path, events):>16.0f}")
+
+    counter = SlidingWindowCounter(window=60, capacity=1000)
+    print(f"\nfixed footprint per key: {counter.nbytes} bytes of timestamp storage")
+
+
+if __name__ == "__main__":
+    main()
+
+# -----------------------------------------------------------------------------
+# End of File: SlidingWindowBench.py
+# -----------------------------------------------------------------------------
@@ -4,7 +4,11 @@ from discord.ext import commands
 from discord import app_commands
 import json
 import pytz
-from Database.DatabaseHelper.Helper import get_guild_setting, set_guild_setting
+from dataclasses import dataclass
+from datetime import tzinfo
+from Database.DatabaseHelper.Helper import (
+    get_guild_setting, get_guild_settings, set_guild_setting_async, add_settings_listener
+)
 from ConsoleHelper.ConsoleMessage import ConsoleMessage
 
 logger = ConsoleMessage()
@@ -14,6 +18,7 @@ logger = ConsoleMessage()
 # -------------------------
 DEFAULT_CONFIG = {
     "raid_threshold": "5",
+    "raid_score_threshold": "50",  # percent; joins scoring at or above this are a raid (Benchmark/RaidScoreEval.py --seeds 10)
     "spam_threshold": "3",
     "mention_limit": "5",
     "raidmode": "off",
@@ -21,17 +26,22 @@ DEFAULT_CONFIG = {
     "security_roles": "[]",
     "timezone": "Asia/Kolkata",
     "raid_action": "timeout",  # default action
+    "raid_lock_strategy": "channels",  # channels = per-channel overwrites, role = @everyone role (fast)
     "raid_log_channel": None,
+    "raid_dup_threshold": "8",   # distinct authors posting the same content within a minute
     # Anti-spam settings
     "spam_cooldown": "10",       # seconds
     "timeout_duration": "300",   # seconds
     "max_warnings": "2",
     "warning_expiry": "300",     # seconds
-    "spam_log_channel": None
+    "spam_log_channel": None,
+    # Retention
+    "log_retention_days": "30",  # raw audit/security rows older than this are rolled up
 }
 
 CONFIG_CHOICES = [
     app_commands.Choice(name="Raid Threshold (joins/minute)", value="raid_threshold"),
+    app_commands.Choice(name="Raid Score Threshold (%)", value="raid_score_threshold"),
     app_commands.Choice(name="Spam Threshold (msgs/5s)", value="spam_threshold"),
     app_commands.Choice(name="Mention Limit (mentions/msg)", value="mention_limit"),
     app_commands.Choice(name="Raidmode (on/off)", value="raidmode"),
@@ -39,43 +49,133 @@ CONFIG_CHOICES = [
     app_commands.Choice(name="Security Roles (IDs)", value="security_roles"),
     app_commands.Choice(name="Timezone", value="timezone"),
     app_commands.Choice(name="Raid Action (timeout/mute/kick/ban)", value="raid_action"),
+    app_commands.Choice(name="Raid Lock Strategy (channels/role)", value="raid_lock_strategy"),
+    app_commands.Choice(name="Raid Duplicate Authors (authors/minute)", value="raid_dup_threshold"),
     # Anti-spam choices
     app_commands.Choice(name="Spam Cooldown (seconds)", value="spam_cooldown"),
     app_commands.Choice(name="Timeout Duration (seconds)", value="timeout_duration"),
     app_commands.Choice(name="Max Warnings", value="max_warnings"),
     app_commands.Choice(name="Warning Expiry (seconds)", value="warning_expiry"),
+    app_commands.Choice(name="Log Retention (days)", value="log_retention_days"),
 ]
 
 # -------------------------
-# Config Helpers
+# Typed Config Snapshot
 # -------------------------
-def ensure_default_config(guild_id: int):
-    for key, default_value in DEFAULT_CONFIG.items():
-        if get_guild_setting(guild_id, key) is None:
-            set_guild_setting(guild_id, key, default_value)
+def _to_int(value, default: str) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return int(default)
+
+def _to_channel(value):
+    try:
+        return int(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+def _to_roles(value) -> frozenset:
+    try:
+        return frozenset(int(rid) for rid in json.loads(value or "[]"))
+    except Exception:
+        return frozenset()
+
+def _to_tz(value) -> tzinfo:
+    try:
+        return pytz.timezone(value)
+    except Exception:
+        return pytz.timezone(DEFAULT_CONFIG["timezone"])
+
+
+@dataclass(frozen=True)
+class GuildConfig:
+    """Immutable, pre-parsed view of a guild's settings (defaults filled in)."""
+    raid_threshold: int
+    raid_score_threshold: int
+    spam_threshold: int
+    mention_limit: int
+    raidmode: bool
+    antispam: bool
+    security_roles: frozenset
+    timezone: str
+    tz: tzinfo
+    raid_action: str
+    raid_lock_strategy: str
+    raid_log_channel: int | None
+    raid_dup_threshold: int
+    spam_cooldown: int
+    timeout_duration: int
+    max_warnings: int
+    warning_expiry: int
+    spam_log_channel: int | None
+    log_retention_days: int
+
+    @classmethod
+    def from_settings(cls, settings: dict) -> "GuildConfig":
+        raw = {**DEFAULT_CONFIG, **{k: v for k, v in settings.items() if v is not None}}
+        return cls(
+            raid_threshold=_to_int(raw["raid_threshold"], DEFAULT_CONFIG["raid_threshold"]),
+            raid_score_threshold=_to_int(raw["raid_score_threshold"], DEFAULT_CONFIG["raid_score_threshold"]),
+            spam_threshold=_to_int(raw["spam_threshold"], DEFAULT_CONFIG["spam_threshold"]),
+            mention_limit=_to_int(raw["mention_limit"], DEFAULT_CONFIG["mention_limit"]),
+            raidmode=str(raw["raidmode"]).lower() == "on",
+            antispam=str(raw["antispam"]).lower() == "on",
+            security_roles=_to_roles(raw["security_roles"]),
+            timezone=raw["timezone"],
+            tz=_to_tz(raw["timezone"]),
+            raid_action=str(raw["raid_action"]).lower(),
+            raid_lock_strategy=str(raw["raid_lock_strategy"]).lower(),
+            raid_log_channel=_to_channel(raw["raid_log_channel"]),
+            raid_dup_threshold=_to_int(raw["raid_dup_threshold"], DEFAULT_CONFIG["raid_dup_threshold"]),
+            spam_cooldown=_to_int(raw["spam_cooldown"], DEFAULT_CONFIG["spam_cooldown"]),
+            timeout_duration=_to_int(raw["timeout_duration"], DEFAULT_CONFIG["timeout_duration"]),
+            max_warnings=_to_int(raw["max_warnings"], DEFAULT_CONFIG["max_warnings"]),
+            warning_expiry=_to_int(raw["warning_expiry"], DEFAULT_CONFIG["warning_expiry"]),
+            spam_log_channel=_to_channel(raw["spam_log_channel"]),
+            log_retention_days=_to_int(raw["log_retention_days"], DEFAULT_CONFIG["log_retention_days"]),
+        )
+
+
+_guild_configs = {}  # {guild_id: GuildConfig}
 
+def get_guild_config(guild_id: int) -> GuildConfig:
+    """Return the guild's config snapshot; built from the mirror on first use, never writes."""
+    config = _guild_configs.get(guild_id)
+    if config is None:
+        config = GuildConfig.from_settings(get_guild_settings(guild_id))
+        _guild_configs[guild_id] = config
+    return config
+
+def _refresh_guild_config(guild_id):
+    if guild_id is None:
+        _guild_configs.clear()
+    else:
+        # Build first, then swap the reference so readers never see a partial config
+        _guild_configs[int(guild_id)] = GuildConfig.from_settings(get_guild_settings(guild_id))
+
+add_settings_listener(_refresh_guild_config)
+
+# -------------------------
+# Config Helpers
+# -------------------------
 def get_config(guild_id: int, key: str):
+    """Raw string value from the mirror, falling back to the default (read-only)."""
     value = get_guild_setting(guild_id, key)
     if value is None:
-        default = DEFAULT_CONFIG.get(key)
-        set_guild_setting(guild_id, key, default)
-        return default
+        return DEFAULT_CONFIG.get(key)
     return value
 
-def set_config(guild_id: int, key: str, value: str):
-    set_guild_setting(guild_id, key, value)
+async def set_config(guild_id: int, key: str, value: str):
+    await set_guild_setting_async(guild_id, key, value)
 
 def get_security_roles(guild_id: int):
-    try:
-        return json.loads(get_config(guild_id, "security_roles"))
-    except Exception:
-        return []
+    return list(get_guild_config(guild_id).security_roles)
 
 def is_guild_owner(user: discord.Member) -> bool:
     return user.id == user.guild.owner_id
 
 def has_security_role(user: discord.Member, guild_id: int) -> bool:
-    allowed_roles = get_security_roles(guild_id)
+    allowed_roles = get_guild_config(guild_id).security_roles
     return any(role.id in allowed_roles for role in user.roles) or is_guild_owner(user)
 
 # -------------------------
@@ -91,7 +191,6 @@ class ConfigCog(commands.Cog):
     @app_commands.describe(key="Select the config key")
     @app_commands.choices(key=CONFIG_CHOICES)
     async def config_get(self, interaction: discord.Interaction, key: app_commands.Choice[str]):
-        ensure_default_config(interaction.guild.id)
         if not has_security_role(interaction.user, interaction.guild.id):
             await interaction.response.send_message(
                 "❌ You do not have permission to view security configs.", ephemeral=True
@@ -108,13 +207,13 @@ class ConfigCog(commands.Cog):
                 value = "Invalid data"
 
         await interaction.response.send_message(f"🔐 **Config**: `{key.name}` = `{value}`", ephemeral=True)
-        logger.info(f"Config fetched: {key.value}={value} by {interaction.user} in guild {interaction.guild.id}")
+        logger.info("Config fetched: %s=%s by %s in guild %s", key.value, value, interaction.user, interaction.guild.id)
 
     @app_commands.command(name="config_set", description="Set a security config value")
     @app_commands.describe(key="Select the config key", value="Enter the new value")
     @app_commands.choices(key=CONFIG_CHOICES)
     async def config_set(self, interaction: discord.Interaction, key: app_commands.Choice[str], value: str):
-        ensure_default_config(interaction.guild.id)
+        # Unset keys read as DEFAULT_CONFIG; only the changed key is stored
         if not is_guild_owner(interaction.user):
             await interaction.response.send_message(
                 "❌ Only the server owner can modify security configs.", ephemeral=True
@@ -124,8 +223,9 @@ class ConfigCog(commands.Cog):
 
         # Numeric validation
         if key.value in [
-            "raid_threshold", "spam_threshold", "mention_limit",
-            "spam_cooldown", "timeout_duration", "max_warnings", "warning_expiry"
+            "raid_threshold", "raid_score_threshold", "spam_threshold", "mention_limit", "raid_dup_threshold",
+            "spam_cooldown", "timeout_duration", "max_warnings", "warning_expiry",
+            "log_retention_days"
         ]:
             if not value.isdigit() or int(value) < 1:
                 await interaction.response.send_message(
@@ -133,6 +233,10 @@ class ConfigCog(commands.Cog):
                 )
                 return
 
+        if key.value == "raid_score_threshold" and int(value) > 100:
+            await interaction.response.send_message("❌ Raid score threshold is a percentage (1-100).", ephemeral=True)
+            return
+
         # Security roles validation
         if key.value == "security_roles":
             try:
@@ -161,6 +265,15 @@ class ConfigCog(commands.Cog):
                 return
             value = value.lower()
 
-        set_config(interaction.guild.id, key.value, value)
+        # Raid lock strategy validation
+        if key.value == "raid_lock_strategy":
+            if value.lower() not in ["channels", "role"]:
+                await interaction.response.send_message(
+                    "❌ Raid lock strategy must be one of: channels, role.", ephemeral=True
+                )
+                return
+            value = value.lower()
+
+        await set_config(interaction.guild.id, key.value, value)
         await interaction.response.send_message(f"✅ `{key.name}` updated to `{value}`", ephemeral=True)
         logger.info(f"Config updated: {key.value}={value} by {interaction.user} in guild {interaction.guild.id}")
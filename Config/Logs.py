@@ -1,24 +1,22 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
-from Database.MySqlConnect import SQLiteConnectionPool
+from Database.AsyncDatabase import db
+from Database.DatabaseHelper.SecurityStats import security_stats
 from Database.DatabaseHelper.SecurityHelper import has_security_role
-from Database.DatabaseHelper.Helper import get_guild_setting
+from Config.Config import get_guild_config
+from Monitoring.Metrics import timed
 from ConsoleHelper.ConsoleMessage import ConsoleMessage
-import pytz
-from datetime import datetime
+from datetime import datetime, tzinfo
 
-pool = SQLiteConnectionPool()
 logger = ConsoleMessage()  # Singleton logger
 
-def get_guild_timezone(guild_id: int) -> str:
-    tz = get_guild_setting(guild_id, "timezone")
-    return tz if tz else "Asia/Kolkata"
+def get_guild_timezone(guild_id: int) -> tzinfo:
+    return get_guild_config(guild_id).tz
 
-def format_timestamp(ts_str: str, tz_name: str) -> str:
+def format_timestamp(ts_str: str, tz: tzinfo) -> str:
     try:
         utc_dt = datetime.fromisoformat(ts_str)
-        tz = pytz.timezone(tz_name)
         local_dt = utc_dt.astimezone(tz)
         now = datetime.now(tz)
         diff = now - local_dt
@@ -39,36 +37,110 @@ def format_timestamp(ts_str: str, tz_name: str) -> str:
     except Exception:
         return ts_str
 
+MAX_LOG_LIMIT = 100   # upper bound for the user-supplied limit
+PAGE_SIZE = 5
+
+# Newest-first keyset queries; the cursor is the (timestamp, id) of the last row shown
+_LOG_QUERIES = {
+    "audit": """
+        SELECT id, event_type, actor_id, target_id, details, timestamp
+        FROM audit_logs
+        WHERE guild_id=? {cursor}
+        ORDER BY timestamp DESC, id DESC
+        LIMIT ?
+    """,
+    "security": """
+        SELECT id, event_type, details, detected_at
+        FROM security_events
+        WHERE guild_id=? {cursor}
+        ORDER BY detected_at DESC, id DESC
+        LIMIT ?
+    """,
+}
+_TIME_COLUMN = {"audit": "timestamp", "security": "detected_at"}
+
+
+async def fetch_log_page(log_type: str, guild_id: int, cursor=None, size: int = PAGE_SIZE):
+    """Fetch one page of logs strictly older than cursor=(timestamp, id)."""
+    if cursor is None:
+        query = _LOG_QUERIES[log_type].format(cursor="")
+        params = (guild_id, size)
+    else:
+        query = _LOG_QUERIES[log_type].format(cursor=f"AND ({_TIME_COLUMN[log_type]}, id) < (?, ?)")
+        params = (guild_id, cursor[0], cursor[1], size)
+    return await db.fetch_all(query, params)
+
+
+class LogPager:
+    """Lazily walks a guild's logs one page at a time, up to `limit` rows."""
+
+    def __init__(self, log_type: str, guild_id: int, limit: int, per_page: int = PAGE_SIZE):
+        self.log_type = log_type
+        self.guild_id = guild_id
+        self.limit = limit
+        self.per_page = per_page
+        self.index = 0
+        self._starts = [None]     # cursor each visited page starts after
+        self.rows = []
+        self.has_next = False
+
+    async def load(self, index: int) -> bool:
+        """Load page `index` (only the previous/next page is reachable); False if it doesn't exist."""
+        if index < 0 or index >= len(self._starts) or index * self.per_page >= self.limit:
+            return False
+        size = min(self.per_page, self.limit - index * self.per_page)
+        rows = await fetch_log_page(self.log_type, self.guild_id, self._starts[index], size + 1)
+        if not rows:
+            return False
+        self.index = index
+        self.rows = rows[:size]
+        self.has_next = len(rows) > size and (index + 1) * self.per_page < self.limit
+        if self.has_next and len(self._starts) == index + 1:
+            last = self.rows[-1]
+            self._starts.append((last[-1], last[0]))
+        return True
+
+
 class LogsCog(commands.Cog):
     """View recent audit and security logs with pagination."""
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
-    async def paginate_embed(self, interaction, logs, title, color, log_type):
-        tz_name = get_guild_timezone(interaction.guild.id)
-        per_page = 5
-        pages = []
-        for i in range(0, len(logs), per_page):
-            embed = discord.Embed(title=title, color=color)
-            for log in logs[i:i+per_page]:
-                if log_type == "audit":
-                    event_type, actor, target, details, ts = log
-                    ts_formatted = format_timestamp(ts, tz_name)
-                    value = f"👮 Actor: <@{actor}>\n🎯 Target: {target if target else 'N/A'}\n📋 {details or 'No details'}\n🕒 {ts_formatted}"
-                    embed.add_field(name=f"Action: {event_type}", value=value, inline=False)
-                else:
-                    event_type, details, ts = log
-                    ts_formatted = format_timestamp(ts, tz_name)
-                    value = f"📋 {details or 'No details'}\n🕒 {ts_formatted}"
-                    embed.add_field(name=f"Event: {event_type}", value=value, inline=False)
-            pages.append(embed)
-
-        current = 0
-        message = await interaction.response.send_message(embed=pages[current], ephemeral=False)
+    async def cog_load(self):
+        await security_stats.load()
+        self.persist_stats.start()
+
+    async def cog_unload(self):
+        self.persist_stats.cancel()
+        await security_stats.flush()
+
+    @tasks.loop(seconds=60)
+    async def persist_stats(self):
+        await security_stats.flush()
+
+    def build_embed(self, pager: LogPager, title, color, tz) -> discord.Embed:
+        embed = discord.Embed(title=title, color=color)
+        for log in pager.rows:
+            if pager.log_type == "audit":
+                _, event_type, actor, target, details, ts = log
+                ts_formatted = format_timestamp(ts, tz)
+                value = f"👮 Actor: <@{actor}>\n🎯 Target: {target if target else 'N/A'}\n📋 {details or 'No details'}\n🕒 {ts_formatted}"
+                embed.add_field(name=f"Action: {event_type}", value=value, inline=False)
+            else:
+                _, event_type, details, ts = log
+                ts_formatted = format_timestamp(ts, tz)
+                value = f"📋 {details or 'No details'}\n🕒 {ts_formatted}"
+                embed.add_field(name=f"Event: {event_type}", value=value, inline=False)
+        embed.set_footer(text=f"Page {pager.index + 1}{'' if pager.has_next else ' (end)'}")
+        return embed
+
+    async def paginate_embed(self, interaction, pager: LogPager, title, color):
+        tz = get_guild_timezone(interaction.guild.id)
+        message = await interaction.response.send_message(embed=self.build_embed(pager, title, color, tz), ephemeral=False)
         message = await interaction.original_response()
 
-        if len(pages) == 1:
+        if not pager.has_next:
             return  # No pagination needed
 
         await message.add_reaction("⬅️")
@@ -87,65 +159,60 @@ class LogsCog(commands.Cog):
                     pass
                 break
 
-            if str(reaction.emoji) == "➡️":
-                current = (current + 1) % len(pages)
-            elif str(reaction.emoji) == "⬅️":
-                current = (current - 1) % len(pages)
-
-            await message.edit(embed=pages[current])
+            step = 1 if str(reaction.emoji) == "➡️" else -1
+            if await pager.load(pager.index + step):
+                await message.edit(embed=self.build_embed(pager, title, color, tz))
             try:
                 await message.remove_reaction(reaction, user)
             except:
                 pass
 
     @app_commands.command(name="logs_audit", description="View recent audit logs")
-    @app_commands.describe(limit="Number of logs to fetch (default 20)")
-    async def logs_audit(self, interaction: discord.Interaction, limit: int = 20):
+    @app_commands.describe(limit=f"Number of logs to page through (default 20, max {MAX_LOG_LIMIT})")
+    @timed("securitybot_command_seconds", command="logs_audit")
+    async def logs_audit(self, interaction: discord.Interaction, limit: app_commands.Range[int, 1, MAX_LOG_LIMIT] = 20):
         if not has_security_role(interaction.user, interaction.guild.id):
             await interaction.response.send_message("❌ You do not have permission to view audit logs.", ephemeral=False)
             return
 
-        with pool.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT event_type, actor_id, target_id, details, timestamp 
-                FROM audit_logs 
-                WHERE guild_id=? 
-                ORDER BY timestamp DESC 
-                LIMIT ?
-            """, (interaction.guild.id, limit))
-            logs = cursor.fetchall()
-            cursor.close()
-
-        if not logs:
+        pager = LogPager("audit", interaction.guild.id, min(limit, MAX_LOG_LIMIT))
+        if not await pager.load(0):
             await interaction.response.send_message("📭 No audit logs found.", ephemeral=False)
             return
 
-        logger.info(f"User {interaction.user} fetched {len(logs)} audit logs from guild {interaction.guild.id}")
-        await self.paginate_embed(interaction, logs, f"📝 Recent Audit Logs (Last {len(logs)})", discord.Color.blue(), "audit")
+        logger.info("User %s fetched audit logs from guild %s", interaction.user, interaction.guild.id)
+        await self.paginate_embed(interaction, pager, "📝 Recent Audit Logs", discord.Color.blue())
 
     @app_commands.command(name="logs_security", description="View recent security events")
-    @app_commands.describe(limit="Number of logs to fetch (default 20)")
-    async def logs_security(self, interaction: discord.Interaction, limit: int = 20):
+    @app_commands.describe(limit=f"Number of logs to page through (default 20, max {MAX_LOG_LIMIT})")
+    @timed("securitybot_command_seconds", command="logs_security")
+    async def logs_security(self, interaction: discord.Interaction, limit: app_commands.Range[int, 1, MAX_LOG_LIMIT] = 20):
         if not has_security_role(interaction.user, interaction.guild.id):
             await interaction.response.send_message("❌ You do not have permission to view security events.", ephemeral=False)
             return
 
-        with pool.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT event_type, details, detected_at 
-                FROM security_events 
-                WHERE guild_id=? 
-                ORDER BY detected_at DESC 
-                LIMIT ?
-            """, (interaction.guild.id, limit))
-            logs = cursor.fetchall()
-            cursor.close()
-
-        if not logs:
+        pager = LogPager("security", interaction.guild.id, min(limit, MAX_LOG_LIMIT))
+        if not await pager.load(0):
             await interaction.response.send_message("📭 No security events found.", ephemeral=False)
             return
 
-        logger.info(f"User {interaction.user} fetched {len(logs)} security events from guild {interaction.guild.id}")
-        await self.paginate_embed(interaction, logs, f"⚠️ Recent Security Events (Last {len(logs)})", discord.Color.red(), "security")
+        logger.info("User %s fetched security events from guild %s", interaction.user, interaction.guild.id)
+        await self.paginate_embed(interaction, pager, "⚠️ Recent Security Events", discord.Color.red())
+
+    @app_commands.command(name="security_stats", description="Security event counts for the last hour/day/week")
+    @timed("securitybot_command_seconds", command="security_stats")
+    async def show_security_stats(self, interaction: discord.Interaction):
+        if not has_security_role(interaction.user, interaction.guild.id):
+            await interaction.response.send_message("❌ You do not have permission to view security stats.", ephemeral=False)
+            return
+
+        stats = security_stats.summary(interaction.guild.id)
+        if not stats:
+            await interaction.response.send_message("📭 No security events in the last week.", ephemeral=False)
+            return
+
+        embed = discord.Embed(title="📊 Security Stats", color=discord.Color.orange())
+        for event_type, (hour, day, week) in sorted(stats.items(), key=lambda kv: kv[1][2], reverse=True):
+            embed.add_field(name=event_type, value=f"1h: **{hour}** · 24h: **{day}** · 7d: **{week}**", inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=False)
+        logger.info("User %s fetched security stats for guild %s", interaction.user, interaction.guild.id)
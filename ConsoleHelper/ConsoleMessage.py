@@ -4,14 +4,37 @@
 #               the console (with colored output) and a log file. Useful for
 #               debugging and structured logging in CLI-based Python tools.
 #
+#               By default records are handed to a QueueHandler and written by
+#               a background QueueListener thread, so a log call on the event
+#               loop only enqueues the record; formatting, terminal and disk
+#               I/O happen off-thread. The log file rotates by size (or by time
+#               when rotate_when is set) and rotated files are gzip-compressed.
+#               An optional JSON-lines sink writes one object per record.
+#
+#               Environment overrides:
+#                 SECURITY_BOT_LOG_FILE       log file path (one per shard worker)
+#                 SECURITY_BOT_LOG_ASYNC      "0" = write synchronously
+#                 SECURITY_BOT_LOG_LEVEL      minimum level (default DEBUG)
+#                 SECURITY_BOT_LOG_MAX_BYTES  size rotation threshold
+#                 SECURITY_BOT_LOG_ROTATE     time rotation ("midnight", "H", ...)
+#                 SECURITY_BOT_JSON_LOG       path of the JSON-lines sink
+#
 # Author      : X
 # Created On  : 05/08/2025
-# Last Updated: 29/08/2025
+# Last Updated: 17/10/2026
 # Import Style: from ConsoleHelper.ConsoleMessage import ConsoleMessage
 # -----------------------------------------------------------------------------
 
+import atexit
+import copy
+import gzip
+import json
 import logging
-from datetime import datetime
+import logging.handlers
+import os
+import queue
+import shutil
+import time
 from colorama import init, Fore, Style
 
 init(autoreset=True)
@@ -20,6 +43,66 @@ init(autoreset=True)
 LOG_LEVEL = 25
 logging.addLevelName(LOG_LEVEL, "LOG")
 
+QUEUE_SIZE = 100_000
+
+
+# -------------------------
+# Rotation helpers
+# -------------------------
+def _gzip_namer(name: str) -> str:
+    return name + ".gz"
+
+
+def _gzip_rotator(source: str, dest: str):
+    """Compress the rotated file (runs on the listener thread when async)."""
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+def _file_handler(path: str, max_bytes: int, backup_count: int, rotate_when, compress: bool):
+    if rotate_when:
+        handler = logging.handlers.TimedRotatingFileHandler(
+            path, when=rotate_when, backupCount=backup_count, encoding="utf-8", delay=True
+        )
+    else:
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True
+        )
+    if compress:
+        handler.namer = _gzip_namer
+        handler.rotator = _gzip_rotator
+    return handler
+
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue a snapshot of the record; layout and I/O are left to the listener thread.
+
+    Like the stdlib QueueHandler, the message is merged and the traceback rendered
+    here, so the listener never touches args or frames the caller may still mutate."""
+
+    _exc_formatter = logging.Formatter()
+
+    def __init__(self, q):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self._exc_formatter.formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
 class ConsoleMessage:
     _instance = None  # Singleton to prevent duplicate handlers
 
@@ -28,70 +111,143 @@ class ConsoleMessage:
             cls._instance = super(ConsoleMessage, cls).__new__(cls)
         return cls._instance
 
-    def __init__(self, log_file: str = "ConsoleMessage.log", app_name: str = "Garuda Cloud Monitor", file_logging: bool = True):
+    def __init__(self, log_file: str = os.environ.get("SECURITY_BOT_LOG_FILE", "ConsoleMessage.log"), app_name: str = "Garuda Cloud Monitor", file_logging: bool = True,
+                 async_mode: bool = os.environ.get("SECURITY_BOT_LOG_ASYNC", "1") != "0",
+                 level=os.environ.get("SECURITY_BOT_LOG_LEVEL", "DEBUG"),
+                 max_bytes: int = int(os.environ.get("SECURITY_BOT_LOG_MAX_BYTES", 10 * 1024 * 1024)),
+                 backup_count: int = 5,
+                 rotate_when: str = os.environ.get("SECURITY_BOT_LOG_ROTATE") or None,
+                 compress: bool = True,
+                 json_log_file: str = os.environ.get("SECURITY_BOT_JSON_LOG") or None):
         if hasattr(self, "logger"):
             return  # Prevent reinitialization
 
         self.app_name = app_name
         self.logger = logging.getLogger(app_name)
-        self.logger.setLevel(logging.DEBUG)
+        self.logger.setLevel(level)
+        self._listener = None
+        self._queue_handler = None
 
         if not self.logger.handlers:
+            handlers = []
             # File Handler
             if file_logging:
                 file_formatter = logging.Formatter(
                     '%(asctime)s %(levelname)-8s %(name)s %(message)s',
                     datefmt='%Y-%m-%d %H:%M:%S'
                 )
-                file_handler = logging.FileHandler(log_file)
-                file_handler.setLevel(logging.DEBUG)
+                file_handler = _file_handler(log_file, max_bytes, backup_count, rotate_when, compress)
                 file_handler.setFormatter(file_formatter)
-                self.logger.addHandler(file_handler)
+                handlers.append(file_handler)
 
             # Console Handler
             console_handler = logging.StreamHandler()
-            console_handler.setLevel(logging.DEBUG)
             console_handler.setFormatter(self.ColorFormatter(app_name))
-            self.logger.addHandler(console_handler)
+            handlers.append(console_handler)
+
+            # JSON-lines sink
+            if json_log_file:
+                json_handler = _file_handler(json_log_file, max_bytes, backup_count, rotate_when, compress)
+                json_handler.setFormatter(self.JsonFormatter())
+                handlers.append(json_handler)
+
+            if async_mode:
+                self._queue_handler = _NonBlockingQueueHandler(queue.Queue(QUEUE_SIZE))
+                self._listener = logging.handlers.QueueListener(self._queue_handler.queue, *handlers)
+                self._listener.start()
+                self.logger.addHandler(self._queue_handler)
+                atexit.register(self.shutdown)
+            else:
+                for handler in handlers:
+                    self.logger.addHandler(handler)
 
     class ColorFormatter(logging.Formatter):
+        COLOR_MAP = {
+            "INFO": Fore.BLUE,
+            "DEBUG": Fore.CYAN,
+            "WARNING": Fore.YELLOW,
+            "ERROR": Fore.RED,
+            "CRITICAL": Fore.MAGENTA + Style.BRIGHT,
+            "LOG": Fore.WHITE,   # White for plain logs
+        }
+
         def __init__(self, app_name: str):
             super().__init__()
             self.app_name = app_name
+            self._stamp_second = None
+            self._stamp_text = ""
+
+        def _timestamp(self, created: float) -> str:
+            # Records arrive in bursts within the same second; format each second once
+            second = int(created)
+            if second != self._stamp_second:
+                self._stamp_second = second
+                self._stamp_text = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(second))
+            return self._stamp_text
 
         def format(self, record):
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            timestamp = self._timestamp(record.created)
             message = record.getMessage()
 
-            color_map = {
-                "INFO": Fore.BLUE,
-                "DEBUG": Fore.CYAN,
-                "WARNING": Fore.YELLOW,
-                "ERROR": Fore.RED,
-                "CRITICAL": Fore.MAGENTA + Style.BRIGHT,
-                "LOG": Fore.WHITE,   # White for plain logs
-            }
-
             if record.levelname == "LOG":
                 # Replace "LOG" with "Appname" in console
                 level_text = self.app_name
                 color = Fore.WHITE
             else:
                 level_text = record.levelname
-                color = color_map.get(record.levelname, "")
+                color = self.COLOR_MAP.get(record.levelname, "")
 
             level_colored = f"{color}{level_text:<8}{Style.RESET_ALL}"
+            if record.exc_info and not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+            if record.exc_text:
+                message = f"{message}\n{record.exc_text}"
             return f"{timestamp} {level_colored}:  {self.app_name} {message}"
 
-    # Log level wrappers
-    def info(self, msg): self.logger.info(msg)
-    def debug(self, msg): self.logger.debug(msg)
-    def warning(self, msg): self.logger.warning(msg)
-    def error(self, msg): self.logger.error(msg)
-    def critical(self, msg): self.logger.critical(msg)
-
-    def log(self, msg):
-        self.logger.log(LOG_LEVEL, msg)
+    class JsonFormatter(logging.Formatter):
+        def format(self, record):
+            entry = {
+                "ts": record.created,
+                "level": record.levelname,
+                "logger": record.name,
+                "thread": record.threadName,
+                "msg": record.getMessage(),
+            }
+            if record.exc_info and not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+            if record.exc_text:
+                entry["exc"] = record.exc_text
+            return json.dumps(entry, ensure_ascii=False)
+
+    # Log level wrappers (extra args are %-formatted lazily, only if the level is enabled)
+    def info(self, msg, *args): self.logger.info(msg, *args)
+    def debug(self, msg, *args): self.logger.debug(msg, *args)
+    def warning(self, msg, *args): self.logger.warning(msg, *args)
+    def error(self, msg, *args): self.logger.error(msg, *args)
+    def critical(self, msg, *args): self.logger.critical(msg, *args)
+
+    def log(self, msg, *args):
+        self.logger.log(LOG_LEVEL, msg, *args)
+
+    def is_enabled(self, level: int) -> bool:
+        return self.logger.isEnabledFor(level)
+
+    @property
+    def dropped(self) -> int:
+        """Records discarded because the queue was full."""
+        return self._queue_handler.dropped if self._queue_handler else 0
+
+    def shutdown(self):
+        """Flush queued records and stop the background writer (idempotent)."""
+        if self._listener is None:
+            return
+        listener, self._listener = self._listener, None
+        listener.stop()
+        # Anything logged after shutdown is written synchronously instead of being lost
+        self.logger.removeHandler(self._queue_handler)
+        for handler in listener.handlers:
+            self.logger.addHandler(handler)
+            handler.flush()
 
 # -----------------------------------------------------------------------------
 # End of File: ConsoleMessage.py
@@ -0,0 +1,160 @@
+# -----------------------------------------------------------------------------
+# File Name   : Database/AsyncDatabase.py
+# Description : Awaitable data-access layer on top of SQLiteConnectionPool.
+#               All writes run on one dedicated writer thread (SQLite only
+#               allows a single writer anyway), reads run on a small reader
+#               thread pool, and results are handed back to the event loop as
+#               futures so a slow fsync never stalls the gateway heartbeat.
+#               In a sharded deployment the writer thread forwards each
+#               transaction to the launcher's coordinator instead, which owns
+#               the only SQLite writer connection (see Sharding/Coordinator.py).
+#
+# Author      : X
+# Created On  : 17/10/2026
+# Last Updated: 17/10/2026
+# Import Style: from Database.AsyncDatabase import db
+# -----------------------------------------------------------------------------
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from Database.MySqlConnect import SQLiteConnectionPool, pool
+from Monitoring.Metrics import metrics
+from Sharding.Coordinator import coordinator
+from ConsoleHelper.ConsoleMessage import ConsoleMessage
+
+logger = ConsoleMessage()
+
+
+# -------------------------
+# Write units
+# -------------------------
+# Module-level so they can be sent to the coordinator (pickled by reference)
+def execute_statement(conn, query, params=()):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, params)
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
+
+def execute_many(conn, query, seq_of_params):
+    cursor = conn.cursor()
+    try:
+        cursor.executemany(query, seq_of_params)
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
+
+class AsyncDatabase:
+    """Run SQLite work off the event loop (single writer, N readers)."""
+
+    def __init__(self, pool: SQLiteConnectionPool, readers: int = 2):
+        self._pool = pool
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-writer")
+        self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="sqlite-reader")
+        self.write_transactions = 0
+        self.read_queries = 0
+
+    # -------------------------
+    # Thread-side workers
+    # -------------------------
+    def write_local(self, fn, args):
+        """Run fn(conn, *args) in one transaction on this process's writer connection."""
+        with self._pool.get_connection() as conn:
+            try:
+                result = fn(conn, *args)
+                conn.commit()
+                return result
+            except Exception:
+                conn.rollback()
+                raise
+
+    def _write(self, fn, args):
+        if coordinator.connected:
+            result = coordinator.write(fn, args)
+        else:
+            result = self.write_local(fn, args)
+        self.write_transactions += 1
+        return result
+
+    def _read(self, fn, args):
+        with self._pool.get_reader() as conn:
+            self.read_queries += 1
+            return fn(conn, *args)
+
+    # -------------------------
+    # Generic entry points
+    # -------------------------
+    async def run_write(self, fn, *args):
+        """Run fn(conn, *args) on the writer thread inside one transaction.
+
+        fn must be a module-level function: when sharded it is sent to the coordinator."""
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            return await loop.run_in_executor(self._writer, self._write, fn, args)
+        finally:
+            metrics.observe("securitybot_db_seconds", time.perf_counter() - start, op="run_write")
+
+    async def run_read(self, fn, *args):
+        """Run fn(conn, *args) on a reader thread."""
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            return await loop.run_in_executor(self._readers, self._read, fn, args)
+        finally:
+            metrics.observe("securitybot_db_seconds", time.perf_counter() - start, op="run_read")
+
+    def write_blocking(self, fn, *args):
+        """run_write for synchronous callers; blocks the calling thread."""
+        return self._write(fn, args)
+
+    # -------------------------
+    # Query helpers
+    # -------------------------
+    async def execute(self, query, params=()):
+        """Execute a write query; returns the affected row count."""
+        return await self.run_write(execute_statement, query, params)
+
+    async def executemany(self, query, seq_of_params):
+        """Execute a write query for every parameter tuple in one transaction."""
+        return await self.run_write(execute_many, query, list(seq_of_params))
+
+    async def fetch_one(self, query, params=()):
+        """Fetch one row."""
+        def work(conn):
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query, params)
+                return cursor.fetchone()
+            finally:
+                cursor.close()
+        return await self.run_read(work)
+
+    async def fetch_all(self, query, params=()):
+        """Fetch multiple rows."""
+        def work(conn):
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query, params)
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+        return await self.run_read(work)
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker threads, finishing queued work first when wait=True."""
+        self._writer.shutdown(wait=wait)
+        self._readers.shutdown(wait=wait)
+        self._pool.close()
+        logger.debug("Async database workers stopped.")
+
+
+db = AsyncDatabase(pool)
+
+# -----------------------------------------------------------------------------
+# End of File: AsyncDatabase.py
+# -----------------------------------------------------------------------------
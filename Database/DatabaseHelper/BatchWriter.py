@@ -0,0 +1,129 @@
+# -----------------------------------------------------------------------------
+# File Name   : Database/DatabaseHelper/BatchWriter.py
+# Description : Write-coalescing buffer for append-only tables. Rows are queued
+#               in memory and flushed with executemany() in ONE transaction
+#               every `flush_interval` seconds or `max_rows` rows, whichever
+#               comes first, so a raid costs one WAL fsync per batch instead of
+#               one per event. The queue is bounded (callers wait when it is
+#               full) and stop() drains everything before returning.
+#
+# Author      : X
+# Created On  : 17/10/2026
+# Last Updated: 17/10/2026
+# Import Style: from Database.DatabaseHelper.BatchWriter import batch_writer
+# -----------------------------------------------------------------------------
+import asyncio
+
+from Database.AsyncDatabase import db, AsyncDatabase
+from ConsoleHelper.ConsoleMessage import ConsoleMessage
+
+logger = ConsoleMessage()
+
+
+class BatchWriter:
+    """Buffer (query, params) rows and flush them in batches on the writer thread."""
+
+    def __init__(self, database: AsyncDatabase, max_rows: int = 500,
+                 flush_interval: float = 0.25, max_queue: int = 10000):
+        self._db = database
+        self._max_rows = max_rows
+        self._flush_interval = flush_interval
+        self._max_queue = max_queue
+        self._queue = None
+        self._task = None
+        self._closing = False
+        self.rows_written = 0
+        self.flushes = 0
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            if self._queue is None:
+                self._queue = asyncio.Queue(maxsize=self._max_queue)
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Flush every queued row, then stop the background task."""
+        if self._task is None:
+            return
+        self._closing = True
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._closing = False
+        logger.debug(f"Batch writer drained ({self.rows_written} rows in {self.flushes} flushes).")
+
+    # -------------------------
+    # Producer side
+    # -------------------------
+    async def put(self, query: str, params: tuple):
+        """Queue one row; waits when the buffer is full (backpressure)."""
+        if self._closing:
+            raise RuntimeError("Batch writer is shutting down")
+        self._ensure_started()
+        await self._queue.put((query, params))
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    # -------------------------
+    # Consumer side
+    # -------------------------
+    async def _collect(self):
+        """Wait for one row, then gather more until max_rows or the flush deadline."""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self._flush_interval
+        while len(batch) < self._max_rows:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                if self._closing:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+        return batch
+
+    @staticmethod
+    def _flush(conn, grouped):
+        cursor = conn.cursor()
+        try:
+            for query, rows in grouped.items():
+                cursor.executemany(query, rows)
+        finally:
+            cursor.close()
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            grouped = {}
+            for query, params in batch:
+                grouped.setdefault(query, []).append(params)
+            try:
+                await self._db.run_write(self._flush, grouped)
+                self.rows_written += len(batch)
+                self.flushes += 1
+            except Exception as e:
+                logger.error(f" Batch flush of {len(batch)} rows failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
+batch_writer = BatchWriter(db)
+
+# -----------------------------------------------------------------------------
+# End of File: BatchWriter.py
+# -----------------------------------------------------------------------------
@@ -1,29 +1,126 @@
+import asyncio
+import re
 import threading
-from Database.MySqlConnect import SQLiteConnectionPool
+from dataclasses import dataclass
+from Database.MySqlConnect import pool
+from Database.AsyncDatabase import db, execute_statement
+from Monitoring.Metrics import timed
+from Sharding.Coordinator import coordinator
+from Sharding.ShardContext import shard_context
 from ConsoleHelper.ConsoleMessage import ConsoleMessage  # For logging
 
-pool = SQLiteConnectionPool()
 logger = ConsoleMessage()
 
 # -------------------------
 # In-Memory Mirrors
 # -------------------------
 _guild_settings = {}  # {guild_id: {setting_key: setting_value}}
-_whitelists = {}      # {guild_id: [{entity_type, entity_id, value}]}
+_whitelists = {}      # {guild_id: {(entity_type, entity_id, value): {entity_type, entity_id, value}}}
+_whitelist_index = {} # {guild_id: WhitelistIndex}, compiled from _whitelists
 _lock = threading.Lock()
+_settings_listeners = []  # callbacks(guild_id | None) fired after a settings change
+_generations = {}         # {(mirror, guild_id): n}, bumped by every change to that guild's mirror
+
+
+def add_settings_listener(callback):
+    """Register callback(guild_id) run after a guild's settings change (None = all reloaded)."""
+    _settings_listeners.append(callback)
+
+
+def _notify_settings_changed(guild_id):
+    for callback in _settings_listeners:
+        try:
+            callback(guild_id)
+        except Exception as e:
+            logger.error(f"Settings listener failed for guild {guild_id}: {e}")
+
+
+# -------------------------
+# Compiled Whitelist
+# -------------------------
+@dataclass(frozen=True)
+class WhitelistIndex:
+    """Immutable, compiled view of a guild's whitelist: ID sets plus one combined regex."""
+    users: frozenset
+    roles: frozenset
+    channels: frozenset
+    patterns: tuple
+    regex: re.Pattern | None
+
+    @classmethod
+    def from_entries(cls, entries, previous: "WhitelistIndex" = None) -> "WhitelistIndex":
+        ids = {"user": set(), "role": set(), "channel": set()}
+        patterns = []
+        for entry in entries:
+            etype, eid, val = entry["entity_type"], entry["entity_id"], entry["value"]
+            if eid is not None and etype in ids:
+                try:
+                    ids[etype].add(int(eid))
+                except (TypeError, ValueError):
+                    pass
+            if val:
+                patterns.append(val)
+        patterns = tuple(sorted(set(patterns)))
+        if previous is not None and previous.patterns == patterns:
+            regex = previous.regex  # only IDs changed: keep the compiled pattern
+        else:
+            regex = _compile_patterns(patterns)
+        return cls(frozenset(ids["user"]), frozenset(ids["role"]), frozenset(ids["channel"]), patterns, regex)
+
+    def allows_member(self, member) -> bool:
+        if member.id in self.users:
+            return True
+        return bool(self.roles) and not self.roles.isdisjoint(r.id for r in getattr(member, "roles", ()))
+
+    def allows_message(self, message) -> bool:
+        if message.channel.id in self.channels or self.allows_member(message.author):
+            return True
+        return self.regex is not None and self.regex.search(message.content or "") is not None
+
+
+def _compile_patterns(patterns):
+    valid = []
+    for pattern in patterns:
+        try:
+            re.compile(pattern)
+            valid.append(f"(?:{pattern})")
+        except re.error as e:
+            logger.warning(f"Ignoring invalid whitelist pattern {pattern!r}: {e}")
+    return re.compile("|".join(valid), re.IGNORECASE) if valid else None
+
+
+def _whitelist_key(etype, eid, val):
+    # entity_id is stored as TEXT; normalise so int and str IDs address the same entry
+    return (etype, None if eid is None else str(eid), val)
+
+
+def _rebuild_whitelist_index(guild_id):
+    """Recompile one guild's index (call with _lock held); swaps the reference atomically."""
+    entries = _whitelists.get(guild_id)
+    if not entries:
+        _whitelists.pop(guild_id, None)
+        _whitelist_index.pop(guild_id, None)
+        return
+    _whitelist_index[guild_id] = WhitelistIndex.from_entries(entries.values(), _whitelist_index.get(guild_id))
+
+
+def get_whitelist_index(guild_id):
+    """The guild's compiled whitelist, or None when it has no entries (the common case)."""
+    return _whitelist_index.get(guild_id)
 
 
 # -------------------------
 # Mirror Loaders
 # -------------------------
 def load_mirrors():
-    """Load guild_settings and whitelists into memory at startup."""
+    """Load guild_settings and whitelists of the owned guilds into memory at startup."""
     global _guild_settings, _whitelists
     with _lock:
         _guild_settings.clear()
         _whitelists.clear()
+        _whitelist_index.clear()
 
-        with pool.get_connection() as conn:
+        with pool.get_reader() as conn:
             cursor = conn.cursor()
 
             # Load guild_settings
@@ -31,6 +128,8 @@ def load_mirrors():
             rows = cursor.fetchall()
             for guild_id, key, value in rows:
                 guild_id = int(guild_id)  # Ensure int keys
+                if not shard_context.owns(guild_id):
+                    continue
                 if guild_id not in _guild_settings:
                     _guild_settings[guild_id] = {}
                 _guild_settings[guild_id][key] = value
@@ -41,16 +140,113 @@ def load_mirrors():
             rows = cursor.fetchall()
             for guild_id, etype, eid, val in rows:
                 guild_id = int(guild_id)
+                if not shard_context.owns(guild_id):
+                    continue
                 if guild_id not in _whitelists:
-                    _whitelists[guild_id] = []
-                _whitelists[guild_id].append({
+                    _whitelists[guild_id] = {}
+                _whitelists[guild_id][_whitelist_key(etype, eid, val)] = {
                     "entity_type": etype,
                     "entity_id": eid,
                     "value": val
-                })
+                }
+            for guild_id in list(_whitelists):
+                _rebuild_whitelist_index(guild_id)
             logger.debug(f"Loaded {len(rows)} whitelist entries into memory.")
 
             cursor.close()
+    _notify_settings_changed(None)
+
+
+def _bump(mirror, guild_id):
+    """Mark a guild's mirror as changed (call with _lock held); returns the new generation."""
+    generation = _generations.get((mirror, guild_id), 0) + 1
+    _generations[(mirror, guild_id)] = generation
+    return generation
+
+
+# Reloads read off the loop. If the guild's mirror changed while the read was in flight
+# (a newer reload or a local write), the rows may be stale: read again instead of applying them.
+async def reload_guild_settings(guild_id):
+    """Re-read one guild's settings (changed by another worker) into the mirror."""
+    guild_id = int(guild_id)
+    if not shard_context.owns(guild_id):
+        return
+    while True:
+        with _lock:
+            generation = _bump("settings", guild_id)
+        rows = await fetch_all_async(
+            "SELECT setting_key, setting_value FROM guild_settings WHERE guild_id=?", (guild_id,))
+        with _lock:
+            if _generations[("settings", guild_id)] != generation:
+                continue
+            _guild_settings[guild_id] = dict(rows)
+        break
+    _notify_settings_changed(guild_id)
+
+
+async def reload_guild_whitelist(guild_id):
+    """Re-read one guild's whitelist (changed by another worker) and recompile its index."""
+    guild_id = int(guild_id)
+    if not shard_context.owns(guild_id):
+        return
+    while True:
+        with _lock:
+            generation = _bump("whitelist", guild_id)
+        rows = await fetch_all_async(
+            "SELECT entity_type, entity_id, value FROM whitelists WHERE guild_id=?", (guild_id,))
+        with _lock:
+            if _generations[("whitelist", guild_id)] != generation:
+                continue
+            _whitelists[guild_id] = {
+                _whitelist_key(etype, eid, val): {"entity_type": etype, "entity_id": eid, "value": val}
+                for etype, eid, val in rows
+            }
+            _rebuild_whitelist_index(guild_id)
+        break
+
+
+_reload_tasks = set()     # strong references until the reloads finish
+
+
+def _schedule_reload(reload):
+    """Coordinator handler (runs on the loop) that starts reload(guild_id) as a task."""
+    def handler(guild_id):
+        task = asyncio.get_running_loop().create_task(reload(guild_id))
+        _reload_tasks.add(task)
+        task.add_done_callback(_reload_tasks.discard)
+    return handler
+
+
+coordinator.subscribe("guild_settings", _schedule_reload(reload_guild_settings))
+coordinator.subscribe("whitelist", _schedule_reload(reload_guild_whitelist))
+
+
+# -------------------------
+# Write Units (module-level so a sharded worker can send them to the coordinator)
+# -------------------------
+def _upsert_setting(conn, guild_id, key, value):
+    conn.execute("""
+        INSERT INTO guild_settings (guild_id, setting_key, setting_value)
+        VALUES (?, ?, ?)
+        ON CONFLICT(guild_id, setting_key)
+        DO UPDATE SET setting_value=excluded.setting_value
+    """, (guild_id, key, value))
+
+
+def _insert_whitelist(conn, guild_id, etype, eid, val):
+    return conn.execute("""
+        INSERT OR IGNORE INTO whitelists (guild_id, entity_type, entity_id, value)
+        VALUES (?, ?, ?, ?)
+    """, (guild_id, etype, eid, val)).rowcount
+
+
+def _delete_whitelist(conn, guild_id, etype, eid, val):
+    conn.execute("""
+        DELETE FROM whitelists
+        WHERE guild_id=? AND entity_type=? 
+          AND (entity_id=? OR (entity_id IS NULL AND ? IS NULL))
+          AND (value=? OR (value IS NULL AND ? IS NULL))
+    """, (guild_id, etype, eid, eid, val, val))
 
 
 # -------------------------
@@ -62,25 +258,38 @@ def get_guild_setting(guild_id, key, default=None):
     return _guild_settings.get(guild_id, {}).get(key, default)
 
 
-def set_guild_setting(guild_id, key, value):
-    """Update DB and in-memory mirror for guild_settings."""
+def get_guild_settings(guild_id):
+    """Get a copy of every stored setting for a guild."""
     guild_id = int(guild_id)
-    with pool.get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO guild_settings (guild_id, setting_key, setting_value)
-            VALUES (?, ?, ?)
-            ON CONFLICT(guild_id, setting_key)
-            DO UPDATE SET setting_value=excluded.setting_value
-        """, (guild_id, key, value))
-        conn.commit()
-        cursor.close()
-
-    # Update mirror
     with _lock:
+        return dict(_guild_settings.get(guild_id, {}))
+
+
+def _apply_setting(guild_id, key, value):
+    with _lock:
+        _bump("settings", guild_id)
         if guild_id not in _guild_settings:
             _guild_settings[guild_id] = {}
         _guild_settings[guild_id][key] = value
+    _notify_settings_changed(guild_id)
+    coordinator.publish("guild_settings", guild_id)
+
+
+def set_guild_setting(guild_id, key, value):
+    """Update DB and in-memory mirror for guild_settings.
+
+    Blocks on the write (a coordinator round trip when sharded): for scripts and
+    threads only, event-loop code uses set_guild_setting_async."""
+    guild_id = int(guild_id)
+    db.write_blocking(_upsert_setting, guild_id, key, value)
+    _apply_setting(guild_id, key, value)
+
+
+async def set_guild_setting_async(guild_id, key, value):
+    """Same as set_guild_setting, but the DB write runs on the writer thread."""
+    guild_id = int(guild_id)
+    await db.run_write(_upsert_setting, guild_id, key, value)
+    _apply_setting(guild_id, key, value)
 
 
 # -------------------------
@@ -89,75 +298,72 @@ def set_guild_setting(guild_id, key, value):
 def get_whitelist(guild_id):
     """Get whitelist entries for a guild."""
     guild_id = int(guild_id)
-    return _whitelists.get(guild_id, [])
+    return list(_whitelists.get(guild_id, {}).values())
+
+
+def _apply_whitelist_add(guild_id, etype, eid, val):
+    with _lock:
+        _bump("whitelist", guild_id)
+        if guild_id not in _whitelists:
+            _whitelists[guild_id] = {}
+        _whitelists[guild_id][_whitelist_key(etype, eid, val)] = {
+            "entity_type": etype,
+            "entity_id": eid,
+            "value": val
+        }
+        _rebuild_whitelist_index(guild_id)
+    coordinator.publish("whitelist", guild_id)
+
+
+def _apply_whitelist_remove(guild_id, etype, eid, val):
+    with _lock:
+        _bump("whitelist", guild_id)
+        if _whitelists.get(guild_id, {}).pop(_whitelist_key(etype, eid, val), None) is not None:
+            _rebuild_whitelist_index(guild_id)
+    coordinator.publish("whitelist", guild_id)
 
 
 def add_whitelist(guild_id, etype, eid=None, val=None):
-    """Add whitelist entry in DB and mirror."""
+    """Add whitelist entry in DB and mirror (blocking; event-loop code uses add_whitelist_async)."""
     guild_id = int(guild_id)
-    inserted = False
-    with pool.get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT OR IGNORE INTO whitelists (guild_id, entity_type, entity_id, value)
-            VALUES (?, ?, ?, ?)
-        """, (guild_id, etype, eid, val))
-        if cursor.rowcount > 0:
-            inserted = True
-        conn.commit()
-        cursor.close()
-
-    if inserted:
-        with _lock:
-            if guild_id not in _whitelists:
-                _whitelists[guild_id] = []
-            _whitelists[guild_id].append({
-                "entity_type": etype,
-                "entity_id": eid,
-                "value": val
-            })
+    if db.write_blocking(_insert_whitelist, guild_id, etype, eid, val) > 0:
+        _apply_whitelist_add(guild_id, etype, eid, val)
+
+
+async def add_whitelist_async(guild_id, etype, eid=None, val=None):
+    """Same as add_whitelist, but the DB write runs on the writer thread."""
+    guild_id = int(guild_id)
+    if await db.run_write(_insert_whitelist, guild_id, etype, eid, val) > 0:
+        _apply_whitelist_add(guild_id, etype, eid, val)
 
 
 def remove_whitelist(guild_id, etype, eid=None, val=None):
-    """Remove whitelist entry in DB and mirror."""
+    """Remove whitelist entry in DB and mirror (blocking; event-loop code uses remove_whitelist_async)."""
     guild_id = int(guild_id)
-    with pool.get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            DELETE FROM whitelists
-            WHERE guild_id=? AND entity_type=? 
-              AND (entity_id=? OR (entity_id IS NULL AND ? IS NULL))
-              AND (value=? OR (value IS NULL AND ? IS NULL))
-        """, (guild_id, etype, eid, eid, val, val))
-        conn.commit()
-        cursor.close()
-
-    # Update mirror
-    with _lock:
-        if guild_id in _whitelists:
-            _whitelists[guild_id] = [
-                x for x in _whitelists[guild_id]
-                if not (x["entity_type"] == etype and x["entity_id"] == eid and x["value"] == val)
-            ]
+    db.write_blocking(_delete_whitelist, guild_id, etype, eid, val)
+    _apply_whitelist_remove(guild_id, etype, eid, val)
+
+
+async def remove_whitelist_async(guild_id, etype, eid=None, val=None):
+    """Same as remove_whitelist, but the DB write runs on the writer thread."""
+    guild_id = int(guild_id)
+    await db.run_write(_delete_whitelist, guild_id, etype, eid, val)
+    _apply_whitelist_remove(guild_id, etype, eid, val)
 
 
 # -------------------------
 # Raw DB Helpers
 # -------------------------
+@timed("securitybot_db_seconds", op="execute")
 def execute(query, params=()):
-    """Execute a write query (for logs/infractions/etc)."""
-    with pool.get_connection() as conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute(query, params)
-            conn.commit()
-        finally:
-            cursor.close()
+    """Execute a write query (blocking; event-loop code uses execute_async)."""
+    db.write_blocking(execute_statement, query, params)
 
 
+@timed("securitybot_db_seconds", op="fetch_one")
 def fetch_one(query, params=()):
     """Fetch one row directly from DB (no mirror)."""
-    with pool.get_connection() as conn:
+    with pool.get_reader() as conn:
         cursor = conn.cursor()
         try:
             cursor.execute(query, params)
@@ -166,12 +372,31 @@ def fetch_one(query, params=()):
             cursor.close()
 
 
+@timed("securitybot_db_seconds", op="fetch_all")
 def fetch_all(query, params=()):
     """Fetch multiple rows directly from DB (no mirror)."""
-    with pool.get_connection() as conn:
+    with pool.get_reader() as conn:
         cursor = conn.cursor()
         try:
             cursor.execute(query, params)
             return cursor.fetchall()
         finally:
             cursor.close()
+
+
+# -------------------------
+# Async DB Helpers
+# -------------------------
+async def execute_async(query, params=()):
+    """Awaitable execute(); runs on the writer thread."""
+    return await db.execute(query, params)
+
+
+async def fetch_one_async(query, params=()):
+    """Awaitable fetch_one(); runs on a reader thread."""
+    return await db.fetch_one(query, params)
+
+
+async def fetch_all_async(query, params=()):
+    """Awaitable fetch_all(); runs on a reader thread."""
+    return await db.fetch_all(query, params)
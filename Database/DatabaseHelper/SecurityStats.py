@@ -0,0 +1,155 @@
+# -----------------------------------------------------------------------------
+# File Name   : Database/DatabaseHelper/SecurityStats.py
+# Description : Incremental per-guild security counters for /security_stats.
+#               Every (guild, event_type) keeps two fixed rings: 60 one-minute
+#               buckets (last hour) and 168 one-hour buckets (last day/week).
+#               record() is O(1); a query sums a constant number of buckets and
+#               never touches security_events. Touched buckets are persisted to
+#               security_stats_buckets by flush() and reloaded at startup, and
+#               query results are cached per guild for a few seconds.
+#
+# Author      : X
+# Created On  : 17/10/2026
+# Last Updated: 17/10/2026
+# Import Style: from Database.DatabaseHelper.SecurityStats import security_stats
+# -----------------------------------------------------------------------------
+import time
+from array import array
+
+from Database.AsyncDatabase import db, AsyncDatabase
+from Sharding.ShardContext import shard_context
+from ConsoleHelper.ConsoleMessage import ConsoleMessage
+
+logger = ConsoleMessage()
+
+MINUTE_SLOTS = 60
+HOUR_SLOTS = 168
+STATS_CACHE_SECONDS = 5
+
+UPSERT_QUERY = """
+    INSERT INTO security_stats_buckets (guild_id, event_type, granularity, bucket, count)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(guild_id, event_type, granularity, bucket) DO UPDATE SET count=excluded.count
+"""
+
+
+def _persist(conn, rows, minute_cutoff, hour_cutoff):
+    conn.executemany(UPSERT_QUERY, rows)
+    conn.execute("""
+        DELETE FROM security_stats_buckets
+        WHERE (granularity='minute' AND bucket <= ?) OR (granularity='hour' AND bucket <= ?)
+    """, (minute_cutoff, hour_cutoff))
+
+
+class _Ring:
+    """Fixed ring of counters indexed by absolute bucket number (minute or hour since epoch)."""
+
+    __slots__ = ("counts", "buckets")
+
+    def __init__(self, slots: int):
+        self.counts = array("I", bytes(4 * slots))
+        self.buckets = array("q", [-1]) * slots     # absolute bucket stored in each slot
+
+    def add(self, bucket: int, amount: int = 1) -> int:
+        slot = bucket % len(self.counts)
+        if self.buckets[slot] > bucket:
+            return 0    # older than the ring span; the slot already holds a newer bucket
+        if self.buckets[slot] != bucket:
+            self.buckets[slot] = bucket
+            self.counts[slot] = 0
+        self.counts[slot] += amount
+        return self.counts[slot]
+
+    def total(self, newest: int, span: int) -> int:
+        """Sum of the `span` buckets ending at `newest` (stale slots are skipped)."""
+        oldest = newest - span
+        return sum(c for c, b in zip(self.counts, self.buckets) if oldest < b <= newest)
+
+
+class SecurityStats:
+    def __init__(self, database: AsyncDatabase):
+        self._db = database
+        self._rings = {}        # guild_id -> {event_type: (minute ring, hour ring)}
+        self._dirty = {}        # (guild_id, event_type, granularity, bucket) -> count
+        self._cache = {}        # guild_id -> (expires_at, summary)
+
+    # -------------------------
+    # Recording
+    # -------------------------
+    def record(self, guild_id: int, event_type: str, amount: int = 1, now: float = None):
+        now = time.time() if now is None else now
+        guild_id = int(guild_id)
+        minute, hour = int(now // 60), int(now // 3600)
+        minutes, hours = self._get_rings(guild_id, event_type)
+        for granularity, ring, bucket in (("minute", minutes, minute), ("hour", hours, hour)):
+            count = ring.add(bucket, amount)
+            if count:
+                self._dirty[(guild_id, event_type, granularity, bucket)] = count
+
+    def _get_rings(self, guild_id: int, event_type: str):
+        events = self._rings.setdefault(guild_id, {})
+        rings = events.get(event_type)
+        if rings is None:
+            rings = events[event_type] = (_Ring(MINUTE_SLOTS), _Ring(HOUR_SLOTS))
+        return rings
+
+    # -------------------------
+    # Queries
+    # -------------------------
+    def summary(self, guild_id: int, now: float = None):
+        """{event_type: (last_hour, last_day, last_week)}, cached for STATS_CACHE_SECONDS."""
+        now = time.time() if now is None else now
+        guild_id = int(guild_id)
+        cached = self._cache.get(guild_id)
+        if cached and cached[0] > now:
+            return cached[1]
+        minute, hour = int(now // 60), int(now // 3600)
+        result = {}
+        for event_type, (minutes, hours) in self._rings.get(guild_id, {}).items():
+            counts = (minutes.total(minute, 60), hours.total(hour, 24), hours.total(hour, 168))
+            if any(counts):
+                result[event_type] = counts
+        self._cache[guild_id] = (now + STATS_CACHE_SECONDS, result)
+        return result
+
+    # -------------------------
+    # Persistence
+    # -------------------------
+    async def load(self, now: float = None):
+        """Reload the buckets still inside their ring span."""
+        now = time.time() if now is None else now
+        minute, hour = int(now // 60), int(now // 3600)
+        rows = await self._db.fetch_all("""
+            SELECT guild_id, event_type, granularity, bucket, count FROM security_stats_buckets
+            WHERE (granularity='minute' AND bucket > ?) OR (granularity='hour' AND bucket > ?)
+        """, (minute - MINUTE_SLOTS, hour - HOUR_SLOTS))
+        for guild_id, event_type, granularity, bucket, count in rows:
+            if not shard_context.owns(guild_id):
+                continue
+            minutes, hours = self._get_rings(int(guild_id), event_type)
+            (minutes if granularity == "minute" else hours).add(int(bucket), int(count))
+        logger.debug(f"Loaded {len(rows)} security stat buckets.")
+
+    async def flush(self, now: float = None):
+        """Persist touched buckets and drop rows that fell out of the rings."""
+        if not self._dirty:
+            return 0
+        now = time.time() if now is None else now
+        dirty, self._dirty = self._dirty, {}
+        rows = [(gid, event_type, granularity, bucket, count)
+                for (gid, event_type, granularity, bucket), count in dirty.items()]
+        minute, hour = int(now // 60), int(now // 3600)
+        try:
+            await self._db.run_write(_persist, rows, minute - MINUTE_SLOTS, hour - HOUR_SLOTS)
+        except Exception as e:
+            self._dirty = {**dirty, **self._dirty}
+            logger.error(f"Failed to persist {len(rows)} security stat buckets: {e}")
+            return 0
+        return len(rows)
+
+
+security_stats = SecurityStats(db)
+
+# -----------------------------------------------------------------------------
+# End of File: SecurityStats.py
+# -----------------------------------------------------------------------------
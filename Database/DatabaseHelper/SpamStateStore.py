@@ -0,0 +1,135 @@
+# -----------------------------------------------------------------------------
+# File Name   : Database/DatabaseHelper/SpamStateStore.py
+# Description : Write-behind, in-memory store for the anti_spam warning and
+#               timeout state. Memory is authoritative for reads; changed rows
+#               are marked dirty and persisted to the anti_spam table in one
+#               batched UPSERT by flush(). Entries whose warning has expired
+#               (per guild warning_expiry) and whose timeout is over are evicted.
+#               Active rows are warm-loaded once at startup. Each dirty key
+#               carries a version, so a failed flush re-queues only what it
+#               snapshotted and nobody has changed since; keys being flushed
+#               are never evicted.
+#
+# Author      : X
+# Created On  : 17/10/2026
+# Last Updated: 17/10/2026
+# Import Style: from Database.DatabaseHelper.SpamStateStore import spam_state
+# -----------------------------------------------------------------------------
+import itertools
+from datetime import datetime, timedelta, timezone
+
+from Database.AsyncDatabase import db, AsyncDatabase
+from Sharding.ShardContext import shard_context
+from ConsoleHelper.ConsoleMessage import ConsoleMessage
+
+logger = ConsoleMessage()
+
+UPSERT_QUERY = """
+    INSERT INTO anti_spam (guild_id, user_id, warnings, last_warning, timeout_until)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(guild_id, user_id) DO UPDATE SET
+        warnings=excluded.warnings,
+        last_warning=excluded.last_warning,
+        timeout_until=excluded.timeout_until
+"""
+
+
+def _parse(ts):
+    return datetime.fromisoformat(ts).replace(tzinfo=timezone.utc) if ts else None
+
+
+class SpamStateStore:
+    """{(guild_id, user_id): (warnings, last_warning, timeout_until)} with write-behind."""
+
+    def __init__(self, database: AsyncDatabase):
+        self._db = database
+        self._entries = {}
+        self._dirty = {}        # key -> version of its latest set()
+        self._in_flight = {}    # key -> version a running flush is writing
+        self._version = itertools.count()
+
+    def __len__(self):
+        return len(self._entries)
+
+    # -------------------------
+    # Startup
+    # -------------------------
+    async def load_active(self):
+        """Warm-load rows that still carry warnings or a timeout."""
+        rows = await self._db.fetch_all(
+            "SELECT guild_id, user_id, warnings, last_warning, timeout_until FROM anti_spam "
+            "WHERE warnings > 0 OR timeout_until IS NOT NULL"
+        )
+        for guild_id, user_id, warnings, last_warning, timeout_until in rows:
+            if not shard_context.owns(guild_id):
+                continue
+            self._entries[(int(guild_id), int(user_id))] = (warnings or 0, _parse(last_warning), _parse(timeout_until))
+        logger.debug(f"Loaded {len(rows)} anti-spam states into memory.")
+
+    # -------------------------
+    # Accessors (memory only)
+    # -------------------------
+    def get(self, guild_id: int, user_id: int):
+        return self._entries.get((guild_id, user_id), (0, None, None))
+
+    def set(self, guild_id: int, user_id: int, warnings: int, last_warning: datetime, timeout_until: datetime):
+        key = (guild_id, user_id)
+        self._entries[key] = (warnings, last_warning, timeout_until)
+        self._dirty[key] = next(self._version)
+
+    # -------------------------
+    # Persistence / eviction
+    # -------------------------
+    async def flush(self):
+        """Persist every dirty entry in one transaction."""
+        if not self._dirty:
+            return 0
+        dirty, self._dirty = self._dirty, {}
+        self._in_flight.update(dirty)
+        rows = []
+        for key in dirty:
+            warnings, last_warning, timeout_until = self._entries.get(key, (0, None, None))
+            rows.append((
+                key[0],
+                key[1],
+                warnings,
+                last_warning.isoformat() if last_warning else None,
+                timeout_until.isoformat() if timeout_until else None
+            ))
+        try:
+            await self._db.executemany(UPSERT_QUERY, rows)
+        except Exception as e:
+            # A key set() again meanwhile is already dirty with a newer version
+            for key, version in dirty.items():
+                if key in self._entries and key not in self._dirty:
+                    self._dirty[key] = version
+            logger.error(f"Failed to persist {len(rows)} anti-spam states: {e}")
+            return 0
+        finally:
+            for key, version in dirty.items():
+                if self._in_flight.get(key) == version:
+                    del self._in_flight[key]
+        return len(rows)
+
+    def evict_expired(self, now: datetime, expiry_for):
+        """Drop clean entries whose warning expired and whose timeout is over.
+
+        expiry_for(guild_id) returns that guild's warning_expiry in seconds.
+        """
+        expired = []
+        for key, (warnings, last_warning, timeout_until) in self._entries.items():
+            if key in self._dirty or key in self._in_flight or (timeout_until and timeout_until > now):
+                continue
+            if last_warning and now - last_warning <= timedelta(seconds=expiry_for(key[0])):
+                continue
+            expired.append(key)
+        for key in expired:
+            del self._entries[key]
+        return len(expired)
+
+
+spam_state = SpamStateStore(db)
+
+# -----------------------------------------------------------------------------
+# End of File: SpamStateStore.py
+# -----------------------------------------------------------------------------
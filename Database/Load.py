@@ -0,0 +1,7 @@
+from discord.ext import commands
+from Database.Retention import RetentionCog
+from Sharding.ShardContext import shard_context
+
+async def setup(bot: commands.Bot):
+    if shard_context.primary:  # deployment-wide job: only worker 0 runs it when sharded
+        await bot.add_cog(RetentionCog(bot))
\ No newline at end of file
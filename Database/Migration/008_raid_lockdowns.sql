@@ -0,0 +1,7 @@
+CREATE TABLE IF NOT EXISTS raid_lockdowns (
+    guild_id           TEXT PRIMARY KEY,
+    strategy           TEXT NOT NULL,      -- "channels" or "role"
+    role_permissions   INTEGER,            -- @everyone permission bitfield before lockdown
+    channel_overwrites TEXT,               -- JSON {channel_id: [allow, deny] | null} before lockdown
+    locked_at          TIMESTAMP NOT NULL
+);
@@ -0,0 +1,7 @@
+CREATE TABLE IF NOT EXISTS scheduled_deadlines (
+    kind      TEXT NOT NULL,     -- e.g. "raid_timeout_end", "raid_mute_end", "spam_timeout_end"
+    guild_id  TEXT NOT NULL,
+    target_id TEXT NOT NULL,     -- member id (0 for guild-wide deadlines)
+    deadline  REAL NOT NULL,     -- unix timestamp (seconds)
+    PRIMARY KEY (kind, guild_id, target_id)
+);
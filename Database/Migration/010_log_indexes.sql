@@ -0,0 +1,7 @@
+-- Covering indexes for /logs_audit and /logs_security: newest-first keyset
+-- pages per guild are answered from the index alone (id is the rowid).
+CREATE INDEX IF NOT EXISTS idx_audit_logs_guild_time
+    ON audit_logs (guild_id, timestamp, id, event_type, actor_id, target_id, details);
+
+CREATE INDEX IF NOT EXISTS idx_security_events_guild_time
+    ON security_events (guild_id, detected_at, id, event_type, details);
@@ -0,0 +1,9 @@
+CREATE TABLE IF NOT EXISTS log_rollups (
+    source       TEXT NOT NULL,     -- "security_events" or "audit_logs"
+    guild_id     TEXT NOT NULL,
+    granularity  TEXT NOT NULL,     -- "hour" or "day"
+    bucket_start TEXT NOT NULL,     -- e.g. "2026-10-17T13:00:00" / "2026-10-17"
+    event_type   TEXT NOT NULL,
+    count        INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (source, guild_id, granularity, bucket_start, event_type)
+);
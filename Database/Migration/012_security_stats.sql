@@ -0,0 +1,8 @@
+CREATE TABLE IF NOT EXISTS security_stats_buckets (
+    guild_id    TEXT NOT NULL,
+    event_type  TEXT NOT NULL,
+    granularity TEXT NOT NULL,      -- "minute" or "hour"
+    bucket      INTEGER NOT NULL,   -- minutes / hours since the unix epoch
+    count       INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (guild_id, event_type, granularity, bucket)
+);
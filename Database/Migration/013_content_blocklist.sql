@@ -0,0 +1,8 @@
+CREATE TABLE IF NOT EXISTS content_blocklist (
+    guild_id    TEXT NOT NULL,
+    kind        TEXT NOT NULL,      -- "domain", "invite" or "keyword"
+    pattern     TEXT NOT NULL,      -- normalized (lowercase host / invite code / phrase)
+    added_by    TEXT,
+    created_at  TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (guild_id, kind, pattern)
+);
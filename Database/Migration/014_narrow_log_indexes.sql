@@ -0,0 +1,11 @@
+-- Replace the covering indexes from 010: carrying `details` (free text, up to
+-- a few KB per row) duplicated the log bodies and made every insert write them
+-- twice. (guild_id, time, id) still answers the newest-first keyset seek from
+-- the index; the few rows of a page are then read from the table by rowid.
+DROP INDEX IF EXISTS idx_audit_logs_guild_time;
+CREATE INDEX IF NOT EXISTS idx_audit_logs_guild_time
+    ON audit_logs (guild_id, timestamp, id);
+
+DROP INDEX IF EXISTS idx_security_events_guild_time;
+CREATE INDEX IF NOT EXISTS idx_security_events_guild_time
+    ON security_events (guild_id, detected_at, id);
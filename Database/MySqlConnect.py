@@ -7,49 +7,146 @@
 #
 # Author      : X
 # Created On  : 17/08/2025
-# Last Updated: 29/08/2025
-# Import Style:
+# Last Updated: 17/10/2026
+# Import Style: from Database.MySqlConnect import pool, run_migrations
 # -----------------------------------------------------------------------------
+import os
 import sqlite3
 import threading
+import time
 from pathlib import Path
 from datetime import datetime
 
+from Monitoring.Metrics import metrics
 from ConsoleHelper.ConsoleMessage import ConsoleMessage
 
 # Initialize logger
 logger = ConsoleMessage()
 
-DB_FILE = "database.db"
+DB_FILE = os.environ.get("SECURITY_BOT_DB", "database.db")   # override for benchmarks/tests
 MIGRATIONS_DIR = Path(__file__).parent / "Migration"   # ✅ lowercase recommended
 
 
 # -----------------------------------------------------------------------------
 # Connection Pool with Context Manager Support
 # -----------------------------------------------------------------------------
+# Applied to every connection at connect time
+CONNECTION_PRAGMAS = (
+    "PRAGMA auto_vacuum=INCREMENTAL;",  # only takes effect on a new database (before its first table)
+    "PRAGMA journal_mode=WAL;",       # ✅ better concurrency
+    "PRAGMA synchronous=NORMAL;",     # WAL is still durable across app crashes
+    "PRAGMA busy_timeout=5000;",      # wait for locks instead of failing at once
+    "PRAGMA cache_size=-16000;",      # 16 MiB page cache per connection
+    "PRAGMA mmap_size=268435456;",    # 256 MiB memory-mapped reads
+    "PRAGMA temp_store=MEMORY;",
+)
+STATEMENT_CACHE_SIZE = 256            # per-connection LRU of prepared statements
+
+
 class SQLiteConnectionPool:
-    def __init__(self, max_connections=5):
-        self._lock = threading.Lock()
-        self._connections = []
-        self._max_connections = max_connections
+    """
+    One writer connection (checked out exclusively; re-entrant per thread) and
+    up to max_readers query_only reader connections, all opened lazily.
+    """
+
+    def __init__(self, max_readers=4, db_file=DB_FILE, cached_statements=STATEMENT_CACHE_SIZE):
+        self._cond = threading.Condition()
+        self._db_file = db_file
+        self._cached_statements = cached_statements
+        self._max_readers = max_readers
+        self._writer = None
+        self._writer_owner = None
+        self._writer_depth = 0
+        self._idle_readers = []
+        self._reader_count = 0
+        # Stats (read by Monitoring.Metrics at scrape time)
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    @property
+    def connections(self):
+        return self._reader_count + (self._writer is not None)
+
+    def _connect(self, read_only=False):
+        conn = sqlite3.connect(self._db_file, check_same_thread=False, cached_statements=self._cached_statements)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        if read_only:
+            conn.execute("PRAGMA query_only=ON;")
+        return conn
+
+    def _waited(self, started):
+        self.waits += 1
+        self.wait_seconds += time.perf_counter() - started
 
     def get_connection(self):
-        """Return a context-managed connection from pool"""
-        with self._lock:
-            if self._connections:
-                conn = self._connections.pop()
+        """Return the context-managed writer connection (use for anything that writes)."""
+        me = threading.get_ident()
+        with self._cond:
+            self.checkouts += 1
+            if self._writer_owner == me:
+                self._writer_depth += 1
+                return SQLiteConnectionContext(self, self._writer)
+            if self._writer_owner is not None:
+                started = time.perf_counter()
+                while self._writer_owner is not None:
+                    self._cond.wait()
+                self._waited(started)
+            if self._writer is None:
+                self._writer = self._connect()
+            self._writer_owner = me
+            self._writer_depth = 1
+        return SQLiteConnectionContext(self, self._writer)
+
+    def get_reader(self):
+        """Return a context-managed read-only connection."""
+        with self._cond:
+            self.checkouts += 1
+            if not self._idle_readers and self._reader_count >= self._max_readers:
+                started = time.perf_counter()
+                while not self._idle_readers:
+                    self._cond.wait()
+                self._waited(started)
+            if self._idle_readers:
+                conn = self._idle_readers.pop()
             else:
-                conn = sqlite3.connect(DB_FILE, check_same_thread=False)
-                conn.execute("PRAGMA journal_mode=WAL;")  # ✅ better concurrency
+                self._reader_count += 1
+                conn = None
+        if conn is None:
+            try:
+                conn = self._connect(read_only=True)
+            except Exception:
+                with self._cond:
+                    self._reader_count -= 1
+                    self._cond.notify_all()
+                raise
         return SQLiteConnectionContext(self, conn)
 
     def release_connection(self, conn):
-        """Return connection back to pool or close it if pool is full"""
-        with self._lock:
-            if len(self._connections) < self._max_connections:
-                self._connections.append(conn)
+        """Return connection back to pool"""
+        with self._cond:
+            if conn is self._writer:
+                if conn.in_transaction and self._writer_depth == 1:
+                    conn.rollback()     # never hand an open transaction to the next owner
+                self._writer_depth -= 1
+                if self._writer_depth:
+                    return
+                self._writer_owner = None
             else:
+                self._idle_readers.append(conn)
+            self._cond.notify_all()
+
+    def close(self):
+        """Close idle connections (the writer only if nobody holds it)."""
+        with self._cond:
+            for conn in self._idle_readers:
                 conn.close()
+            self._reader_count -= len(self._idle_readers)
+            self._idle_readers.clear()
+            if self._writer is not None and self._writer_owner is None:
+                self._writer.close()
+                self._writer = None
 
 
 class SQLiteConnectionContext:
@@ -65,6 +162,14 @@ class SQLiteConnectionContext:
         self.pool.release_connection(self.conn)
 
 
+# Process-wide pool shared by every module
+pool = SQLiteConnectionPool()
+metrics.gauge("securitybot_db_pool_connections", lambda: pool.connections)
+metrics.gauge("securitybot_db_pool_checkouts_total", lambda: pool.checkouts, kind="counter")
+metrics.gauge("securitybot_db_pool_waits_total", lambda: pool.waits, kind="counter")
+metrics.gauge("securitybot_db_pool_wait_seconds_total", lambda: pool.wait_seconds, kind="counter")
+
+
 # -----------------------------------------------------------------------------
 # Migration Runner
 # -----------------------------------------------------------------------------
@@ -0,0 +1,213 @@
+# -----------------------------------------------------------------------------
+# File Name   : Database/Retention.py
+# Description : Retention engine for the append-only security_events and
+#               audit_logs tables. Raw rows older than the guild's
+#               log_retention_days are rolled up into log_rollups (hourly and
+#               daily counts per event_type) and deleted in small batches, each
+#               its own short write transaction, so the writer is never held
+#               for long. Hourly rollups are pruned after HOURLY_ROLLUP_DAYS
+#               (daily ones are kept). Every run ends with a WAL checkpoint
+#               and, on databases already in auto_vacuum=INCREMENTAL mode, an
+#               incremental vacuum step. Converting a database is a full
+#               VACUUM that would hold the shared writer for the whole
+#               rebuild, so it is never done here; the pass logs the
+#               maintenance command instead.
+#
+# Author      : X
+# Created On  : 17/10/2026
+# Last Updated: 17/10/2026
+# Import Style: from Database.Retention import retention, RetentionCog
+# -----------------------------------------------------------------------------
+import asyncio
+from datetime import datetime, timedelta
+
+from discord.ext import commands, tasks
+
+from Database.AsyncDatabase import db, AsyncDatabase
+from Config.Config import DEFAULT_CONFIG
+from Monitoring.Metrics import metrics
+from ConsoleHelper.ConsoleMessage import ConsoleMessage
+
+logger = ConsoleMessage()
+
+RETENTION_INTERVAL_MINUTES = 60
+DELETE_BATCH = 1000              # raw rows per write transaction
+BATCH_PAUSE = 0.05               # seconds between batches, lets other writes through
+HOURLY_ROLLUP_DAYS = 90
+VACUUM_PAGES = 2000              # pages released per incremental_vacuum step
+
+# table -> timestamp column
+RETAINED_TABLES = {
+    "security_events": "detected_at",
+    "audit_logs": "timestamp",
+}
+
+_BUCKETS = (
+    ("hour", "%Y-%m-%dT%H:00:00"),
+    ("day", "%Y-%m-%d"),
+)
+
+
+# -------------------------
+# Writer-thread work
+# -------------------------
+def _next_guild(conn, table, after):
+    """Loose index scan: the next distinct guild_id after `after`."""
+    row = conn.execute(f"SELECT MIN(guild_id) FROM {table} WHERE guild_id > ?", (after,)).fetchone()
+    return row[0] if row else None
+
+
+def _rollup_batch(conn, table, column, guild_id, cutoff, limit):
+    """Roll up and delete the oldest <= limit expired rows of one guild; returns rows deleted."""
+    where = f"guild_id=? AND {column} < ?"
+    params = [guild_id, cutoff]
+    edge = conn.execute(
+        f"SELECT {column}, id FROM {table} WHERE {where} ORDER BY {column}, id LIMIT 1 OFFSET ?",
+        (*params, limit - 1)
+    ).fetchone()
+    if edge is not None:
+        where += f" AND ({column}, id) <= (?, ?)"
+        params += list(edge)
+
+    for granularity, fmt in _BUCKETS:
+        conn.execute(f"""
+            INSERT INTO log_rollups (source, guild_id, granularity, bucket_start, event_type, count)
+            SELECT ?, guild_id, ?, COALESCE(strftime('{fmt}', {column}), 'unknown'), event_type, COUNT(*)
+            FROM {table}
+            WHERE {where}
+            GROUP BY 4, 5
+            ON CONFLICT(source, guild_id, granularity, bucket_start, event_type)
+            DO UPDATE SET count = count + excluded.count
+        """, (table, granularity, *params))
+    return conn.execute(f"DELETE FROM {table} WHERE {where}", params).rowcount
+
+
+def _retention_days(conn):
+    """{guild_id: stored log_retention_days} for every guild in the deployment."""
+    return dict(conn.execute(
+        "SELECT guild_id, setting_value FROM guild_settings WHERE setting_key='log_retention_days'"
+    ).fetchall())
+
+
+def _prune_hourly(conn, cutoff, limit):
+    return conn.execute("""
+        DELETE FROM log_rollups WHERE rowid IN (
+            SELECT rowid FROM log_rollups WHERE granularity='hour' AND bucket_start < ? LIMIT ?
+        )
+    """, (cutoff, limit)).rowcount
+
+
+def _maintain(conn):
+    """Checkpoint the WAL and, in incremental mode, release free pages;
+    returns (wal pages checkpointed, auto_vacuum mode)."""
+    _, _, checkpointed = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+    auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+    if auto_vacuum == 2:
+        conn.execute(f"PRAGMA incremental_vacuum({VACUUM_PAGES})").fetchall()
+    return checkpointed, auto_vacuum
+
+
+def _days(value) -> int:
+    try:
+        days = int(value)
+    except (TypeError, ValueError):
+        days = 0
+    return days if days > 0 else int(DEFAULT_CONFIG["log_retention_days"])
+
+
+# -------------------------
+# Engine
+# -------------------------
+class RetentionEngine:
+    def __init__(self, database: AsyncDatabase):
+        self._db = database
+        self._running = asyncio.Lock()
+        self.rows_rolled_up = 0
+        self.runs = 0
+        self.vacuum_hint_logged = False
+
+    async def guild_ids(self, table: str):
+        guild_ids, after = [], ""
+        while True:
+            guild_id = await self._db.run_read(_next_guild, table, after)
+            if guild_id is None:
+                return guild_ids
+            guild_ids.append(guild_id)
+            after = guild_id
+
+    async def purge_guild(self, table: str, guild_id: str, cutoff: str) -> int:
+        column = RETAINED_TABLES[table]
+        total = 0
+        while True:
+            deleted = await self._db.run_write(_rollup_batch, table, column, guild_id, cutoff, DELETE_BATCH)
+            total += deleted
+            if deleted < DELETE_BATCH:
+                return total
+            await asyncio.sleep(BATCH_PAUSE)
+
+    async def run(self, now: datetime = None):
+        """One retention pass over both tables, then WAL/vacuum maintenance."""
+        if self._running.locked():
+            return
+        async with self._running:
+            now = now or datetime.utcnow()
+            # Read from the table, not the config mirror: the mirror only holds this
+            # worker's guilds, and this pass covers every guild in the deployment
+            stored = {str(g): v for g, v in (await self._db.run_read(_retention_days)).items()}
+            for table in RETAINED_TABLES:
+                removed = 0
+                for guild_id in await self.guild_ids(table):
+                    days = _days(stored.get(str(guild_id)))
+                    removed += await self.purge_guild(table, guild_id, (now - timedelta(days=days)).isoformat())
+                if removed:
+                    self.rows_rolled_up += removed
+                    metrics.inc("securitybot_retention_rows_total", removed, table=table)
+                    logger.info("Retention: rolled up %s expired rows from %s", removed, table)
+
+            hourly_cutoff = (now - timedelta(days=HOURLY_ROLLUP_DAYS)).strftime("%Y-%m-%dT%H:00:00")
+            while await self._db.run_write(_prune_hourly, hourly_cutoff, DELETE_BATCH) == DELETE_BATCH:
+                await asyncio.sleep(BATCH_PAUSE)
+
+            checkpointed, auto_vacuum = await self._db.run_write(_maintain)
+            if auto_vacuum != 2 and not self.vacuum_hint_logged:
+                self.vacuum_hint_logged = True
+                logger.warning(
+                    "Retention: incremental vacuum is off, freed pages are reused but never returned; "
+                    "run `PRAGMA auto_vacuum=INCREMENTAL; VACUUM;` once while the bot is stopped."
+                )
+            self.runs += 1
+            logger.debug(f"Retention pass done (WAL pages checkpointed: {checkpointed}).")
+
+
+retention = RetentionEngine(db)
+
+
+# -------------------------
+# Scheduler Cog
+# -------------------------
+class RetentionCog(commands.Cog):
+    """Runs the retention engine periodically."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        self.run_retention.start()
+
+    async def cog_unload(self):
+        self.run_retention.cancel()
+
+    @tasks.loop(minutes=RETENTION_INTERVAL_MINUTES)
+    async def run_retention(self):
+        try:
+            await retention.run()
+        except Exception as e:
+            logger.error(f"Retention pass failed: {e}")
+
+    @run_retention.before_loop
+    async def before_retention(self):
+        await self.bot.wait_until_ready()
+
+# -----------------------------------------------------------------------------
+# End of File: Retention.py
+# -----------------------------------------------------------------------------
@@ -0,0 +1,165 @@
+# -----------------------------------------------------------------------------
+# File Name   : Monitoring/LoopWatchdog.py
+# Description : Event-loop lag watchdog. A heartbeat task on the loop records
+#               scheduling lag into the metrics registry; a daemon thread
+#               notices when the heartbeat stops, samples the loop thread's
+#               stack while it is still blocked and, once the loop recovers,
+#               logs the stall duration together with the project function
+#               (cog / helper) that was running. Reports are rate-limited;
+#               every stall is still counted.
+#
+# Author      : X
+# Created On  : 17/10/2026
+# Last Updated: 17/10/2026
+# Import Style: from Monitoring.LoopWatchdog import loop_watchdog
+# -----------------------------------------------------------------------------
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+
+from Monitoring.Metrics import metrics
+from ConsoleHelper.ConsoleMessage import ConsoleMessage
+
+logger = ConsoleMessage()
+
+HEARTBEAT_INTERVAL = 0.1
+STALL_THRESHOLD = float(os.environ.get("SECURITY_BOT_STALL_THRESHOLD", "0.25"))
+MAX_SAMPLES_PER_STALL = 20
+REPORTS_PER_MINUTE = 5
+MAX_SITES = 50
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_SELF = os.path.abspath(__file__)
+
+
+def _blame(frames):
+    """Innermost frame that belongs to this project (not stdlib / site-packages)."""
+    for frame in reversed(frames):
+        path = os.path.abspath(frame.filename)
+        if path.startswith(_PROJECT_ROOT) and path != _SELF and "site-packages" not in path:
+            module = os.path.relpath(path, _PROJECT_ROOT)[:-3].replace(os.sep, ".")
+            return f"{module}:{frame.name}:{frame.lineno}"
+    if frames:
+        frame = frames[-1]
+        return f"{os.path.basename(frame.filename)}:{frame.name}:{frame.lineno}"
+    return "unknown"
+
+
+def _task_frames(frames):
+    """Drop the asyncio run-loop plumbing above the callback that was executing."""
+    for index in range(len(frames) - 1, -1, -1):
+        if frames[index].filename.endswith(os.path.join("asyncio", "events.py")):
+            return frames[index + 1:]
+    return frames
+
+
+class LoopWatchdog:
+    def __init__(self, interval: float = HEARTBEAT_INTERVAL, threshold: float = STALL_THRESHOLD):
+        self.interval = interval
+        self.threshold = threshold
+        self._loop = None
+        self._loop_thread_id = None
+        self._task = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._last_beat = 0.0
+        self._report_times = []
+        self._sites = set()
+        self.stalls = 0
+        self.suppressed = 0
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+    def start(self):
+        """Start the heartbeat on the running loop and the sampling thread (idempotent)."""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._task = self._loop.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        logger.debug(f"Loop watchdog started (stall threshold {self.threshold * 1000:.0f} ms).")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._stop.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._thread.join(timeout=1)
+        self._thread = None
+
+    # -------------------------
+    # Loop side
+    # -------------------------
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._last_beat = now
+            metrics.observe("securitybot_loop_lag_seconds", max(0.0, now - expected))
+
+    # -------------------------
+    # Watchdog thread
+    # -------------------------
+    def _watch(self):
+        poll = min(self.interval, self.threshold) / 2
+        while not self._stop.wait(poll):
+            beat = self._last_beat
+            if time.monotonic() - beat <= self.interval + self.threshold:
+                continue
+            samples = []
+            # Keep sampling until the loop ticks again
+            while self._last_beat == beat and not self._stop.is_set():
+                if len(samples) < MAX_SAMPLES_PER_STALL:
+                    frame = sys._current_frames().get(self._loop_thread_id)
+                    if frame is not None:
+                        samples.append(_task_frames(traceback.extract_stack(frame)))
+                self._stop.wait(self.threshold / 2)
+            if samples:
+                self._report(self._last_beat - beat - self.interval, samples)
+
+    def _report(self, duration: float, samples):
+        self.stalls += 1
+        sites = Counter(_blame(stack) for stack in samples)
+        site, hits = sites.most_common(1)[0]
+        if site not in self._sites and len(self._sites) >= MAX_SITES:
+            label = "other"
+        else:
+            self._sites.add(site)
+            label = site
+        metrics.inc("securitybot_loop_stalls_total", site=label)
+        metrics.observe("securitybot_loop_stall_seconds", duration)
+
+        now = time.monotonic()
+        self._report_times = [t for t in self._report_times if now - t < 60]
+        if len(self._report_times) >= REPORTS_PER_MINUTE:
+            self.suppressed += 1
+            metrics.inc("securitybot_loop_stall_reports_suppressed_total")
+            return
+        self._report_times.append(now)
+        stack = next(s for s in samples if _blame(s) == site)
+        logger.warning(
+            f"Event loop blocked for {duration * 1000:.0f} ms in {site} "
+            f"({hits}/{len(samples)} samples):\n" + "".join(traceback.format_list(stack[-8:])).rstrip()
+        )
+
+
+loop_watchdog = LoopWatchdog()
+
+# -----------------------------------------------------------------------------
+# End of File: LoopWatchdog.py
+# -----------------------------------------------------------------------------
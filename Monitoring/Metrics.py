@@ -0,0 +1,313 @@
+# -----------------------------------------------------------------------------
+# File Name   : Monitoring/Metrics.py
+# Description : Low-overhead in-process metrics: counters, HDR-style latency
+#               histograms (log-linear buckets, ~6% relative error, fixed
+#               memory) and per-guild event counters capped to the top-N
+#               guilds. Everything is exposed in Prometheus text format on a
+#               local HTTP port (GET /metrics).
+#
+#               Instrumentation helpers:
+#                 @timed("name", kind="listener")   sync or async functions
+#                 with metrics.timer("name"): ...    arbitrary blocks
+#                 metrics.observe / metrics.inc / metrics.guild_event
+#
+# Author      : X
+# Created On  : 17/10/2026
+# Last Updated: 17/10/2026
+# Import Style: from Monitoring.Metrics import metrics, timed
+# -----------------------------------------------------------------------------
+import asyncio
+import functools
+import heapq
+import inspect
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from ConsoleHelper.ConsoleMessage import ConsoleMessage
+
+logger = ConsoleMessage()
+
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = int(os.environ.get("SECURITY_BOT_METRICS_PORT", "9464"))
+GUILD_TOP_N = 20
+
+_SUB_BITS = 4
+_SUB_BUCKETS = 1 << _SUB_BITS  # per power of two -> ~6% bucket width
+_MAX_SHIFT = 32                # top bucket starts around 2**36 us (~19 hours)
+_BUCKETS = (_MAX_SHIFT + 2) * _SUB_BUCKETS
+# Prometheus export boundaries (seconds)
+_EXPORT_BOUNDS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                  0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label_text(labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+class Histogram:
+    """Log-linear histogram of durations recorded in microseconds."""
+
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * _BUCKETS
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    @staticmethod
+    def _index(us: int) -> int:
+        if us < _SUB_BUCKETS:
+            return us
+        shift = us.bit_length() - _SUB_BITS - 1
+        if shift > _MAX_SHIFT:
+            return _BUCKETS - 1
+        return (shift + 1) * _SUB_BUCKETS + (us >> shift) - _SUB_BUCKETS
+
+    @staticmethod
+    def _upper_us(index: int) -> int:
+        """Exclusive upper bound (microseconds) of a bucket."""
+        if index < _SUB_BUCKETS:
+            return index + 1
+        shift, sub = divmod(index, _SUB_BUCKETS)
+        return (_SUB_BUCKETS + sub + 1) << (shift - 1)
+
+    def record(self, seconds: float):
+        us = int(seconds * 1_000_000)
+        self.counts[self._index(us)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, pct: float) -> float:
+        """Upper bound (seconds) of the bucket holding the pct-th percentile."""
+        if not self.count:
+            return 0.0
+        target = self.count * pct / 100
+        running = 0
+        for index, n in enumerate(self.counts):
+            running += n
+            if n and running >= target:
+                return min(self._upper_us(index) / 1_000_000, self.max)
+        return self.max
+
+    def cumulative(self):
+        """Yield (le_seconds, cumulative_count) for the export boundaries."""
+        running, index = 0, 0
+        for bound in _EXPORT_BOUNDS:
+            bound_us = bound * 1_000_000
+            while index < len(self.counts) and self._upper_us(index) <= bound_us:
+                running += self.counts[index]
+                index += 1
+            yield bound, running
+
+
+class _TopGuilds:
+    """Space-saving counter: memory bounded at 4*N guilds, export capped to top N + "other".
+
+    The eviction victim comes from a min-heap of (count, seq, guild_id); nodes whose
+    count is no longer current are skipped when popped, so add() is O(log N)."""
+
+    def __init__(self, top_n: int):
+        self._top_n = top_n
+        self._capacity = top_n * 4
+        self._counts = {}
+        self._heap = []
+        self._seq = itertools.count()
+        self._total = 0
+
+    def _push(self, guild_id, count):
+        heapq.heappush(self._heap, (count, next(self._seq), guild_id))
+        # Compact once stale nodes dominate, so busy guilds can't grow the heap unbounded
+        if len(self._heap) > 2 * len(self._counts) + 64:
+            self._heap = [(c, next(self._seq), g) for g, c in self._counts.items()]
+            heapq.heapify(self._heap)
+
+    def add(self, guild_id, amount: int = 1):
+        counts = self._counts
+        self._total += amount
+        if guild_id in counts or len(counts) < self._capacity:
+            counts[guild_id] = counts.get(guild_id, 0) + amount
+        else:
+            while True:
+                floor, _, victim = heapq.heappop(self._heap)
+                if counts.get(victim) == floor:
+                    break
+            del counts[victim]
+            counts[guild_id] = floor + amount   # inherit the floor (upper bound)
+        self._push(guild_id, counts[guild_id])
+
+    def export(self):
+        ranked = sorted(self._counts.items(), key=lambda kv: kv[1], reverse=True)
+        top = ranked[:self._top_n]
+        other = max(0, self._total - sum(v for _, v in top))
+        return top, other
+
+
+class MetricsRegistry:
+    def __init__(self, guild_top_n: int = GUILD_TOP_N):
+        self._counters = {}       # (name, labels) -> value
+        self._histograms = {}     # (name, labels) -> Histogram
+        self._guild_events = {}   # event name -> _TopGuilds
+        self._gauges = {}         # name -> (callable returning a number, prometheus type)
+        self._guild_top_n = guild_top_n
+        self._server = None
+        # Recording also happens off the loop (LoopWatchdog thread, DB worker threads):
+        # dict inserts and counter updates take the lock, render() copies under it
+        self._lock = threading.Lock()
+
+    # -------------------------
+    # Recording
+    # -------------------------
+    def inc(self, name: str, amount: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram())
+        histogram.record(seconds)
+
+    def guild_event(self, event: str, guild_id, amount: int = 1):
+        tracker = self._guild_events.get(event)
+        if tracker is None:
+            with self._lock:
+                tracker = self._guild_events.setdefault(event, _TopGuilds(self._guild_top_n))
+        tracker.add(guild_id, amount)
+
+    def gauge(self, name: str, fn, kind: str = "gauge"):
+        """Register a callable sampled at scrape time (kind="counter" for monotonic totals)."""
+        with self._lock:
+            self._gauges[name] = (fn, kind)
+
+    def histogram(self, name: str, **labels):
+        return self._histograms.get((name, tuple(sorted(labels.items()))))
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    # -------------------------
+    # Export
+    # -------------------------
+    def render(self) -> str:
+        with self._lock:
+            counters = list(self._counters.items())
+            gauges = list(self._gauges.items())
+            histograms = list(self._histograms.items())
+            guild_events = list(self._guild_events.items())
+        lines = []
+        seen = set()
+
+        def header(name, kind):
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in sorted(counters):
+            header(name, "counter")
+            lines.append(f"{name}{_label_text(labels)} {value}")
+
+        for name, (fn, kind) in sorted(gauges, key=lambda item: item[0]):
+            try:
+                value = fn()
+            except Exception:
+                continue
+            header(name, kind)
+            lines.append(f"{name} {value}")
+
+        for (name, labels), histogram in sorted(histograms, key=lambda item: item[0]):
+            header(name, "histogram")
+            for bound, running in histogram.cumulative():
+                lines.append(f"{name}_bucket{_label_text(labels + (('le', bound),))} {running}")
+            lines.append(f"{name}_bucket{_label_text(labels + (('le', '+Inf'),))} {histogram.count}")
+            lines.append(f"{name}_sum{_label_text(labels)} {histogram.sum}")
+            lines.append(f"{name}_count{_label_text(labels)} {histogram.count}")
+
+        if guild_events:
+            header("securitybot_guild_events_total", "counter")
+            for event, tracker in sorted(guild_events, key=lambda item: item[0]):
+                top, other = tracker.export()
+                for guild_id, value in top:
+                    lines.append(f'securitybot_guild_events_total{{event="{event}",guild="{guild_id}"}} {value}')
+                lines.append(f'securitybot_guild_events_total{{event="{event}",guild="other"}} {other}')
+        return "\n".join(lines) + "\n"
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await asyncio.wait_for(reader.readline(), timeout=5)
+            path = request.split()[1].decode() if len(request.split()) > 1 else "/"
+            if path.startswith("/metrics"):
+                body, status = self.render().encode(), "200 OK"
+            else:
+                body, status = b"not found\n", "404 Not Found"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except Exception:
+            pass
+        finally:
+            writer.close()
+
+    async def start_server(self, host: str = METRICS_HOST, port: int = METRICS_PORT):
+        """Serve /metrics on a local port (no-op if already running)."""
+        if self._server is not None:
+            return
+        try:
+            self._server = await asyncio.start_server(self._handle, host, port)
+            logger.debug(f"Metrics endpoint listening on http://{host}:{port}/metrics")
+        except OSError as e:
+            logger.error(f"Failed to start metrics endpoint on {host}:{port}: {e}")
+
+    async def stop_server(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+metrics = MetricsRegistry()
+
+
+def timed(name: str, **labels):
+    """Decorator recording the call duration of a sync or async function into `name`."""
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    metrics.observe(name, time.perf_counter() - start, **labels)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                metrics.observe(name, time.perf_counter() - start, **labels)
+        return wrapper
+    return decorator
+
+# -----------------------------------------------------------------------------
+# End of File: Metrics.py
+# -----------------------------------------------------------------------------
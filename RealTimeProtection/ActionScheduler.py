@@ -0,0 +1,184 @@
+# -----------------------------------------------------------------------------
+# File Name   : RealTimeProtection/ActionScheduler.py
+# Description : Central scheduler for Discord mutations (permission overwrites,
+#               timeouts, kicks, bans, log messages). Every cog submits work
+#               here instead of awaiting API calls one by one:
+#                 * priority      - bans/kicks run before lockdown, which runs
+#                                   before cosmetic log embeds
+#                 * per-route     - each route ("channel:<guild_id>",
+#                   concurrency     "log:<channel_id>", ...) has its own
+#                                   in-flight cap, sized by its kind, so one
+#                                   busy guild cannot use up another guild's
+#                                   slots; plus a global cap across all routes
+#                 * dedup         - identical pending actions (same key) share
+#                                   one future
+#                 * 429 retry     - rate-limited calls sleep retry_after and
+#                                   are retried up to max_retries times
+#
+# Author      : X
+# Created On  : 17/10/2026
+# Last Updated: 17/10/2026
+# Import Style: from RealTimeProtection.ActionScheduler import action_scheduler, PRIORITY_BAN
+# -----------------------------------------------------------------------------
+import asyncio
+import heapq
+import itertools
+import time
+
+from Monitoring.Metrics import metrics
+from ConsoleHelper.ConsoleMessage import ConsoleMessage
+
+logger = ConsoleMessage()
+
+# Lower value runs first
+PRIORITY_BAN = 0
+PRIORITY_MEMBER = 10      # kick / timeout / mute / message delete
+PRIORITY_LOCKDOWN = 20
+PRIORITY_RESTORE = 30
+PRIORITY_LOG = 50
+
+DEFAULT_ROUTE_LIMITS = {
+    "channel": 10,
+    "member": 5,
+    "message": 5,
+    "role": 2,
+    "log": 1,
+}
+
+
+def _route_kind(route: str) -> str:
+    return route.split(":", 1)[0]
+
+
+def _consume_exception(future: asyncio.Future):
+    # Failures are already logged; mark them retrieved so fire-and-forget
+    # submissions don't print "exception was never retrieved".
+    if not future.cancelled():
+        future.exception()
+
+
+class ActionScheduler:
+    """Priority queue of API calls with per-route and global concurrency limits."""
+
+    def __init__(self, route_limits: dict = None, default_limit: int = 2,
+                 max_in_flight: int = 40, max_retries: int = 3):
+        self._route_limits = dict(DEFAULT_ROUTE_LIMITS, **(route_limits or {}))
+        self._default_limit = default_limit
+        self._max_in_flight = max_in_flight
+        self._max_retries = max_retries
+        self._heap = []                 # (priority, seq, route, key, factory, future)
+        self._seq = itertools.count()
+        self._pending = {}              # key -> future (queued or running)
+        self._active = {}               # route -> running count
+        self._in_flight = 0
+        self._tasks = set()             # running _run tasks (the loop only keeps weak references)
+        self._idle = asyncio.Event()    # set whenever nothing is queued or running
+        self._idle.set()
+        self.completed = 0
+        self.retries = 0
+        self.deduplicated = 0
+
+    # -------------------------
+    # Submission
+    # -------------------------
+    def submit(self, route: str, factory, priority: int = PRIORITY_MEMBER, key=None) -> asyncio.Future:
+        """Queue factory() (returns an awaitable) on `route`; returns a future with its result.
+
+        route is "<kind>:<id>", e.g. "channel:<guild_id>". Submitting a key that is
+        still pending returns the existing future instead of queueing a duplicate.
+        """
+        if key is not None and key in self._pending:
+            self.deduplicated += 1
+            return self._pending[key]
+
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume_exception)
+        if key is not None:
+            self._pending[key] = future
+        heapq.heappush(self._heap, (priority, next(self._seq), route, key, factory, future))
+        self._idle.clear()
+        self._pump()
+        return future
+
+    @property
+    def queued(self) -> int:
+        return len(self._heap)
+
+    async def drain(self):
+        """Wait until every queued and running action has finished."""
+        while self._heap or self._in_flight:
+            await self._idle.wait()
+
+    # -------------------------
+    # Dispatch
+    # -------------------------
+    def _limit(self, kind: str) -> int:
+        return self._route_limits.get(kind, self._default_limit)
+
+    def _pump(self):
+        """Start the highest-priority actions whose route still has capacity."""
+        deferred = []
+        while self._heap and self._in_flight < self._max_in_flight:
+            entry = heapq.heappop(self._heap)
+            route = entry[2]
+            if self._active.get(route, 0) >= self._limit(_route_kind(route)):
+                deferred.append(entry)
+                continue
+            self._active[route] = self._active.get(route, 0) + 1
+            self._in_flight += 1
+            task = asyncio.get_running_loop().create_task(self._run(entry))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        for entry in deferred:
+            heapq.heappush(self._heap, entry)
+
+    async def _run(self, entry):
+        _, _, route, key, factory, future = entry
+        kind = _route_kind(route)
+        try:
+            attempt = 0
+            while True:
+                start = time.perf_counter()
+                try:
+                    result = await factory()
+                    metrics.observe("securitybot_discord_api_seconds", time.perf_counter() - start, route=kind)
+                    if not future.done():
+                        future.set_result(result)
+                    break
+                except Exception as e:
+                    retry_after = getattr(e, "retry_after", None)
+                    rate_limited = getattr(e, "status", None) == 429 or retry_after is not None
+                    metrics.observe("securitybot_discord_api_seconds", time.perf_counter() - start, route=kind)
+                    metrics.inc("securitybot_discord_api_errors_total", route=kind,
+                                status=429 if rate_limited else getattr(e, "status", "error"))
+                    if rate_limited and attempt < self._max_retries:
+                        attempt += 1
+                        self.retries += 1
+                        await asyncio.sleep(retry_after if retry_after is not None else 2 ** attempt)
+                        continue
+                    logger.error(f"Scheduled action on {route} failed: {e}")
+                    if not future.done():
+                        future.set_exception(e)
+                    break
+        finally:
+            # Task cancelled (shutdown) or factory raised CancelledError: never leave
+            # the future pending, drain() and the submitters wait on it
+            if not future.done():
+                future.cancel()
+            self.completed += 1
+            self._in_flight -= 1
+            self._active[route] -= 1
+            if not self._active[route]:
+                del self._active[route]
+            if key is not None and self._pending.get(key) is future:
+                del self._pending[key]
+            self._pump()
+            if not self._heap and not self._in_flight:
+                self._idle.set()
+
+
+action_scheduler = ActionScheduler()
+
+# -----------------------------------------------------------------------------
+# End of File: ActionScheduler.py
+# -----------------------------------------------------------------------------
@@ -1,156 +1,200 @@
 import discord
-from discord.ext import commands
-from collections import defaultdict, deque
-from datetime import datetime, timedelta, timezone
-from Config.Config import get_config
+from discord.ext import commands, tasks
+import time
+from datetime import datetime, timedelta
+from Config.Config import get_guild_config
 from Database.DatabaseHelper.AuditLogger import log_security_event
-from Database.MySqlConnect import SQLiteConnectionPool
+from Database.DatabaseHelper.SpamStateStore import spam_state
+from Database.DatabaseHelper.Helper import get_whitelist_index
+from RealTimeProtection.SlidingWindow import SlidingWindowCounter, WeightedWindowCounter
+from RealTimeProtection.StateCache import BoundedStateCache
+from RealTimeProtection.ActionScheduler import action_scheduler, PRIORITY_MEMBER
+from RealTimeProtection.LogDispatcher import log_dispatcher
+from RealTimeProtection.DeadlineScheduler import deadline_scheduler
+from Monitoring.Metrics import metrics, timed
 from ConsoleHelper.ConsoleMessage import ConsoleMessage
 from discord.utils import utcnow  # for aware datetime
 
 logger = ConsoleMessage()
-pool = SQLiteConnectionPool()  # Your DB connection pool (synchronous SQLite)
+
+# Global budget for per-(guild, user) message tracking, shared by every guild
+TRACKER_MEMORY_BUDGET = 64 * 1024 * 1024   # bytes
+TRACKER_IDLE_SECONDS = 600                  # drop users silent for this long
+MENTION_TRACKER_BUDGET = 16 * 1024 * 1024   # bytes, only users who mention are tracked
+MENTION_WINDOW_SECONDS = 30
+MENTION_BURST_FACTOR = 3                    # cumulative limit = mention_limit * factor per window
+EVERYONE_MENTION_WEIGHT = 5                 # @everyone/@here counts as this many mentions
 
 class AntiSpamCog(commands.Cog):
     """Detect spam, warn users, and timeout offenders with persistent database storage."""
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.user_messages = defaultdict(lambda: deque(maxlen=100))
+        self.user_messages = BoundedStateCache(
+            lambda: SlidingWindowCounter(window=10, capacity=100),
+            max_bytes=TRACKER_MEMORY_BUDGET,
+            idle_ttl=TRACKER_IDLE_SECONDS
+        )
+        self.user_mentions = BoundedStateCache(
+            lambda: WeightedWindowCounter(window=MENTION_WINDOW_SECONDS, buckets=10),
+            max_bytes=MENTION_TRACKER_BUDGET,
+            idle_ttl=TRACKER_IDLE_SECONDS
+        )
 
     async def log_embed(self, guild: discord.Guild, title: str, description: str, color=0xFF0000):
-        channel_id = get_config(guild.id, "spam_log_channel")
-        if channel_id:
-            try:
-                channel = guild.get_channel(int(channel_id))
-                if channel:
-                    embed = discord.Embed(
-                        title=title,
-                        description=description,
-                        color=color,
-                        timestamp=utcnow()  # make aware datetime
-                    )
-                    embed.set_footer(text=f"Guild ID: {guild.id}")
-                    await channel.send(embed=embed)
-                else:
-                    logger.warn(f"Spam log channel {channel_id} not found in guild {guild.id}")
-            except Exception as e:
-                logger.error(f"Failed to send anti-spam embed in guild {guild.id}: {e}")
+        log_dispatcher.post(guild, get_guild_config(guild.id).spam_log_channel, title, description, color)
+
+    async def cog_load(self):
+        deadline_scheduler.register("spam_timeout_end", self.on_timeout_end)
+        await spam_state.load_active()
+        self.persist_spam_state.start()
+        self.sweep_trackers.start()
 
-    # --- Database Helpers ---
+    async def cog_unload(self):
+        self.persist_spam_state.cancel()
+        self.sweep_trackers.cancel()
+        await spam_state.flush()
+
+    # --- State Helpers (write-behind, memory is authoritative) ---
     def get_user_data(self, guild_id: int, user_id: int):
-        """Synchronous SQLite fetch"""
-        with pool.get_connection() as conn:
-            cur = conn.cursor()
-            cur.execute(
-                "SELECT warnings, last_warning, timeout_until FROM anti_spam WHERE guild_id=? AND user_id=?",
-                (guild_id, user_id)
-            )
-            row = cur.fetchone()
-            if row:
-                warnings, last_warning, timeout_until = row
-                if last_warning:
-                    last_warning = datetime.fromisoformat(last_warning).replace(tzinfo=timezone.utc)
-                if timeout_until:
-                    timeout_until = datetime.fromisoformat(timeout_until).replace(tzinfo=timezone.utc)
-                return warnings, last_warning, timeout_until
-            return 0, None, None
+        return spam_state.get(guild_id, user_id)
 
     def set_user_data(self, guild_id: int, user_id: int, warnings: int, last_warning: datetime, timeout_until: datetime):
-        """Synchronous SQLite insert/update"""
-        with pool.get_connection() as conn:
-            cur = conn.cursor()
-            cur.execute("""
-                INSERT INTO anti_spam (guild_id, user_id, warnings, last_warning, timeout_until)
-                VALUES (?, ?, ?, ?, ?)
-                ON CONFLICT(guild_id, user_id) DO UPDATE SET
-                    warnings=excluded.warnings,
-                    last_warning=excluded.last_warning,
-                    timeout_until=excluded.timeout_until
-            """, (
-                guild_id,
-                user_id,
-                warnings,
-                last_warning.isoformat() if last_warning else None,
-                timeout_until.isoformat() if timeout_until else None
-            ))
-            conn.commit()
+        spam_state.set(guild_id, user_id, warnings, last_warning, timeout_until)
+
+    @tasks.loop(seconds=5)
+    async def persist_spam_state(self):
+        await spam_state.flush()
+        spam_state.evict_expired(utcnow(), lambda gid: get_guild_config(gid).warning_expiry)
+
+    async def on_timeout_end(self, guild_id: int, user_id: int):
+        """Clear the stored timeout as soon as it ends so the entry can be evicted."""
+        warnings, last_warning, timeout_until = spam_state.get(guild_id, user_id)
+        if timeout_until is not None:
+            spam_state.set(guild_id, user_id, warnings, last_warning, None)
+
+    @tasks.loop(seconds=60)
+    async def sweep_trackers(self):
+        removed = self.user_messages.sweep() + self.user_mentions.sweep()
+        if removed:
+            logger.debug(
+                f"Anti-spam trackers: evicted {removed} idle, {len(self.user_messages)} entries "
+                f"(~{self.user_messages.nbytes // 1024} KiB)"
+            )
 
     # --- Message Listener ---
     @commands.Cog.listener()
+    @timed("securitybot_listener_seconds", listener="on_message")
     async def on_message(self, message: discord.Message):
         if message.author.bot or not message.guild:
             return
 
         guild = message.guild
+        metrics.guild_event("message", guild.id)
+        whitelist = get_whitelist_index(guild.id)
+        if whitelist is not None and whitelist.allows_message(message):
+            return
         now = utcnow()  # aware datetime
 
         # Load configs
-        spam_threshold = int(get_config(guild.id, "spam_threshold") or 3)
-        spam_cooldown = int(get_config(guild.id, "spam_cooldown") or 10)
-        timeout_duration = int(get_config(guild.id, "timeout_duration") or 300)
-        max_warnings = int(get_config(guild.id, "max_warnings") or 2)
-        warning_expiry = int(get_config(guild.id, "warning_expiry") or 300)
+        config = get_guild_config(guild.id)
+        spam_threshold = config.spam_threshold
+        spam_cooldown = config.spam_cooldown
 
         # Track messages
-        self.user_messages[message.author.id].append(now)
-        while self.user_messages[message.author.id] and self.user_messages[message.author.id][0] < now - timedelta(seconds=spam_cooldown):
-            self.user_messages[message.author.id].popleft()
+        mono_now = time.monotonic()
+        key = (guild.id, message.author.id)
+        window = self.user_messages.get(key, mono_now)
+        window.window = spam_cooldown
+        msg_count = window.hit(mono_now)
+
+        detection = None
+        if msg_count > spam_threshold:
+            window.clear()
+            detection = ("spam_detected", "spam", f"{msg_count} messages in {spam_cooldown}s")
+
+        # Mention spam: counts come straight from the parsed message, no content scan
+        mentions = len(message.mentions) + len(message.role_mentions)
+        if message.mention_everyone:
+            mentions += EVERYONE_MENTION_WEIGHT
+        if mentions and detection is None:
+            burst = self.user_mentions.get(key, mono_now)
+            total = burst.add(mentions, mono_now)
+            if mentions > config.mention_limit:
+                burst.clear()
+                detection = ("mention_spam", "mention spam", f"{mentions} mentions in one message")
+            elif total > config.mention_limit * MENTION_BURST_FACTOR:
+                burst.clear()
+                detection = ("mention_spam", "mention spam", f"{int(total)} mentions in {MENTION_WINDOW_SECONDS}s")
+
+        if detection is not None:
+            await self.punish(message, *detection, now)
+
+    async def punish(self, message: discord.Message, event_type: str, label: str, detail: str, now):
+        """Shared warning -> timeout ladder for every spam detector."""
+        guild = message.guild
+        config = get_guild_config(guild.id)
+        timeout_duration = config.timeout_duration
+        max_warnings = config.max_warnings
+        warning_expiry = config.warning_expiry
+
+        action_scheduler.submit(
+            f"message:{message.channel.id}", message.delete, PRIORITY_MEMBER, key=("delete", message.id)
+        )
 
-        if len(self.user_messages[message.author.id]) > spam_threshold:
-            msg_count = len(self.user_messages[message.author.id])
-            self.user_messages[message.author.id].clear()
+        # Log to security_events
+        await log_security_event(guild.id, event_type, str(message.author.id), detail)
 
+        warnings, last_warning, timeout_until = self.get_user_data(guild.id, message.author.id)
+
+        # Check timeout
+        if timeout_until and timeout_until > now:
+            return
+
+        # Reset warnings if expired
+        if last_warning and now - last_warning > timedelta(seconds=warning_expiry):
+            warnings = 0
+
+        warnings += 1
+        last_warning = now
+
+        if warnings < max_warnings:
+            self.set_user_data(guild.id, message.author.id, warnings, last_warning, None)
+            await self.log_embed(
+                guild,
+                title="Spam Warning",
+                description=f"{message.author.mention} has been warned for {label} ({warnings}/{max_warnings}).",
+                color=0xFFFF00
+            )
+        else:
+            warnings = 0
+            last_warning = None
+            until = now + timedelta(seconds=timeout_duration)
             try:
-                await message.delete()
-            except Exception:
-                pass
-
-            # Log to security_events
-            log_security_event(guild.id, "spam_detected", str(message.author.id), f"{msg_count} messages in {spam_cooldown}s")
-
-            warnings, last_warning, timeout_until = self.get_user_data(guild.id, message.author.id)
-
-            # Check timeout
-            if timeout_until and timeout_until > now:
-                return
-
-            # Reset warnings if expired
-            if last_warning and now - last_warning > timedelta(seconds=warning_expiry):
-                warnings = 0
-
-            warnings += 1
-            last_warning = now
-
-            if warnings < max_warnings:
-                self.set_user_data(guild.id, message.author.id, warnings, last_warning, None)
-                await self.log_embed(
-                    guild,
-                    title="Spam Warning",
-                    description=f"{message.author.mention} has been warned for spam ({warnings}/{max_warnings}).",
-                    color=0xFFFF00
-                )
-            else:
-                warnings = 0
-                last_warning = None
-                until = now + timedelta(seconds=timeout_duration)
-                try:
-                    if guild.me.guild_permissions.moderate_members:
-                        await message.author.edit(timed_out_until=until, reason="Exceeded spam limit")
-                        self.set_user_data(guild.id, message.author.id, warnings, last_warning, until)
-                        await self.log_embed(
-                            guild,
-                            title="User Timed Out for Spam",
-                            description=f"{message.author.mention} has been timed out for {timeout_duration // 60} minutes due to repeated spam.",
-                            color=0xFF0000
-                        )
-                    else:
-                        await self.log_embed(
-                            guild,
-                            title="Spam Detected",
-                            description=f"{message.author.mention} exceeded spam limit, but bot lacks permission to timeout.",
-                            color=0xFF0000
-                        )
-                        self.set_user_data(guild.id, message.author.id, warnings, last_warning, None)
-                except Exception as e:
-                    logger.error(f"Failed to timeout {message.author.id} in guild {guild.id}: {e}")
+                if guild.me.guild_permissions.moderate_members:
+                    await action_scheduler.submit(
+                        f"member:{guild.id}",
+                        lambda: message.author.edit(timed_out_until=until, reason="Exceeded spam limit"),
+                        PRIORITY_MEMBER, key=("timeout", guild.id, message.author.id)
+                    )
+                    self.set_user_data(guild.id, message.author.id, warnings, last_warning, until)
+                    await deadline_scheduler.schedule(
+                        "spam_timeout_end", guild.id, message.author.id, until.timestamp()
+                    )
+                    await log_security_event(guild.id, "spam_timeout", str(message.author.id), f"timed out for {timeout_duration}s")
+                    await self.log_embed(
+                        guild,
+                        title="User Timed Out for Spam",
+                        description=f"{message.author.mention} has been timed out for {timeout_duration // 60} minutes due to repeated {label}.",
+                        color=0xFF0000
+                    )
+                else:
+                    await self.log_embed(
+                        guild,
+                        title="Spam Detected",
+                        description=f"{message.author.mention} exceeded {label} limit, but bot lacks permission to timeout.",
+                        color=0xFF0000
+                    )
+                    self.set_user_data(guild.id, message.author.id, warnings, last_warning, None)
+            except Exception as e:
+                logger.error(f"Failed to timeout {message.author.id} in guild {guild.id}: {e}")
@@ -0,0 +1,208 @@
+# -----------------------------------------------------------------------------
+# File Name   : RealTimeProtection/ContentFilter.py
+# Description : Content-filter cog. Checks every guild message against the
+#               guild's blocklist of domains, invite codes and keywords
+#               (content_blocklist table) with a compiled ContentMatcher.
+#               Blocklists are mirrored in memory at load; the compiled matcher
+#               is cached per guild and dropped whenever that guild's list
+#               changes. Hits are deleted and go through the anti-spam warning
+#               -> timeout ladder. In a sharded deployment edits are announced
+#               to the other workers, which reload that guild's list.
+#
+# Author      : X
+# Created On  : 17/10/2026
+# Last Updated: 17/10/2026
+# Import Style: from RealTimeProtection.ContentFilter import ContentFilterCog
+# -----------------------------------------------------------------------------
+import asyncio
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+from discord.utils import utcnow
+
+from Config.Config import has_security_role
+from Database.AsyncDatabase import db
+from Database.DatabaseHelper.AuditLogger import log_audit, log_security_event
+from Database.DatabaseHelper.Helper import get_whitelist_index
+from RealTimeProtection.ActionScheduler import action_scheduler, PRIORITY_MEMBER
+from RealTimeProtection.ContentMatcher import ContentMatcher, KINDS, normalize_pattern
+from Monitoring.Metrics import metrics, timed
+from Sharding.Coordinator import coordinator
+from Sharding.ShardContext import shard_context
+from ConsoleHelper.ConsoleMessage import ConsoleMessage
+
+logger = ConsoleMessage()
+
+MAX_LIST_ENTRIES = 50            # entries shown per kind by /blocklist_list
+
+KIND_CHOICES = [
+    app_commands.Choice(name="Domain (blocks subdomains too)", value="domain"),
+    app_commands.Choice(name="Invite code", value="invite"),
+    app_commands.Choice(name="Keyword / phrase (whole words)", value="keyword"),
+]
+
+
+class ContentFilterCog(commands.Cog):
+    """Block messages containing blocklisted domains, invite links or keywords."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.blocklists = {}    # guild_id -> {kind: set(patterns)}
+        self.matchers = {}      # guild_id -> ContentMatcher, compiled on first use
+        self._reload_tasks = set()  # strong references until the reloads finish
+
+    async def cog_load(self):
+        rows = await db.fetch_all("SELECT guild_id, kind, pattern FROM content_blocklist")
+        for guild_id, kind, pattern in rows:
+            if shard_context.owns(guild_id):
+                self._entries(int(guild_id))[kind].add(pattern)
+        coordinator.subscribe("content_blocklist", self.on_blocklist_changed)
+        logger.debug(f"Loaded {len(rows)} content blocklist entries.")
+
+    def _entries(self, guild_id: int) -> dict:
+        entries = self.blocklists.get(guild_id)
+        if entries is None:
+            entries = self.blocklists[guild_id] = {kind: set() for kind in KINDS}
+        return entries
+
+    def get_matcher(self, guild_id: int) -> ContentMatcher | None:
+        """The guild's compiled matcher, or None when its blocklist is empty."""
+        matcher = self.matchers.get(guild_id)
+        if matcher is None:
+            entries = self.blocklists.get(guild_id)
+            if not entries or not any(entries.values()):
+                return None
+            matcher = self.matchers[guild_id] = ContentMatcher(
+                entries["domain"], entries["invite"], entries["keyword"]
+            )
+        return matcher
+
+    def on_blocklist_changed(self, guild_id: int):
+        """Another worker edited this guild's blocklist: reload it from the database."""
+        if shard_context.owns(guild_id):
+            task = asyncio.get_running_loop().create_task(self.reload_guild(guild_id))
+            self._reload_tasks.add(task)
+            task.add_done_callback(self._reload_tasks.discard)
+
+    async def reload_guild(self, guild_id: int):
+        rows = await db.fetch_all("SELECT kind, pattern FROM content_blocklist WHERE guild_id=?", (guild_id,))
+        entries = {kind: set() for kind in KINDS}
+        for kind, pattern in rows:
+            entries[kind].add(pattern)
+        self.blocklists[guild_id] = entries
+        self.matchers.pop(guild_id, None)
+
+    async def add_pattern(self, guild_id: int, kind: str, pattern: str, added_by: int = None) -> bool:
+        await db.execute("""
+            INSERT OR IGNORE INTO content_blocklist (guild_id, kind, pattern, added_by)
+            VALUES (?, ?, ?, ?)
+        """, (guild_id, kind, pattern, added_by))
+        entries = self._entries(guild_id)[kind]
+        if pattern in entries:
+            return False
+        entries.add(pattern)
+        self.matchers.pop(guild_id, None)
+        coordinator.publish("content_blocklist", guild_id)
+        return True
+
+    async def remove_pattern(self, guild_id: int, kind: str, pattern: str) -> bool:
+        await db.execute(
+            "DELETE FROM content_blocklist WHERE guild_id=? AND kind=? AND pattern=?", (guild_id, kind, pattern)
+        )
+        entries = self.blocklists.get(guild_id, {}).get(kind)
+        if not entries or pattern not in entries:
+            return False
+        entries.discard(pattern)
+        self.matchers.pop(guild_id, None)
+        coordinator.publish("content_blocklist", guild_id)
+        return True
+
+    # --- Message Listener ---
+    @commands.Cog.listener()
+    @timed("securitybot_listener_seconds", listener="on_message_content")
+    async def on_message(self, message: discord.Message):
+        if message.author.bot or not message.guild or not message.content:
+            return
+        guild = message.guild
+        whitelist = get_whitelist_index(guild.id)
+        if whitelist is not None and whitelist.allows_message(message):
+            return
+        matcher = self.get_matcher(guild.id)
+        if matcher is None:
+            return
+        hit = matcher.match(message.content)
+        if hit is None:
+            return
+
+        kind, pattern = hit
+        metrics.inc("securitybot_content_blocked_total", kind=kind)
+        detail = f"blocked {kind}: {pattern}"
+        anti_spam = self.bot.get_cog("AntiSpamCog")
+        if anti_spam is not None:
+            await anti_spam.punish(message, "blocked_content", f"posting a blocked {kind}", detail, utcnow())
+        else:
+            action_scheduler.submit(
+                f"message:{message.channel.id}", message.delete, PRIORITY_MEMBER, key=("delete", message.id)
+            )
+            await log_security_event(guild.id, "blocked_content", str(message.author.id), detail)
+
+    # --- Commands ---
+    @app_commands.command(name="blocklist_add", description="Block a domain, invite code or keyword")
+    @app_commands.describe(kind="What to block", pattern="Domain, invite link/code or phrase")
+    @app_commands.choices(kind=KIND_CHOICES)
+    async def blocklist_add(self, interaction: discord.Interaction, kind: app_commands.Choice[str], pattern: str):
+        if not has_security_role(interaction.user, interaction.guild.id):
+            await interaction.response.send_message("❌ You do not have permission to edit the blocklist.", ephemeral=True)
+            return
+        normalized = normalize_pattern(kind.value, pattern)
+        if not normalized:
+            await interaction.response.send_message(f"❌ `{pattern}` is not a valid {kind.value}.", ephemeral=True)
+            return
+        added = await self.add_pattern(interaction.guild.id, kind.value, normalized, interaction.user.id)
+        if not added:
+            await interaction.response.send_message(f"ℹ️ `{normalized}` is already blocked.", ephemeral=True)
+            return
+        await log_audit(interaction.guild.id, "blocklist_add", interaction.user.id, details=f"{kind.value}: {normalized}")
+        await interaction.response.send_message(f"✅ Blocked {kind.value} `{normalized}`", ephemeral=True)
+        logger.info("Blocklist add: %s %s by %s in guild %s", kind.value, normalized, interaction.user, interaction.guild.id)
+
+    @app_commands.command(name="blocklist_remove", description="Unblock a domain, invite code or keyword")
+    @app_commands.describe(kind="What to unblock", pattern="Domain, invite link/code or phrase")
+    @app_commands.choices(kind=KIND_CHOICES)
+    async def blocklist_remove(self, interaction: discord.Interaction, kind: app_commands.Choice[str], pattern: str):
+        if not has_security_role(interaction.user, interaction.guild.id):
+            await interaction.response.send_message("❌ You do not have permission to edit the blocklist.", ephemeral=True)
+            return
+        normalized = normalize_pattern(kind.value, pattern)
+        if not await self.remove_pattern(interaction.guild.id, kind.value, normalized):
+            await interaction.response.send_message(f"ℹ️ `{normalized}` is not blocked.", ephemeral=True)
+            return
+        await log_audit(interaction.guild.id, "blocklist_remove", interaction.user.id, details=f"{kind.value}: {normalized}")
+        await interaction.response.send_message(f"✅ Unblocked {kind.value} `{normalized}`", ephemeral=True)
+        logger.info("Blocklist remove: %s %s by %s in guild %s", kind.value, normalized, interaction.user, interaction.guild.id)
+
+    @app_commands.command(name="blocklist_list", description="Show the content blocklist")
+    async def blocklist_list(self, interaction: discord.Interaction):
+        if not has_security_role(interaction.user, interaction.guild.id):
+            await interaction.response.send_message("❌ You do not have permission to view the blocklist.", ephemeral=True)
+            return
+        entries = self.blocklists.get(interaction.guild.id)
+        if not entries or not any(entries.values()):
+            await interaction.response.send_message("📭 The blocklist is empty.", ephemeral=True)
+            return
+
+        embed = discord.Embed(title="🚫 Content Blocklist", color=discord.Color.red())
+        for kind in KINDS:
+            patterns = sorted(entries[kind])
+            if not patterns:
+                continue
+            shown = ", ".join(f"`{p}`" for p in patterns[:MAX_LIST_ENTRIES])
+            if len(patterns) > MAX_LIST_ENTRIES:
+                shown += f" … (+{len(patterns) - MAX_LIST_ENTRIES} more)"
+            embed.add_field(name=f"{kind} ({len(patterns)})", value=shown[:1024], inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+# -----------------------------------------------------------------------------
+# End of File: ContentFilter.py
+# -----------------------------------------------------------------------------
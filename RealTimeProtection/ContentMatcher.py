@@ -0,0 +1,102 @@
+# -----------------------------------------------------------------------------
+# File Name   : RealTimeProtection/ContentMatcher.py
+# Description : Compiled per-guild blocklist matcher for the content filter.
+#               A message is tokenized once and every token is a hash lookup,
+#               so the cost depends on the message length, not on how many
+#               patterns are blocked:
+#                 - links: one compiled regex pulls out invite codes and URL
+#                   hosts (a host also checks its parent domains, so blocking
+#                   "evil.com" covers "cdn.evil.com").
+#                 - keywords: whole-word phrases of up to MAX_KEYWORD_WORDS
+#                   words, looked up as word n-grams of the casefolded text.
+#                   Matching on word boundaries avoids flagging "class" for
+#                   a blocked "ass".
+#               Matchers are immutable; callers rebuild one when the guild's
+#               blocklist changes.
+#
+# Author      : X
+# Created On  : 17/10/2026
+# Last Updated: 17/10/2026
+# Import Style: from RealTimeProtection.ContentMatcher import ContentMatcher, normalize_pattern
+# -----------------------------------------------------------------------------
+import re
+
+KINDS = ("domain", "invite", "keyword")
+MAX_SCAN_CHARS = 4000            # Discord's message limit (nitro)
+MAX_KEYWORD_WORDS = 5
+
+# No scheme / userinfo groups: a host already starts after "://", "@" or ":" through the
+# lookbehind, and optional prefixes there were retried from every position (quadratic
+# on punctuation runs). Hosts can only start once per run, so a scan stays linear.
+_LINKS = re.compile(
+    r"(?:https?://)?(?:www\.)?(?:discord(?:app)?\.com/invite|discord\.(?:gg|io|me|li))/(?P<invite>[a-z0-9-]+)"
+    r"|(?<![\w.-])(?P<host>(?:[a-z0-9-]+\.)+[a-z][a-z0-9-]+)",
+    re.IGNORECASE,
+)
+_SCHEME = re.compile(r"^[a-z][a-z0-9+.-]*://", re.IGNORECASE)
+_WORDS = re.compile(r"\w+")
+
+
+def normalize_pattern(kind: str, pattern: str) -> str:
+    """Canonical form stored and matched for a blocklist entry ("" if unusable)."""
+    pattern = pattern.strip().casefold()
+    if kind == "domain":
+        host = _SCHEME.sub("", pattern).split("/", 1)[0].split(":", 1)[0].rsplit("@", 1)[-1]
+        host = host.strip(".")
+        return host[4:] if host.startswith("www.") else host
+    if kind == "invite":
+        match = _LINKS.search(pattern)
+        if match and match.group("invite"):
+            return match.group("invite").lower()
+        return pattern.rsplit("/", 1)[-1]
+    words = _WORDS.findall(pattern)
+    return " ".join(words) if len(words) <= MAX_KEYWORD_WORDS else ""
+
+
+class ContentMatcher:
+    """Immutable matcher for one guild's blocklist."""
+
+    __slots__ = ("domains", "invites", "keywords", "_max_words")
+
+    def __init__(self, domains=(), invites=(), keywords=()):
+        self.domains = frozenset(domains)
+        self.invites = frozenset(invites)
+        self.keywords = frozenset(keywords)
+        self._max_words = max((k.count(" ") + 1 for k in self.keywords), default=0)
+
+    def __len__(self):
+        return len(self.domains) + len(self.invites) + len(self.keywords)
+
+    def match(self, content: str):
+        """(kind, pattern) of the first blocked entry found in the content, else None."""
+        if not content:
+            return None
+        content = content[:MAX_SCAN_CHARS]
+        if self.domains or self.invites:
+            for link in _LINKS.finditer(content):
+                invite, host = link.group("invite", "host")
+                if invite is not None:
+                    if invite.lower() in self.invites:
+                        return "invite", invite.lower()
+                    continue
+                if self.domains:
+                    host = host.lower()
+                    while "." in host:
+                        if host in self.domains:
+                            return "domain", host
+                        host = host.split(".", 1)[1]
+        if self.keywords:
+            keywords, max_words = self.keywords, self._max_words
+            words = _WORDS.findall(content.casefold())
+            for i, phrase in enumerate(words):
+                if phrase in keywords:
+                    return "keyword", phrase
+                for word in words[i + 1:i + max_words]:
+                    phrase = f"{phrase} {word}"
+                    if phrase in keywords:
+                        return "keyword", phrase
+        return None
+
+# -----------------------------------------------------------------------------
+# End of File: ContentMatcher.py
+# -----------------------------------------------------------------------------
@@ -0,0 +1,212 @@
+# -----------------------------------------------------------------------------
+# File Name   : RealTimeProtection/DeadlineScheduler.py
+# Description : Shared min-heap of expirations (timeout end, mute end, raid
+#               quiet deadline). Each entry is (kind, guild_id, target_id) ->
+#               unix deadline; one loop timer is armed for the earliest entry,
+#               so scheduling is O(log n) and callbacks fire on time instead of
+#               on the next polling tick. Re-scheduling or cancelling a key
+#               leaves a stale heap node that is skipped when popped.
+#               Persistent entries are mirrored to scheduled_deadlines and
+#               reloaded by load(), so pending expirations survive a restart.
+#               Mirror writes are coalesced per key and flushed together every
+#               FLUSH_INTERVAL seconds, so a raid's deadlines cost one write
+#               transaction instead of one per member.
+#
+# Author      : X
+# Created On  : 17/10/2026
+# Last Updated: 17/10/2026
+# Import Style: from RealTimeProtection.DeadlineScheduler import deadline_scheduler
+# -----------------------------------------------------------------------------
+import asyncio
+import heapq
+import itertools
+import time
+
+from Database.AsyncDatabase import db, AsyncDatabase
+from Sharding.ShardContext import shard_context
+from ConsoleHelper.ConsoleMessage import ConsoleMessage
+
+logger = ConsoleMessage()
+
+FLUSH_INTERVAL = 0.25           # seconds scheduled_deadlines writes are coalesced for
+
+UPSERT_QUERY = """
+    INSERT INTO scheduled_deadlines (kind, guild_id, target_id, deadline)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(kind, guild_id, target_id) DO UPDATE SET deadline=excluded.deadline
+"""
+DELETE_QUERY = "DELETE FROM scheduled_deadlines WHERE kind=? AND guild_id=? AND target_id=?"
+
+
+def _persist(conn, upserts, deletes):
+    """Apply one flush of coalesced scheduled_deadlines changes (writer thread)."""
+    cursor = conn.cursor()
+    try:
+        cursor.executemany(DELETE_QUERY, deletes)
+        cursor.executemany(UPSERT_QUERY, upserts)
+    finally:
+        cursor.close()
+
+
+class DeadlineScheduler:
+    """Fire handler(guild_id, target_id) for each (kind, guild_id, target_id) at its deadline."""
+
+    def __init__(self, database: AsyncDatabase):
+        self._db = database
+        self._handlers = {}     # kind -> async handler(guild_id, target_id)
+        self._heap = []         # (deadline, seq, key)
+        self._live = {}         # key -> (deadline, seq, persistent)
+        self._seq = itertools.count()
+        self._timer = None
+        self._timer_at = None
+        self._tasks = set()     # running _dispatch tasks (the loop only keeps weak references)
+        self._writes = {}       # key -> deadline to upsert, or None to delete
+        self._flush_task = None
+        self.fired = 0
+
+    def __len__(self):
+        return len(self._live)
+
+    def register(self, kind: str, handler):
+        self._handlers[kind] = handler
+
+    def deadline(self, kind: str, guild_id: int, target_id: int = 0):
+        entry = self._live.get((kind, guild_id, target_id))
+        return entry[0] if entry else None
+
+    def pending(self):
+        """Snapshot of (kind, guild_id, target_id, deadline) for every live entry."""
+        return [(*key, entry[0]) for key, entry in self._live.items()]
+
+    # -------------------------
+    # Scheduling
+    # -------------------------
+    async def schedule(self, kind: str, guild_id: int, target_id: int, deadline: float, persist: bool = True):
+        """Set (or move) the deadline for a key; `deadline` is a unix timestamp."""
+        key = (kind, guild_id, target_id)
+        self._push(key, deadline, persist)
+        if persist:
+            self._write(key, deadline)
+
+    async def cancel(self, kind: str, guild_id: int, target_id: int = 0):
+        key = (kind, guild_id, target_id)
+        entry = self._live.pop(key, None)
+        if entry and entry[2]:
+            self._write(key, None)
+
+    async def load(self):
+        """Reload persisted deadlines of owned guilds (already-due ones fire immediately)."""
+        rows = await self._db.fetch_all("SELECT kind, guild_id, target_id, deadline FROM scheduled_deadlines")
+        for kind, guild_id, target_id, deadline in rows:
+            if not shard_context.owns(guild_id):
+                continue
+            self._push((kind, int(guild_id), int(target_id)), float(deadline), True)
+        logger.debug(f"Loaded {len(rows)} scheduled deadlines.")
+
+    # -------------------------
+    # Persistence
+    # -------------------------
+    def _write(self, key, deadline):
+        """Queue the mirror write for a key; the latest one per key wins."""
+        self._writes[key] = deadline
+        if self._flush_task is None:
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def _flush_later(self):
+        ok = False
+        try:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            ok = await self._flush_writes()
+        finally:
+            self._flush_task = None
+        if ok and self._writes:
+            # Written while this flush was on the writer thread
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def _flush_writes(self) -> bool:
+        if not self._writes:
+            return True
+        writes, self._writes = self._writes, {}
+        upserts = [(*key, deadline) for key, deadline in writes.items() if deadline is not None]
+        deletes = [key for key, deadline in writes.items() if deadline is None]
+        try:
+            await self._db.run_write(_persist, upserts, deletes)
+            return True
+        except Exception as e:
+            logger.error(f" Persisting {len(writes)} deadline changes failed: {e}")
+            # Retry on the next flush, unless the key was written again meanwhile
+            for key, deadline in writes.items():
+                self._writes.setdefault(key, deadline)
+            return False
+
+    async def flush(self):
+        """Write every queued scheduled_deadlines change now (shutdown)."""
+        if self._flush_task is not None:
+            await self._flush_task      # at most FLUSH_INTERVAL; keeps writes in order
+        await self._flush_writes()
+
+    def _push(self, key, deadline: float, persist: bool):
+        seq = next(self._seq)
+        self._live[key] = (deadline, seq, persist)
+        heapq.heappush(self._heap, (deadline, seq, key))
+        # Compact once stale nodes dominate, so re-scheduling can't grow the heap unbounded
+        if len(self._heap) > 2 * len(self._live) + 64:
+            self._heap = [(d, s, k) for k, (d, s, _) in self._live.items()]
+            heapq.heapify(self._heap)
+        self._arm()
+
+    def _arm(self):
+        """(Re)arm the single loop timer for the earliest live deadline."""
+        while self._heap and self._live.get(self._heap[0][2], (None, None))[1] != self._heap[0][1]:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return
+        earliest = self._heap[0][0]
+        if self._timer is not None and self._timer_at is not None and self._timer_at <= earliest:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        loop = asyncio.get_running_loop()
+        self._timer_at = earliest
+        self._timer = loop.call_at(loop.time() + max(0.0, earliest - time.time()), self._fire)
+
+    # -------------------------
+    # Firing
+    # -------------------------
+    def _fire(self):
+        self._timer = None
+        self._timer_at = None
+        now = time.time()
+        loop = asyncio.get_running_loop()
+        while self._heap and self._heap[0][0] <= now:
+            deadline, seq, key = heapq.heappop(self._heap)
+            entry = self._live.get(key)
+            if entry is None or entry[1] != seq:
+                continue    # cancelled or re-scheduled
+            del self._live[key]
+            task = loop.create_task(self._dispatch(key, entry[2]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        self._arm()
+
+    async def _dispatch(self, key, persistent: bool):
+        kind, guild_id, target_id = key
+        handler = self._handlers.get(kind)
+        try:
+            if handler is None:
+                logger.warning(f"No handler registered for deadline kind '{kind}'; dropping it.")
+            else:
+                self.fired += 1
+                await handler(guild_id, target_id)
+        except Exception as e:
+            logger.error(f"Deadline handler {kind} failed for {guild_id}/{target_id}: {e}")
+        finally:
+            if persistent and key not in self._live:
+                self._write(key, None)
+
+
+deadline_scheduler = DeadlineScheduler(db)
+
+# -----------------------------------------------------------------------------
+# End of File: DeadlineScheduler.py
+# -----------------------------------------------------------------------------
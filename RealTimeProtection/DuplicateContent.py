@@ -0,0 +1,141 @@
+# -----------------------------------------------------------------------------
+# File Name   : RealTimeProtection/DuplicateContent.py
+# Description : Cross-user duplicate-content index for raid detection. Each
+#               message is reduced to a fingerprint: a hash of its normalized
+#               text (exact copies) and an 8-value MinHash signature over
+#               character 4-grams (near copies: changed links, emojis, casing,
+#               punctuation). The signature is banded into 4 LSH keys.
+#
+#               Keys live in a ring of time buckets covering `window` seconds;
+#               each key remembers the authors who posted it. Expired buckets
+#               are dropped whole, every bucket holds a fixed number of keys
+#               and every key a fixed number of authors, so memory is bounded
+#               and a lookup touches a constant number of entries.
+#
+# Author      : X
+# Created On  : 17/10/2026
+# Last Updated: 17/10/2026
+# Import Style: from RealTimeProtection.DuplicateContent import DuplicateContentIndex
+# -----------------------------------------------------------------------------
+import re
+import time
+import zlib
+from collections import deque
+from hashlib import blake2b
+
+MAX_CONTENT_CHARS = 512          # raw text considered per message
+SIGNATURE_CHARS = 128            # normalized text that feeds the MinHash
+MIN_CONTENT_CHARS = 16           # shorter messages are too generic to fingerprint
+SIGNATURE_BINS = 8               # one-permutation MinHash: top 3 hash bits pick the bin
+BAND_SIZE = 2                    # 4 LSH bands of 2 bins each
+MIN_SIMILARITY = 7               # equal bins (of 8) needed to treat a band hit as a near copy; near-exact,
+                                 # so templated chatter that differs in a couple of numbers stays apart
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+# -------------------------
+# Fingerprinting
+# -------------------------
+def normalize(content: str) -> str:
+    """Casefold and reduce punctuation, symbols and whitespace runs to single spaces."""
+    return _NON_WORD.sub(" ", content[:MAX_CONTENT_CHARS].casefold()).strip()
+
+
+def fingerprint(content: str):
+    """(exact hash, MinHash signature) for the message, or None if it is too short."""
+    text = normalize(content)
+    if len(text) < MIN_CONTENT_CHARS:
+        return None
+    exact = int.from_bytes(blake2b(text.encode(), digest_size=8).digest(), "big")
+
+    data = text[:SIGNATURE_CHARS].encode()
+    hashes = sorted(set(map(zlib.crc32, [data[i:i + 4] for i in range(len(data) - 3)])))
+    signature = [0] * SIGNATURE_BINS
+    missing = SIGNATURE_BINS
+    for h in hashes:
+        slot = h >> 29
+        if not signature[slot]:
+            signature[slot] = h
+            missing -= 1
+            if not missing:
+                break
+    return exact, tuple(signature)
+
+
+def similarity(a: tuple, b: tuple) -> int:
+    """Number of non-empty bins the two signatures share."""
+    return sum(1 for x, y in zip(a, b) if x and x == y)
+
+
+def _keys(exact: int, signature: tuple):
+    yield ("x", exact)
+    for band in range(0, SIGNATURE_BINS, BAND_SIZE):
+        values = signature[band:band + BAND_SIZE]
+        if all(values):
+            yield (band, values)
+
+
+# -------------------------
+# Index
+# -------------------------
+class DuplicateContentIndex:
+    """Time-bucketed {(guild, fingerprint key): authors} index with fixed capacity."""
+
+    def __init__(self, window: float = 60, buckets: int = 6, max_keys: int = 120_000, author_cap: int = 64):
+        self.window = window
+        self.bucket_seconds = window / buckets
+        self.span = buckets
+        self.keys_per_bucket = max(1, max_keys // buckets)
+        self.author_cap = author_cap
+        self._buckets = deque()    # (bucket number, {key: [signature, [author ids]]}), oldest first
+        self.dropped = 0           # keys not indexed because their bucket was full
+
+    def __len__(self):
+        return sum(len(entries) for _, entries in self._buckets)
+
+    def _current(self, now: float) -> dict:
+        number = int(now // self.bucket_seconds)
+        oldest = number - self.span
+        while self._buckets and self._buckets[0][0] <= oldest:
+            self._buckets.popleft()
+        if not self._buckets or self._buckets[-1][0] != number:
+            self._buckets.append((number, {}))
+        return self._buckets[-1][1]
+
+    def observe(self, guild_id: int, author_id: int, content: str, now: float = None) -> set:
+        """Record the message and return the distinct authors who posted it (or a near copy)
+        within the window, this author included. Empty when the message is not fingerprinted."""
+        fp = fingerprint(content)
+        if fp is None:
+            return set()
+        now = time.monotonic() if now is None else now
+        current = self._current(now)
+        exact, signature = fp
+        authors = {author_id}
+
+        for key in _keys(exact, signature):
+            key = (guild_id, *key)
+            exact_key = key[1] == "x"
+            matched = None
+            for _, entries in self._buckets:
+                entry = entries.get(key)
+                if entry is not None and (exact_key or similarity(entry[0], signature) >= MIN_SIMILARITY):
+                    authors.update(entry[1])
+                    matched = entry
+
+            entry = current.get(key)
+            if entry is None:
+                if len(current) >= self.keys_per_bucket:
+                    self.dropped += 1
+                    continue
+                # A band key first seen as a near copy keeps the matched signature as representative
+                current[key] = [matched[0] if matched else signature, [author_id]]
+            elif (entry is matched or exact_key) and author_id not in entry[1] and len(entry[1]) < self.author_cap:
+                # Band collisions that are not near copies never join the entry
+                entry[1].append(author_id)
+        return authors
+
+# -----------------------------------------------------------------------------
+# End of File: DuplicateContent.py
+# -----------------------------------------------------------------------------
@@ -1,6 +1,10 @@
 from discord.ext import commands
 from .RaidDetection import RaidDetectionCog
 from .AntiSpam import AntiSpamCog
+from .ContentFilter import ContentFilterCog
+from .StateSnapshot import StateSnapshotCog
 async def setup(bot: commands.Bot):
     await bot.add_cog(RaidDetectionCog(bot))
-    await bot.add_cog(AntiSpamCog(bot))
\ No newline at end of file
+    await bot.add_cog(AntiSpamCog(bot))
+    await bot.add_cog(ContentFilterCog(bot))
+    await bot.add_cog(StateSnapshotCog(bot))
\ No newline at end of file
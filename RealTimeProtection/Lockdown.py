@@ -0,0 +1,147 @@
+# -----------------------------------------------------------------------------
+# File Name   : RealTimeProtection/Lockdown.py
+# Description : Raid lockdown / restore with exact snapshots. Before anything
+#               is changed, the @everyone role permissions and every text
+#               channel's @everyone overwrite are saved to raid_lockdowns, and
+#               restore puts back exactly those values (not overwrite=None).
+#
+#               Strategies (guild setting raid_lock_strategy):
+#                 channels - deny send/react with one overwrite per channel
+#                 role     - deny send/react on the @everyone role once; only
+#                            channels that explicitly ALLOW those for
+#                            @everyone get patched, so cost is constant in
+#                            channel count
+#
+# Author      : X
+# Created On  : 17/10/2026
+# Last Updated: 17/10/2026
+# Import Style: from RealTimeProtection.Lockdown import lock_guild, restore_guild
+# -----------------------------------------------------------------------------
+import asyncio
+import json
+from datetime import datetime
+
+import discord
+
+from Database.AsyncDatabase import db
+from Sharding.ShardContext import shard_context
+from ConsoleHelper.ConsoleMessage import ConsoleMessage
+from RealTimeProtection.ActionScheduler import action_scheduler, PRIORITY_LOCKDOWN, PRIORITY_RESTORE
+
+logger = ConsoleMessage()
+
+
+def _overwrite_pair(channel, role):
+    overwrite = channel.overwrites_for(role)
+    if overwrite.is_empty():
+        return None
+    allow, deny = overwrite.pair()
+    return [allow.value, deny.value]
+
+
+def _locked_overwrite(channel, role):
+    overwrite = channel.overwrites_for(role)
+    overwrite.send_messages = False
+    overwrite.add_reactions = False
+    return overwrite
+
+
+async def get_lockdown(guild_id: int):
+    """Return (strategy, role_permissions, {channel_id: pair}) or None if not locked."""
+    row = await db.fetch_one(
+        "SELECT strategy, role_permissions, channel_overwrites FROM raid_lockdowns WHERE guild_id=?",
+        (guild_id,)
+    )
+    if not row:
+        return None
+    strategy, role_permissions, overwrites = row
+    return strategy, role_permissions, {int(k): v for k, v in json.loads(overwrites or "{}").items()}
+
+
+async def get_locked_guild_ids():
+    rows = await db.fetch_all("SELECT guild_id FROM raid_lockdowns")
+    return {int(row[0]) for row in rows if shard_context.owns(row[0])}
+
+
+async def lock_guild(guild: discord.Guild, strategy: str = "channels"):
+    """Snapshot the current state (first lock only), then lock the guild."""
+    everyone = guild.default_role
+    if await get_lockdown(guild.id) is None:
+        snapshot = {str(channel.id): _overwrite_pair(channel, everyone) for channel in guild.text_channels}
+        await db.execute("""
+            INSERT OR IGNORE INTO raid_lockdowns (guild_id, strategy, role_permissions, channel_overwrites, locked_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, (guild.id, strategy, everyone.permissions.value, json.dumps(snapshot), datetime.utcnow().isoformat()))
+
+    route = f"channel:{guild.id}"
+    futures = []
+    if strategy == "role":
+        permissions = discord.Permissions(everyone.permissions.value)
+        permissions.update(send_messages=False, add_reactions=False)
+        futures.append(action_scheduler.submit(
+            f"role:{guild.id}",
+            lambda: everyone.edit(permissions=permissions, reason="Raid lockdown"),
+            PRIORITY_LOCKDOWN, key=("lock_role", guild.id)
+        ))
+        channels = [
+            c for c in guild.text_channels
+            if c.overwrites_for(everyone).send_messages or c.overwrites_for(everyone).add_reactions
+        ]
+    else:
+        channels = guild.text_channels
+
+    for channel in channels:
+        futures.append(action_scheduler.submit(
+            route,
+            lambda c=channel, o=_locked_overwrite(channel, everyone): c.set_permissions(everyone, overwrite=o),
+            PRIORITY_LOCKDOWN, key=("lock", channel.id)
+        ))
+    await asyncio.gather(*futures, return_exceptions=True)
+    logger.info(f"Guild {guild.id} locked down ({strategy}, {len(futures)} API calls).")
+
+
+async def restore_guild(guild: discord.Guild) -> bool:
+    """Put back the saved role permissions and channel overwrites; False if nothing was saved."""
+    lockdown = await get_lockdown(guild.id)
+    if lockdown is None:
+        return False
+    strategy, role_permissions, overwrites = lockdown
+    everyone = guild.default_role
+
+    futures = []
+    if role_permissions is not None and everyone.permissions.value != role_permissions:
+        futures.append(action_scheduler.submit(
+            f"role:{guild.id}",
+            lambda: everyone.edit(permissions=discord.Permissions(role_permissions), reason="Raid ended"),
+            PRIORITY_RESTORE, key=("unlock_role", guild.id)
+        ))
+
+    for channel in guild.text_channels:
+        if channel.id not in overwrites:
+            continue
+        saved = overwrites[channel.id]
+        if _overwrite_pair(channel, everyone) == saved:
+            continue    # untouched by the lockdown (or already restored)
+        overwrite = None
+        if saved is not None:
+            overwrite = discord.PermissionOverwrite.from_pair(
+                discord.Permissions(saved[0]), discord.Permissions(saved[1])
+            )
+        futures.append(action_scheduler.submit(
+            f"channel:{guild.id}",
+            lambda c=channel, o=overwrite: c.set_permissions(everyone, overwrite=o),
+            PRIORITY_RESTORE, key=("unlock", channel.id)
+        ))
+
+    results = await asyncio.gather(*futures, return_exceptions=True)
+    failed = sum(1 for r in results if isinstance(r, Exception))
+    if failed:
+        logger.error(f"Restore of guild {guild.id} left {failed} call(s) failed; keeping lockdown snapshot.")
+        return False
+    await db.execute("DELETE FROM raid_lockdowns WHERE guild_id=?", (guild.id,))
+    logger.info(f"Guild {guild.id} restored from {strategy} lockdown ({len(futures)} API calls).")
+    return True
+
+# -----------------------------------------------------------------------------
+# End of File: Lockdown.py
+# -----------------------------------------------------------------------------
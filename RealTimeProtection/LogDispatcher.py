@@ -0,0 +1,145 @@
+# -----------------------------------------------------------------------------
+# File Name   : RealTimeProtection/LogDispatcher.py
+# Description : Per-channel coalescing of log embeds. Events posted to a log
+#               channel are buffered for `window` seconds and then sent as ONE
+#               message with up to 10 embeds; anything past the first 9 is
+#               rolled up into a single "N more events" summary embed. Buffer
+#               memory per channel is fixed (9 embeds + per-title counters), so
+#               log traffic stays bounded no matter how many events fire.
+#               Resolved channel objects are cached per (guild, channel id).
+#
+# Author      : X
+# Created On  : 17/10/2026
+# Last Updated: 17/10/2026
+# Import Style: from RealTimeProtection.LogDispatcher import log_dispatcher
+# -----------------------------------------------------------------------------
+import asyncio
+from collections import Counter
+
+import discord
+from discord.utils import utcnow
+
+from ConsoleHelper.ConsoleMessage import ConsoleMessage
+from RealTimeProtection.ActionScheduler import action_scheduler, PRIORITY_LOG
+
+logger = ConsoleMessage()
+
+MAX_EMBEDS_PER_MESSAGE = 10   # Discord limit
+
+
+class _ChannelBuffer:
+    __slots__ = ("channel", "guild_id", "embeds", "overflow", "handle")
+
+    def __init__(self, channel, guild_id):
+        self.channel = channel
+        self.guild_id = guild_id
+        self.embeds = []
+        self.overflow = Counter()   # title -> count of events not sent individually
+        self.handle = None
+
+
+class LogDispatcher:
+    """Aggregate log embeds per channel over a short window."""
+
+    def __init__(self, window: float = 2.0):
+        self._window = window
+        self._channels = {}     # (guild_id, channel_id) -> channel object
+        self._buffers = {}      # channel_id -> _ChannelBuffer
+        self.sent_messages = 0
+        self.rolled_up = 0
+
+    # -------------------------
+    # Channel cache
+    # -------------------------
+    def _resolve(self, guild: discord.Guild, channel_id: int):
+        key = (guild.id, channel_id)
+        channel = self._channels.get(key)
+        if channel is None:
+            channel = guild.get_channel(channel_id)
+            if channel is not None:
+                self._channels[key] = channel
+        return channel
+
+    def invalidate(self, guild_id: int = None):
+        """Forget cached channel objects (all guilds when guild_id is None)."""
+        if guild_id is None:
+            self._channels.clear()
+        else:
+            for key in [k for k in self._channels if k[0] == guild_id]:
+                del self._channels[key]
+
+    # -------------------------
+    # Posting
+    # -------------------------
+    def post(self, guild: discord.Guild, channel_id: int, title: str, description: str, color=0xFF0000):
+        """Queue one log event for the guild's log channel; returns False if it can't be resolved."""
+        if not channel_id:
+            return False
+        channel = self._resolve(guild, channel_id)
+        if channel is None:
+            logger.warning(f"Log channel {channel_id} not found in guild {guild.id}")
+            return False
+
+        buffer = self._buffers.get(channel.id)
+        if buffer is None:
+            buffer = self._buffers[channel.id] = _ChannelBuffer(channel, guild.id)
+            buffer.handle = asyncio.get_running_loop().call_later(self._window, self._flush, channel.id)
+
+        if len(buffer.embeds) < MAX_EMBEDS_PER_MESSAGE - 1:
+            embed = discord.Embed(title=title, description=description, color=color, timestamp=utcnow())
+            embed.set_footer(text=f"Guild ID: {guild.id}")
+            buffer.embeds.append(embed)
+        else:
+            buffer.overflow[title] += 1
+        return True
+
+    def _rollup(self, buffer: _ChannelBuffer) -> discord.Embed:
+        total = sum(buffer.overflow.values())
+        lines = [f"• {title}: {count}" for title, count in buffer.overflow.most_common(10)]
+        if len(buffer.overflow) > 10:
+            lines.append(f"• …and {len(buffer.overflow) - 10} other event types")
+        embed = discord.Embed(
+            title=f"➕ {total} more events",
+            description="\n".join(lines),
+            color=0x808080,
+            timestamp=utcnow()
+        )
+        embed.set_footer(text=f"Guild ID: {buffer.guild_id}")
+        return embed
+
+    def _flush(self, channel_id: int):
+        buffer = self._buffers.pop(channel_id, None)
+        if buffer is None:
+            return None
+        if buffer.handle is not None:
+            buffer.handle.cancel()
+        embeds = list(buffer.embeds)
+        if buffer.overflow:
+            self.rolled_up += sum(buffer.overflow.values())
+            embeds.append(self._rollup(buffer))
+        if not embeds:
+            return None
+
+        channel = buffer.channel
+        self.sent_messages += 1
+        future = action_scheduler.submit(f"log:{channel.id}", lambda: channel.send(embeds=embeds), PRIORITY_LOG)
+        future.add_done_callback(lambda f, key=(buffer.guild_id, channel.id): self._on_sent(f, key))
+        return future
+
+    def _on_sent(self, future: asyncio.Future, key):
+        if not future.cancelled() and isinstance(future.exception(), discord.NotFound):
+            # Channel was deleted: drop the cached object so the next post re-resolves it
+            self._channels.pop(key, None)
+
+    async def flush_all(self):
+        """Send everything still buffered (used on shutdown)."""
+        futures = [f for f in (self._flush(cid) for cid in list(self._buffers)) if f is not None]
+        if futures:
+            await asyncio.gather(*futures, return_exceptions=True)
+
+
+log_dispatcher = LogDispatcher()
+
+# -----------------------------------------------------------------------------
+# End of File: LogDispatcher.py
+# -----------------------------------------------------------------------------
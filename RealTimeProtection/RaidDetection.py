@@ -1,30 +1,76 @@
 # raid_detection_cog.py
 import discord
 from discord.ext import commands, tasks
+import asyncio
+import time
 from datetime import datetime, timedelta
-from collections import defaultdict, deque
-from Database.MySqlConnect import SQLiteConnectionPool
+from collections import defaultdict
 from ConsoleHelper.ConsoleMessage import ConsoleMessage
+from RealTimeProtection.SlidingWindow import SlidingWindowCounter
+from RealTimeProtection.DuplicateContent import DuplicateContentIndex
+from RealTimeProtection.RaidScoring import JoinScorer, JoinSample, join_trace, FLOOD_MULTIPLIER, YOUNG_ACCOUNT_DAYS
+from RealTimeProtection.ActionScheduler import (
+    action_scheduler, PRIORITY_BAN, PRIORITY_MEMBER, PRIORITY_LOCKDOWN, PRIORITY_RESTORE
+)
+from RealTimeProtection.LogDispatcher import log_dispatcher
+from RealTimeProtection.Lockdown import lock_guild, restore_guild, get_locked_guild_ids
+from RealTimeProtection.DeadlineScheduler import deadline_scheduler
 from Database.DatabaseHelper.AuditLogger import log_security_event
-from Config.Config import get_config
+from Database.DatabaseHelper.SecurityStats import security_stats
+from Database.DatabaseHelper.Helper import get_whitelist_index
+from Config.Config import get_guild_config, has_security_role
+from Monitoring.Metrics import metrics, timed
 
 logger = ConsoleMessage()
-pool = SQLiteConnectionPool()
+
+RAID_TIMEOUT_SECONDS = 600      # raid action "timeout" length
+MUTE_SAFETY_SECONDS = 3600      # a raid mute is lifted at raid end, or after this at the latest
+DUPLICATE_WINDOW_SECONDS = 60   # raid_dup_threshold is counted over this window
+RECENT_JOIN_SECONDS = 3600      # members who joined within this count toward raid_dup_threshold
+
+
+def is_raid_suspect(member, now: datetime) -> bool:
+    """Recently joined, still in membership screening, or a young account."""
+    if getattr(member, "pending", False):
+        return True
+    joined = getattr(member, "joined_at", None)
+    if joined is not None and (now - joined).total_seconds() < RECENT_JOIN_SECONDS:
+        return True
+    created = getattr(member, "created_at", None)
+    return created is not None and (now - created).days < YOUNG_ACCOUNT_DAYS
 
 class RaidDetectionCog(commands.Cog):
     """Detect and handle raids with auto-mute/kick/ban/timeout, auto-unmute, and embed logs."""
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.join_times = defaultdict(lambda: deque(maxlen=1000))
+        self.join_times = defaultdict(lambda: SlidingWindowCounter(window=60, capacity=1000))
+        self.join_scores = defaultdict(JoinScorer)
         self.last_raid_alert = defaultdict(lambda: datetime.min)
-        self.muted_members = defaultdict(set)
-        self.timeout_members = defaultdict(dict)  # member_id -> timeout end
+        self.duplicates = DuplicateContentIndex(window=DUPLICATE_WINDOW_SECONDS)
+        self.last_duplicate = {}  # guild_id -> monotonic time of the last duplicate-content hit
+        self.locked_guilds = set()
         self.clean_old_joins.start()
         self.default_mute_role_name = "Muted"
         self.raid_cooldown = 2
         self.raid_end_timeout = 5
 
+    async def cog_load(self):
+        deadline_scheduler.register("raid_timeout_end", self.on_timeout_end)
+        deadline_scheduler.register("raid_mute_end", self.on_mute_end)
+        deadline_scheduler.register("raid_quiet", self.on_raid_quiet)
+
+        # Lockdowns survive restarts in raid_lockdowns; make sure they still get restored
+        self.locked_guilds |= await get_locked_guild_ids()
+        for guild_id in self.locked_guilds:
+            await deadline_scheduler.schedule(
+                "raid_quiet", guild_id, 0, time.time() + self.raid_end_timeout * 60, persist=False
+            )
+
+    async def cog_unload(self):
+        self.clean_old_joins.cancel()
+        await join_trace.flush()
+
     async def get_or_create_mute_role(self, guild: discord.Guild) -> discord.Role | None:
         mute_role = discord.utils.get(guild.roles, name=self.default_mute_role_name)
         if not mute_role:
@@ -34,124 +80,239 @@ class RaidDetectionCog(commands.Cog):
                     permissions=discord.Permissions(send_messages=False, add_reactions=False),
                     reason="Created for raid protection"
                 )
+                futures = []
                 for channel in guild.text_channels:
                     overwrite = channel.overwrites_for(mute_role)
                     overwrite.send_messages = False
                     overwrite.add_reactions = False
-                    await channel.set_permissions(mute_role, overwrite=overwrite)
+                    futures.append(action_scheduler.submit(
+                        f"channel:{guild.id}",
+                        lambda c=channel, o=overwrite: c.set_permissions(mute_role, overwrite=o),
+                        PRIORITY_LOCKDOWN,
+                        key=("mute_overwrite", channel.id)
+                    ))
+                await asyncio.gather(*futures, return_exceptions=True)
             except Exception as e:
                 logger.error(f"Failed to create 'Muted' role: {e}")
                 return None
         return mute_role
 
     async def log_embed(self, guild: discord.Guild, title: str, description: str, color=0xFF0000):
-        channel_id = get_config(guild.id, "raid_log_channel")
-        if channel_id:
-            channel = guild.get_channel(int(channel_id))
-            if channel:
-                embed = discord.Embed(title=title, description=description, color=color, timestamp=datetime.utcnow())
-                embed.set_footer(text=f"Guild ID: {guild.id}")
-                await channel.send(embed=embed)
+        log_dispatcher.post(guild, get_guild_config(guild.id).raid_log_channel, title, description, color)
 
     @commands.Cog.listener()
+    @timed("securitybot_listener_seconds", listener="on_member_join")
     async def on_member_join(self, member: discord.Member):
         guild_id = member.guild.id
-        raid_threshold = int(get_config(guild_id, "raid_threshold") or 5)
-        action = get_config(guild_id, "raid_action") or "timeout"
+        metrics.guild_event("member_join", guild_id)
         if member.bot:
             return
+        whitelist = get_whitelist_index(guild_id)
+        if whitelist is not None and whitelist.allows_member(member):
+            return
+        config = get_guild_config(guild_id)
+
+        recent_joins = self.join_times[guild_id].hit(time.monotonic())
+        sample = JoinSample.from_member(member, discord.utils.utcnow())
+        join_trace.record(guild_id, member.id, sample)
+        scorer = self.join_scores[guild_id]
+        scorer.add(sample)
+        score = scorer.score(recent_joins, config.raid_threshold)
+
+        # Slow raids score high on account signals; a flood far past the threshold is a raid regardless
+        if score * 100 >= config.raid_score_threshold or recent_joins > config.raid_threshold * FLOOD_MULTIPLIER:
+            await self.trigger_raid(
+                member.guild, [member], f"{recent_joins} joins in last 1 min, raid score {score:.0%}.",
+                "raid_detected", member.id, f"{recent_joins} joins, score {score:.2f}"
+            )
+
+    @commands.Cog.listener()
+    @timed("securitybot_listener_seconds", listener="on_message_duplicates")
+    async def on_message(self, message: discord.Message):
+        """Raid signal: the same (or nearly the same) text posted by many new/unverified authors."""
+        if message.author.bot or not message.guild or not message.content:
+            return
+        guild = message.guild
+        whitelist = get_whitelist_index(guild.id)
+        if whitelist is not None and whitelist.allows_message(message):
+            return
+        # Established members never count toward (or get caught by) a content raid
+        if not is_raid_suspect(message.author, discord.utils.utcnow()):
+            return
+        mono_now = time.monotonic()
+        authors = self.duplicates.observe(guild.id, message.author.id, message.content, mono_now)
+        if len(authors) < get_guild_config(guild.id).raid_dup_threshold:
+            return
+
+        self.last_duplicate[guild.id] = mono_now
+        action_scheduler.submit(
+            f"message:{message.channel.id}", message.delete, PRIORITY_MEMBER, key=("delete", message.id)
+        )
+        # Only the author of a copy that crossed the threshold is actioned, once per copy posted
+        members = [] if has_security_role(message.author, guild.id) else [message.author]
+        declared = await self.trigger_raid(
+            guild, members, f"{len(authors)} new accounts posted the same message in 1 min.",
+            "content_raid", message.author.id, f"{len(authors)} new authors posted duplicate content"
+        )
+        if not declared and members:
+            # Raid already declared: act on the rest of the wave as they post
+            await self.apply_raid_action(message.author, get_guild_config(guild.id).raid_action)
 
+    async def trigger_raid(self, guild: discord.Guild, members: list, summary: str,
+                           event_type: str, user_id: int, details: str) -> bool:
+        """Declare a raid (at most once per raid_cooldown): log it, act on `members`, lock the guild."""
         now = datetime.utcnow()
-        self.join_times[guild_id].append(now)
-        cutoff = now - timedelta(seconds=60)
-        recent_joins = [t for t in self.join_times[guild_id] if t > cutoff]
-        raid_detected = len(recent_joins) > raid_threshold
-
-        if raid_detected and now - self.last_raid_alert[guild_id] > timedelta(minutes=self.raid_cooldown):
-            self.last_raid_alert[guild_id] = now
-            logger.warning(f"Raid detected in guild {guild_id}")
-            await self.log_embed(member.guild, "🚨 Raid Detected!", f"{len(recent_joins)} joins in last 1 min.\nAction: {action.upper()}")
-            log_security_event(guild_id, "raid_detected", member.id, f"{len(recent_joins)} joins")
-
-            # Lock channels
-            for channel in member.guild.text_channels:
-                overwrite = channel.overwrites_for(member.guild.default_role)
-                overwrite.send_messages = False
-                overwrite.add_reactions = False
-                await channel.set_permissions(member.guild.default_role, overwrite=overwrite)
-
-            # Apply action dynamically
-            try:
-                if action == "mute":
-                    mute_role = await self.get_or_create_mute_role(member.guild)
-                    if mute_role:
-                        await member.add_roles(mute_role, reason="Raid protection")
-                        self.muted_members[guild_id].add(member.id)
-                        await self.log_embed(member.guild, "Member Muted", f"{member.mention} muted during raid.")
-                elif action == "timeout":
-                    # Timeout member for 10 minutes (adjustable)
-                    try:
-                        await member.edit(timeout=datetime.utcnow() + timedelta(minutes=10), reason="Raid protection")
-                        self.timeout_members[guild_id][member.id] = datetime.utcnow() + timedelta(minutes=10)
-                        await self.log_embed(member.guild, "Member Timed Out", f"{member.mention} timed out for 10 minutes.")
-                    except Exception as e:
-                        logger.error(f"Failed to timeout member {member.id}: {e}")
-                elif action == "kick":
-                    await member.kick(reason="Raid protection")
-                    await self.log_embed(member.guild, "Member Kicked", f"{member.mention} kicked during raid.")
-                elif action == "ban":
-                    await member.ban(reason="Raid protection")
-                    await self.log_embed(member.guild, "Member Banned", f"{member.mention} banned during raid.")
-            except Exception as e:
-                logger.error(f"Failed to apply raid action: {e}")
+        if now - self.last_raid_alert[guild.id] <= timedelta(minutes=self.raid_cooldown):
+            return False
+        self.last_raid_alert[guild.id] = now
+        action = get_guild_config(guild.id).raid_action
+        logger.warning(f"Raid detected in guild {guild.id}")
+        await self.log_embed(guild, "🚨 Raid Detected!", f"{summary}\nAction: {action.upper()}")
+        await log_security_event(guild.id, event_type, user_id, details)
 
-        self.join_times[guild_id] = deque([t for t in recent_joins], maxlen=1000)
+        # Lockdown and the member actions run concurrently; the scheduler keeps
+        # bans/kicks ahead of overwrite calls when the global cap is reached
+        await asyncio.gather(*(self.apply_raid_action(m, action) for m in members), self.lock_channels(guild))
+        return True
+
+    async def lock_channels(self, guild: discord.Guild):
+        """Lock the guild using its raid_lock_strategy (state is snapshotted for restore)."""
+        self.locked_guilds.add(guild.id)
+        await lock_guild(guild, get_guild_config(guild.id).raid_lock_strategy)
+        if deadline_scheduler.deadline("raid_quiet", guild.id) is None:
+            await deadline_scheduler.schedule(
+                "raid_quiet", guild.id, 0, time.time() + self.raid_end_timeout * 60, persist=False
+            )
+
+    async def apply_raid_action(self, member: discord.Member, action: str):
+        guild_id = member.guild.id
+        route = f"member:{guild_id}"
+        try:
+            if action == "mute":
+                mute_role = await self.get_or_create_mute_role(member.guild)
+                if mute_role:
+                    await action_scheduler.submit(
+                        route, lambda: member.add_roles(mute_role, reason="Raid protection"),
+                        PRIORITY_MEMBER, key=("mute", guild_id, member.id)
+                    )
+                    await deadline_scheduler.schedule(
+                        "raid_mute_end", guild_id, member.id, time.time() + MUTE_SAFETY_SECONDS
+                    )
+                    security_stats.record(guild_id, "raid_mute")
+                    await self.log_embed(member.guild, "Member Muted", f"{member.mention} muted during raid.")
+            elif action == "timeout":
+                # Timeout member for 10 minutes (adjustable)
+                try:
+                    until = discord.utils.utcnow() + timedelta(seconds=RAID_TIMEOUT_SECONDS)
+                    await action_scheduler.submit(
+                        route, lambda: member.edit(timed_out_until=until, reason="Raid protection"),
+                        PRIORITY_MEMBER, key=("timeout", guild_id, member.id)
+                    )
+                    await deadline_scheduler.schedule(
+                        "raid_timeout_end", guild_id, member.id, time.time() + RAID_TIMEOUT_SECONDS
+                    )
+                    security_stats.record(guild_id, "raid_timeout")
+                    await self.log_embed(member.guild, "Member Timed Out", f"{member.mention} timed out for 10 minutes.")
+                except Exception as e:
+                    logger.error(f"Failed to timeout member {member.id}: {e}")
+            elif action == "kick":
+                await action_scheduler.submit(
+                    route, lambda: member.kick(reason="Raid protection"),
+                    PRIORITY_BAN, key=("kick", guild_id, member.id)
+                )
+                security_stats.record(guild_id, "raid_kick")
+                await self.log_embed(member.guild, "Member Kicked", f"{member.mention} kicked during raid.")
+            elif action == "ban":
+                await action_scheduler.submit(
+                    route, lambda: member.ban(reason="Raid protection"),
+                    PRIORITY_BAN, key=("ban", guild_id, member.id)
+                )
+                security_stats.record(guild_id, "raid_ban")
+                await self.log_embed(member.guild, "Member Banned", f"{member.mention} banned during raid.")
+        except Exception as e:
+            logger.error(f"Failed to apply raid action: {e}")
 
     @tasks.loop(minutes=1)
     async def clean_old_joins(self):
-        now = datetime.utcnow()
+        mono_now = time.monotonic()
         for guild_id in list(self.join_times.keys()):
-            self.join_times[guild_id] = deque(
-                [t for t in self.join_times[guild_id] if t > now - timedelta(seconds=60)], maxlen=1000
+            window = self.join_times[guild_id]
+            window.expire(mono_now)
+            last_join = window.last()
+            if guild_id not in self.locked_guilds and (last_join is None or mono_now - last_join > 60):
+                # Idle guild: drop its window so the dict doesn't grow forever
+                del self.join_times[guild_id]
+        wall_now = time.time()
+        for guild_id in list(self.join_scores.keys()):
+            scorer = self.join_scores[guild_id]
+            scorer.expire(wall_now)
+            if not len(scorer) and guild_id not in self.locked_guilds:
+                del self.join_scores[guild_id]
+        await join_trace.flush()
+        for guild_id, last_hit in list(self.last_duplicate.items()):
+            if guild_id not in self.locked_guilds and mono_now - last_hit > DUPLICATE_WINDOW_SECONDS:
+                del self.last_duplicate[guild_id]
+
+    # --- Deadline handlers (fired by deadline_scheduler) ---
+    async def on_timeout_end(self, guild_id: int, member_id: int):
+        guild = self.bot.get_guild(guild_id)
+        member = guild.get_member(member_id) if guild else None
+        if member:
+            await action_scheduler.submit(
+                f"member:{guild_id}",
+                lambda: member.edit(timed_out_until=None, reason="Raid timeout ended"),
+                PRIORITY_RESTORE, key=("untimeout", guild_id, member_id)
+            )
+
+    async def on_mute_end(self, guild_id: int, member_id: int):
+        guild = self.bot.get_guild(guild_id)
+        member = guild.get_member(member_id) if guild else None
+        mute_role = discord.utils.get(guild.roles, name=self.default_mute_role_name) if guild else None
+        if member and mute_role and mute_role in member.roles:
+            await action_scheduler.submit(
+                f"member:{guild_id}",
+                lambda: member.remove_roles(mute_role, reason="Raid ended"),
+                PRIORITY_RESTORE, key=("unmute", guild_id, member_id)
             )
 
-            # Restore guild if raid ended
-            if self.join_times[guild_id] and now - max(self.join_times[guild_id]) > timedelta(minutes=self.raid_end_timeout):
-                await self.restore_guild_after_raid(guild_id)
-
-        # Check for timeout expiration
-        for guild_id, members in self.timeout_members.items():
-            expired = [mid for mid, end in members.items() if end <= now]
-            guild = self.bot.get_guild(guild_id)
-            for member_id in expired:
-                if guild:
-                    member = guild.get_member(member_id)
-                    if member:
-                        try:
-                            await member.edit(timeout=None, reason="Raid timeout ended")
-                        except:
-                            pass
-                members.pop(member_id, None)
+    async def on_raid_quiet(self, guild_id: int, _target_id: int):
+        """Restore once no member joined and no duplicate wave was seen for raid_end_timeout
+        minutes; otherwise push the deadline."""
+        if guild_id not in self.locked_guilds:
+            return
+        window = self.join_times.get(guild_id)
+        last_join = window.last() if window else None
+        last_activity = max(filter(None, (last_join, self.last_duplicate.get(guild_id))), default=None)
+        remaining = self.raid_end_timeout * 60 - (time.monotonic() - last_activity) if last_activity else 0
+        if remaining <= 0:
+            await self.restore_guild_after_raid(guild_id)
+            if guild_id not in self.locked_guilds:
+                return
+            remaining = 60  # restore failed or guild unavailable: retry later
+        await deadline_scheduler.schedule("raid_quiet", guild_id, 0, time.time() + remaining, persist=False)
 
     async def restore_guild_after_raid(self, guild_id: int):
         guild = self.bot.get_guild(guild_id)
         if not guild:
             return
 
-        # Restore default role permissions
-        for channel in guild.text_channels:
-            await channel.set_permissions(guild.default_role, overwrite=None)
+        # Restore role permissions / channel overwrites exactly as they were
+        restored = await restore_guild(guild)
+        futures = []
 
-        # Unmute members
-        mute_role = discord.utils.get(guild.roles, name=self.default_mute_role_name)
-        if mute_role:
-            for member_id in list(self.muted_members[guild_id]):
-                member = guild.get_member(member_id)
-                if member and mute_role in member.roles:
-                    await member.remove_roles(mute_role, reason="Raid ended")
-            self.muted_members[guild_id].clear()
-
-        self.join_times[guild_id].clear()
+        # Unmute members (their persisted mute deadlines are the source of truth)
+        for kind, mute_guild_id, member_id, _ in deadline_scheduler.pending():
+            if kind == "raid_mute_end" and mute_guild_id == guild_id:
+                futures.append(self.on_mute_end(guild_id, member_id))
+                futures.append(deadline_scheduler.cancel(kind, guild_id, member_id))
+        await asyncio.gather(*futures, return_exceptions=True)
+
+        if not restored and guild_id in await get_locked_guild_ids():
+            return  # on_raid_quiet retries later
+        self.locked_guilds.discard(guild_id)
+        self.join_times.pop(guild_id, None)
+        self.join_scores.pop(guild_id, None)
+        self.last_duplicate.pop(guild_id, None)
         await self.log_embed(guild, "Raid Ended", "Guild restored after raid.", color=0x00FF00)
         logger.info(f"Guild {guild_id} restored after raid.")
 
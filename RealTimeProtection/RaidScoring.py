@@ -0,0 +1,202 @@
+# -----------------------------------------------------------------------------
+# File Name   : RealTimeProtection/RaidScoring.py
+# Description : Multi-signal raid score for a guild's recent joins. Each guild
+#               keeps a fixed ring of its last SCORE_CAPACITY joins (within
+#               SCORE_WINDOW_SECONDS) with running sums, so a join updates
+#               every feature in O(1):
+#                 rate       joins in the last minute vs raid_threshold
+#                 young      share of accounts younger than YOUNG_ACCOUNT_DAYS
+#                 avatar     share of accounts with the default avatar
+#                 cluster    largest group of near-identical usernames
+#                 regularity 1 - coefficient of variation of join gaps
+#                            (scripted joins arrive at steady intervals)
+#               The score is a logistic combination of the features. Weights
+#               live in RaidScoreWeights and are tuned offline with
+#               Benchmark/RaidScoreEval.py on traces written by
+#               JoinTraceRecorder (SECURITY_BOT_JOIN_TRACE=path).
+#
+# Author      : X
+# Created On  : 17/10/2026
+# Last Updated: 17/10/2026
+# Import Style: from RealTimeProtection.RaidScoring import JoinScorer, JoinSample, join_trace
+# -----------------------------------------------------------------------------
+import asyncio
+import json
+import math
+import os
+import re
+from array import array
+from dataclasses import dataclass, asdict
+
+SCORE_WINDOW_SECONDS = 600       # joins older than this no longer shape the score
+SCORE_CAPACITY = 50              # most recent joins kept per guild
+MIN_SCORED_JOINS = 5             # fewer joins in the window score 0
+YOUNG_ACCOUNT_DAYS = 7
+FLOOD_MULTIPLIER = 10            # joins/min above raid_threshold * this is a raid regardless of score
+
+_NAME_NOISE = re.compile(r"[\d\W_]+")
+
+
+@dataclass(frozen=True)
+class RaidScoreWeights:
+    bias: float = -6.0
+    rate: float = 4.0
+    young: float = 3.0
+    avatar: float = 2.0
+    cluster: float = 3.0
+    regularity: float = 1.5
+
+
+DEFAULT_WEIGHTS = RaidScoreWeights()
+
+
+@dataclass(frozen=True)
+class JoinSample:
+    """What the scorer needs from a join (also one line of a recorded trace)."""
+    t: float                   # unix seconds
+    age_days: float            # account age at join time
+    default_avatar: bool
+    name: str
+
+    @classmethod
+    def from_member(cls, member, now) -> "JoinSample":
+        created = getattr(member, "created_at", None)
+        age = (now - created).total_seconds() / 86400 if created else float(YOUNG_ACCOUNT_DAYS)
+        return cls(now.timestamp(), age, getattr(member, "avatar", None) is None, member.name)
+
+
+def name_skeleton(name: str) -> str:
+    """Username with digits, punctuation and case removed ("Raider_0412" -> "raider")."""
+    return _NAME_NOISE.sub("", name.casefold())[:16]
+
+
+class JoinScorer:
+    """Fixed-size window of one guild's joins with incrementally maintained features."""
+
+    __slots__ = ("_t", "_gap", "_young", "_avatar", "_names", "_head", "_size",
+                 "young", "avatar", "gap_sum", "gap_sq", "name_counts")
+
+    def __init__(self):
+        self._t = array("d", bytes(8 * SCORE_CAPACITY))
+        self._gap = array("d", bytes(8 * SCORE_CAPACITY))
+        self._young = bytearray(SCORE_CAPACITY)
+        self._avatar = bytearray(SCORE_CAPACITY)
+        self._names = [""] * SCORE_CAPACITY
+        self._head = 0
+        self._size = 0
+        self.young = 0
+        self.avatar = 0
+        self.gap_sum = 0.0      # sums over every gap except the head's (it has no predecessor)
+        self.gap_sq = 0.0
+        self.name_counts = {}
+
+    def __len__(self):
+        return self._size
+
+    def last(self):
+        return self._t[(self._head + self._size - 1) % SCORE_CAPACITY] if self._size else None
+
+    def _evict(self):
+        i = self._head
+        self.young -= self._young[i]
+        self.avatar -= self._avatar[i]
+        name = self._names[i]
+        count = self.name_counts[name] - 1
+        if count:
+            self.name_counts[name] = count
+        else:
+            del self.name_counts[name]
+        self._head = (i + 1) % SCORE_CAPACITY
+        self._size -= 1
+        if self._size:
+            gap = self._gap[self._head]    # the new head loses its predecessor
+            self.gap_sum -= gap
+            self.gap_sq -= gap * gap
+        else:
+            self.gap_sum = self.gap_sq = 0.0   # drop accumulated float drift
+
+    def samples(self):
+        """(t, young, default_avatar, name skeleton) per join, oldest first."""
+        for k in range(self._size):
+            i = (self._head + k) % SCORE_CAPACITY
+            yield self._t[i], bool(self._young[i]), bool(self._avatar[i]), self._names[i]
+
+    def expire(self, now: float):
+        cutoff = now - SCORE_WINDOW_SECONDS
+        while self._size and self._t[self._head] < cutoff:
+            self._evict()
+
+    def add(self, sample: JoinSample):
+        self.expire(sample.t)
+        if self._size == SCORE_CAPACITY:
+            self._evict()
+        last = self.last()
+        i = (self._head + self._size) % SCORE_CAPACITY
+        gap = max(0.0, sample.t - last) if last is not None else 0.0
+        if last is not None:
+            self.gap_sum += gap
+            self.gap_sq += gap * gap
+        young = sample.age_days < YOUNG_ACCOUNT_DAYS
+        name = name_skeleton(sample.name)
+        self._t[i], self._gap[i] = sample.t, gap
+        self._young[i], self._avatar[i], self._names[i] = young, sample.default_avatar, name
+        self.young += young
+        self.avatar += sample.default_avatar
+        self.name_counts[name] = self.name_counts.get(name, 0) + 1
+        self._size += 1
+
+    def features(self, joins_per_minute: int, raid_threshold: int) -> dict:
+        n = self._size
+        gaps = n - 1
+        regularity = 0.0
+        if gaps >= 2 and self.gap_sum > 0:
+            mean = self.gap_sum / gaps
+            variance = max(0.0, self.gap_sq / gaps - mean * mean)
+            regularity = 1.0 - min(1.0, math.sqrt(variance) / mean)
+        return {
+            "rate": min(2.0, joins_per_minute / max(1, raid_threshold)) / 2,
+            "young": self.young / n if n else 0.0,
+            "avatar": self.avatar / n if n else 0.0,
+            "cluster": (max(self.name_counts.values()) - 1) / gaps if gaps > 0 else 0.0,
+            "regularity": regularity,
+        }
+
+    def score(self, joins_per_minute: int, raid_threshold: int, weights: RaidScoreWeights = DEFAULT_WEIGHTS) -> float:
+        """Raid probability-like score in [0, 1]."""
+        if self._size < MIN_SCORED_JOINS:
+            return 0.0
+        features = self.features(joins_per_minute, raid_threshold)
+        z = weights.bias + sum(getattr(weights, name) * value for name, value in features.items())
+        return 1.0 / (1.0 + math.exp(-z))
+
+
+# -------------------------
+# Trace recording
+# -------------------------
+class JoinTraceRecorder:
+    """Buffers join samples as JSON lines and appends them to `path` off the event loop."""
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self._buffer = []
+
+    def record(self, guild_id: int, user_id: int, sample: JoinSample):
+        if self.path:
+            self._buffer.append(json.dumps({"guild": guild_id, "user": user_id, **asdict(sample)}))
+
+    def _write(self, lines):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    async def flush(self):
+        if not self._buffer:
+            return
+        lines, self._buffer = self._buffer, []
+        await asyncio.to_thread(self._write, lines)
+
+
+join_trace = JoinTraceRecorder(os.environ.get("SECURITY_BOT_JOIN_TRACE") or None)
+
+# -----------------------------------------------------------------------------
+# End of File: RaidScoring.py
+# -----------------------------------------------------------------------------
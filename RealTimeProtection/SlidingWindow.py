@@ -0,0 +1,155 @@
+# -----------------------------------------------------------------------------
+# File Name   : RealTimeProtection/SlidingWindow.py
+# Description : Fixed-size sliding-window event counter shared by AntiSpam and
+#               RaidDetection. Timestamps (time.monotonic() seconds) live in a
+#               preallocated float ring buffer, so insert/count are amortized
+#               O(1) and memory per key never grows past `capacity` slots.
+#               WeightedWindowCounter sums weights (e.g. mentions per message)
+#               in fixed time buckets for constant memory per key.
+#
+# Author      : X
+# Created On  : 17/10/2026
+# Last Updated: 17/10/2026
+# Import Style: from RealTimeProtection.SlidingWindow import SlidingWindowCounter, WeightedWindowCounter
+# -----------------------------------------------------------------------------
+import time
+from array import array
+
+
+class SlidingWindowCounter:
+    """Count events in the last `window` seconds using a monotonic float ring buffer."""
+
+    __slots__ = ("window", "_buf", "_capacity", "_head", "_size", "_last")
+
+    def __init__(self, window: float, capacity: int = 100):
+        self.window = window
+        self._buf = array("d", bytes(8 * capacity))
+        self._capacity = capacity
+        self._head = 0      # index of the oldest timestamp
+        self._size = 0
+        self._last = None   # newest timestamp ever recorded (survives expiry)
+
+    def __len__(self):
+        return self._size
+
+    def expire(self, now: float = None):
+        """Drop timestamps older than the window; each slot is popped at most once."""
+        if now is None:
+            now = time.monotonic()
+        cutoff = now - self.window
+        buf, cap = self._buf, self._capacity
+        while self._size and buf[self._head] <= cutoff:
+            self._head = (self._head + 1) % cap
+            self._size -= 1
+
+    def hit(self, now: float = None) -> int:
+        """Record one event at `now` and return the count inside the window."""
+        if now is None:
+            now = time.monotonic()
+        self.expire(now)
+        cap = self._capacity
+        if self._size == cap:
+            # Full: overwrite the oldest slot (same behaviour as deque(maxlen=capacity))
+            self._buf[self._head] = now
+            self._head = (self._head + 1) % cap
+        else:
+            self._buf[(self._head + self._size) % cap] = now
+            self._size += 1
+        self._last = now
+        return self._size
+
+    def count(self, now: float = None) -> int:
+        self.expire(now)
+        return self._size
+
+    def last(self):
+        """Timestamp of the most recent hit, or None if never hit / cleared."""
+        return self._last
+
+    def timestamps(self) -> list:
+        """Timestamps currently held, oldest first (used by state snapshots)."""
+        cap = self._capacity
+        return [self._buf[(self._head + i) % cap] for i in range(self._size)]
+
+    def clear(self):
+        self._head = 0
+        self._size = 0
+        self._last = None
+
+    @property
+    def nbytes(self) -> int:
+        return self._buf.itemsize * self._capacity
+
+
+class WeightedWindowCounter:
+    """Sum of weights in the last `window` seconds, kept in `buckets` fixed time buckets.
+
+    Memory and work per add are constant regardless of the event rate; the total
+    is approximate to one bucket width (window / buckets).
+    """
+
+    __slots__ = ("window", "_width", "_sums", "_epoch", "_total")
+
+    def __init__(self, window: float, buckets: int = 10):
+        self.window = window
+        self._width = window / buckets
+        self._sums = array("d", bytes(8 * buckets))
+        self._epoch = None     # absolute index of the newest bucket
+        self._total = 0.0
+
+    def _advance(self, now: float):
+        epoch = int(now // self._width)
+        if self._epoch is None:
+            self._epoch = epoch
+            return
+        steps = epoch - self._epoch
+        if steps <= 0:
+            return
+        sums, n = self._sums, len(self._sums)
+        if steps >= n:
+            for i in range(n):
+                sums[i] = 0.0
+            self._total = 0.0
+        else:
+            for step in range(1, steps + 1):
+                slot = (self._epoch + step) % n
+                self._total -= sums[slot]
+                sums[slot] = 0.0
+        self._epoch = epoch
+
+    def add(self, weight: float, now: float = None) -> float:
+        """Add `weight` at `now` and return the windowed total."""
+        if now is None:
+            now = time.monotonic()
+        self._advance(now)
+        self._sums[self._epoch % len(self._sums)] += weight
+        self._total += weight
+        return self._total
+
+    def total(self, now: float = None) -> float:
+        self._advance(time.monotonic() if now is None else now)
+        return self._total
+
+    def buckets(self) -> list:
+        """(bucket start time, weight) of every non-empty bucket, oldest first."""
+        if self._epoch is None:
+            return []
+        n = len(self._sums)
+        return [
+            (epoch * self._width, self._sums[epoch % n])
+            for epoch in range(self._epoch - n + 1, self._epoch + 1)
+            if self._sums[epoch % n]
+        ]
+
+    def clear(self):
+        for i in range(len(self._sums)):
+            self._sums[i] = 0.0
+        self._total = 0.0
+
+    @property
+    def nbytes(self) -> int:
+        return self._sums.itemsize * len(self._sums)
+
+# -----------------------------------------------------------------------------
+# End of File: SlidingWindow.py
+# -----------------------------------------------------------------------------
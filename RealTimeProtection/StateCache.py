@@ -0,0 +1,97 @@
+# -----------------------------------------------------------------------------
+# File Name   : RealTimeProtection/StateCache.py
+# Description : Bounded, LRU-ordered map for per-(guild, user) detector state.
+#               Entries are created on demand, evicted least-recently-used
+#               once the global byte budget is exceeded, and swept when idle
+#               for longer than `idle_ttl` seconds. Exposes entry count and
+#               estimated bytes so memory can be reported.
+#
+# Author      : X
+# Created On  : 17/10/2026
+# Last Updated: 17/10/2026
+# Import Style: from RealTimeProtection.StateCache import BoundedStateCache
+# -----------------------------------------------------------------------------
+import sys
+import time
+from collections import OrderedDict
+
+# Rough per-entry overhead: OrderedDict node + key tuple + [last_seen, value] list
+_ENTRY_OVERHEAD = 200
+
+
+class BoundedStateCache:
+    """{key: state} with a memory budget, LRU eviction and idle sweeping."""
+
+    def __init__(self, factory, max_bytes: int, idle_ttl: float):
+        self._factory = factory
+        self._entries = OrderedDict()   # key -> [last_seen, state]; oldest first
+        self._max_bytes = max_bytes
+        self._idle_ttl = idle_ttl
+        self._entry_bytes = self._estimate(factory())
+        self.evictions = 0
+
+    @staticmethod
+    def _estimate(state) -> int:
+        return getattr(state, "nbytes", 0) + sys.getsizeof(state) + _ENTRY_OVERHEAD
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._entries) * self._entry_bytes
+
+    @property
+    def max_entries(self) -> int:
+        return max(1, self._max_bytes // self._entry_bytes)
+
+    def get(self, key, now: float = None):
+        """Return the state for key, creating it (and evicting LRU entries) if needed."""
+        if now is None:
+            now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry[0] = now
+            self._entries.move_to_end(key)
+            return entry[1]
+
+        limit = self.max_entries
+        while len(self._entries) >= limit:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        state = self._factory()
+        self._entries[key] = [now, state]
+        return state
+
+    def pop(self, key, default=None):
+        entry = self._entries.pop(key, None)
+        return entry[1] if entry is not None else default
+
+    def items(self):
+        return ((key, entry[1]) for key, entry in self._entries.items())
+
+    def entries(self):
+        """(key, last_seen, state), least recently used first."""
+        return ((key, entry[0], entry[1]) for key, entry in self._entries.items())
+
+    def sweep(self, now: float = None) -> int:
+        """Evict entries idle longer than idle_ttl; stops at the first active entry."""
+        if now is None:
+            now = time.monotonic()
+        cutoff = now - self._idle_ttl
+        removed = 0
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry[0] > cutoff:
+                break
+            del self._entries[key]
+            removed += 1
+        self.evictions += removed
+        return removed
+
+# -----------------------------------------------------------------------------
+# End of File: StateCache.py
+# -----------------------------------------------------------------------------
@@ -0,0 +1,309 @@
+# -----------------------------------------------------------------------------
+# File Name   : RealTimeProtection/StateSnapshot.py
+# Description : Warm-restart snapshots of the in-memory detector state that is
+#               not already persisted elsewhere: join windows, raid scores,
+#               raid alert cooldowns, duplicate-content activity and the
+#               anti-spam message/mention trackers. (Lockdowns, mutes and
+#               timeouts already survive restarts through raid_lockdowns and
+#               scheduled_deadlines.)
+#
+#               Format: a header followed by tagged sections, each a short
+#               list of typed arrays (array.array raw bytes), so capture and
+#               reload are a handful of bulk copies. Monotonic timestamps are
+#               stored as wall-clock seconds and mapped back on load. The file
+#               is written to a temp file, fsynced and renamed over the old
+#               one, so a crash never leaves a half-written snapshot.
+#
+# Author      : X
+# Created On  : 17/10/2026
+# Last Updated: 17/10/2026
+# Import Style: from RealTimeProtection.StateSnapshot import detector_snapshot, StateSnapshotCog
+# -----------------------------------------------------------------------------
+import asyncio
+import os
+import struct
+import time
+from array import array
+from datetime import datetime, timezone
+
+from discord.ext import commands, tasks
+
+from RealTimeProtection.RaidScoring import JoinSample, YOUNG_ACCOUNT_DAYS
+from RealTimeProtection.AntiSpam import TRACKER_IDLE_SECONDS
+from ConsoleHelper.ConsoleMessage import ConsoleMessage
+
+logger = ConsoleMessage()
+
+SNAPSHOT_FILE = os.environ.get("SECURITY_BOT_SNAPSHOT", "detector_state.bin")
+SNAPSHOT_INTERVAL = 30           # seconds between periodic snapshots
+MAX_SNAPSHOT_AGE = 3600          # older snapshots are ignored
+JOIN_WINDOW = 60                 # RaidDetectionCog.join_times window
+
+_MAGIC = b"SBSNAP"
+_VERSION = 1
+_HEADER = struct.Struct("<6sHd")          # magic, version, wall time
+_SECTION = struct.Struct("<4sI")          # tag, array count
+_ARRAY = struct.Struct("<cQ")             # typecode, item count
+
+
+# -------------------------
+# Encoding
+# -------------------------
+def _pack_section(out: list, tag: bytes, *arrays):
+    out.append(_SECTION.pack(tag, len(arrays)))
+    for arr in arrays:
+        out.append(_ARRAY.pack(arr.typecode.encode(), len(arr)))
+        out.append(arr.tobytes())
+
+
+def _unpack(data: bytes):
+    """(wall time, {tag: [arrays]}); raises ValueError on a foreign or truncated file."""
+    magic, version, wall = _HEADER.unpack_from(data, 0)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError(f"unsupported snapshot (magic={magic!r}, version={version})")
+    offset, sections = _HEADER.size, {}
+    while offset < len(data):
+        tag, count = _SECTION.unpack_from(data, offset)
+        offset += _SECTION.size
+        arrays = []
+        for _ in range(count):
+            typecode, items = _ARRAY.unpack_from(data, offset)
+            offset += _ARRAY.size
+            arr = array(typecode.decode())
+            size = items * arr.itemsize
+            if offset + size > len(data):
+                raise ValueError("truncated snapshot")
+            arr.frombytes(data[offset:offset + size])
+            offset += size
+            arrays.append(arr)
+        sections[tag] = arrays
+    return wall, sections
+
+
+def _names(names) -> array:
+    return array("B", "\n".join(names).encode("utf-8"))
+
+
+def _split_names(arr: array) -> list:
+    return arr.tobytes().decode("utf-8").split("\n") if len(arr) else []
+
+
+def _runs(counts):
+    """Yield (start, end) slices of a flat array from per-entry counts."""
+    start = 0
+    for count in counts:
+        yield start, start + count
+        start += count
+
+
+# -------------------------
+# Snapshot
+# -------------------------
+class DetectorSnapshot:
+    def __init__(self, path: str):
+        self.path = path
+        self.saves = 0
+        self.last_bytes = 0
+        self.loaded = False      # never overwrite the previous snapshot before it was read
+
+    def capture(self, raid, spam, now: float = None) -> bytes:
+        """Serialize the cogs' state (runs on the event loop; only bulk array work)."""
+        wall = time.time() if now is None else now
+        mono = time.monotonic()
+        offset = wall - mono                    # monotonic -> wall clock
+        out = [_HEADER.pack(_MAGIC, _VERSION, wall)]
+
+        if raid is not None:
+            guilds, counts, stamps = array("q"), array("I"), array("d")
+            for guild_id, window in raid.join_times.items():
+                window.expire(mono)
+                held = window.timestamps()
+                if held:
+                    guilds.append(guild_id)
+                    counts.append(len(held))
+                    stamps.extend(t + offset for t in held)
+            _pack_section(out, b"JOIN", guilds, counts, stamps)
+
+            guilds, counts, stamps, flags, names = array("q"), array("I"), array("d"), array("B"), []
+            for guild_id, scorer in raid.join_scores.items():
+                samples = list(scorer.samples())
+                if not samples:
+                    continue
+                guilds.append(guild_id)
+                counts.append(len(samples))
+                for t, young, avatar, name in samples:
+                    stamps.append(t)
+                    flags.append(young | avatar << 1)
+                    names.append(name)
+            _pack_section(out, b"SCOR", guilds, counts, stamps, flags, _names(names))
+
+            alerts = [(g, at) for g, at in raid.last_raid_alert.items() if at != datetime.min]
+            _pack_section(out, b"ALRT", array("q", (g for g, _ in alerts)),
+                          array("d", (at.replace(tzinfo=timezone.utc).timestamp() for _, at in alerts)))
+            _pack_section(out, b"DUPL", array("q", raid.last_duplicate.keys()),
+                          array("d", (t + offset for t in raid.last_duplicate.values())))
+
+        if spam is not None:
+            guilds, users, seen, counts, stamps = array("q"), array("q"), array("d"), array("I"), array("d")
+            for (guild_id, user_id), last_seen, window in spam.user_messages.entries():
+                window.expire(mono)             # idle trackers hold nothing worth saving
+                held = window.timestamps()
+                if held:
+                    guilds.append(guild_id)
+                    users.append(user_id)
+                    seen.append(last_seen + offset)
+                    counts.append(len(held))
+                    stamps.extend(t + offset for t in held)
+            _pack_section(out, b"MSGS", guilds, users, seen, counts, stamps)
+
+            guilds, users, seen, counts, stamps, weights = (
+                array("q"), array("q"), array("d"), array("I"), array("d"), array("d")
+            )
+            for (guild_id, user_id), last_seen, burst in spam.user_mentions.entries():
+                buckets = burst.buckets()
+                if buckets:
+                    guilds.append(guild_id)
+                    users.append(user_id)
+                    seen.append(last_seen + offset)
+                    counts.append(len(buckets))
+                    for t, weight in buckets:
+                        stamps.append(t + offset)
+                        weights.append(weight)
+            _pack_section(out, b"MENT", guilds, users, seen, counts, stamps, weights)
+        return b"".join(out)
+
+    def _write(self, data: bytes):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    async def save(self, bot) -> int:
+        if not self.loaded:
+            return 0
+        data = self.capture(bot.get_cog("RaidDetectionCog"), bot.get_cog("AntiSpamCog"))
+        await asyncio.to_thread(self._write, data)
+        self.saves += 1
+        self.last_bytes = len(data)
+        return len(data)
+
+    def apply(self, data: bytes, raid, spam, now: float = None) -> int:
+        """Merge a snapshot into the (freshly loaded) cogs; returns restored entries."""
+        wall_now = time.time() if now is None else now
+        wall, sections = _unpack(data)
+        if wall_now - wall > MAX_SNAPSHOT_AGE:
+            logger.info("Detector snapshot is %.0f s old; starting cold.", wall_now - wall)
+            return 0
+        offset = wall_now - time.monotonic()    # wall clock -> monotonic
+        restored = 0
+
+        if raid is not None:
+            if b"JOIN" in sections:
+                guilds, counts, stamps = sections[b"JOIN"]
+                for guild_id, (a, b) in zip(guilds, _runs(counts)):
+                    recent = [t - offset for t in stamps[a:b] if wall_now - t < JOIN_WINDOW]
+                    if recent:
+                        window = raid.join_times[guild_id]
+                        for t in recent:
+                            window.hit(t)
+                        restored += 1
+            if b"SCOR" in sections:
+                guilds, counts, stamps, flags, names = sections[b"SCOR"]
+                names = _split_names(names)
+                for guild_id, (a, b) in zip(guilds, _runs(counts)):
+                    scorer = raid.join_scores[guild_id]
+                    for i in range(a, b):
+                        young, avatar = flags[i] & 1, bool(flags[i] & 2)
+                        scorer.add(JoinSample(stamps[i], 0.0 if young else YOUNG_ACCOUNT_DAYS, avatar, names[i]))
+                    scorer.expire(wall_now)
+                    restored += 1
+            if b"ALRT" in sections:
+                for guild_id, at in zip(*sections[b"ALRT"]):
+                    at = datetime.fromtimestamp(at, timezone.utc).replace(tzinfo=None)
+                    raid.last_raid_alert[guild_id] = max(raid.last_raid_alert[guild_id], at)
+                    restored += 1
+            if b"DUPL" in sections:
+                for guild_id, at in zip(*sections[b"DUPL"]):
+                    raid.last_duplicate.setdefault(guild_id, at - offset)
+                    restored += 1
+
+        if spam is not None:
+            if b"MSGS" in sections:
+                guilds, users, seen, counts, stamps = sections[b"MSGS"]
+                for guild_id, user_id, last_seen, (a, b) in zip(guilds, users, seen, _runs(counts)):
+                    if wall_now - last_seen > TRACKER_IDLE_SECONDS:
+                        continue
+                    window = spam.user_messages.get((guild_id, user_id), last_seen - offset)
+                    for t in stamps[a:b]:
+                        window.hit(t - offset)
+                    restored += 1
+            if b"MENT" in sections:
+                guilds, users, seen, counts, stamps, weights = sections[b"MENT"]
+                for guild_id, user_id, last_seen, (a, b) in zip(guilds, users, seen, _runs(counts)):
+                    if wall_now - last_seen > TRACKER_IDLE_SECONDS:
+                        continue
+                    burst = spam.user_mentions.get((guild_id, user_id), last_seen - offset)
+                    for i in range(a, b):
+                        burst.add(weights[i], stamps[i] - offset)
+                    restored += 1
+        return restored
+
+    def _read(self):
+        try:
+            with open(self.path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    async def restore(self, bot) -> int:
+        """Load the snapshot once per process; apply() merges into live state and is not idempotent."""
+        if self.loaded:
+            return 0
+        try:
+            data = await asyncio.to_thread(self._read)
+            if not data:
+                return 0
+            restored = self.apply(data, bot.get_cog("RaidDetectionCog"), bot.get_cog("AntiSpamCog"))
+        except (OSError, ValueError, struct.error, UnicodeDecodeError) as e:
+            logger.warning(f"Ignoring unreadable detector snapshot {self.path}: {e}")
+            return 0
+        finally:
+            self.loaded = True
+        logger.info("Restored %s detector state entries from %s", restored, self.path)
+        return restored
+
+
+detector_snapshot = DetectorSnapshot(SNAPSHOT_FILE)
+
+
+# -------------------------
+# Scheduler Cog
+# -------------------------
+class StateSnapshotCog(commands.Cog):
+    """Writes a detector snapshot every SNAPSHOT_INTERVAL seconds."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        self.write_snapshot.start()
+
+    async def cog_unload(self):
+        self.write_snapshot.cancel()
+
+    @tasks.loop(seconds=SNAPSHOT_INTERVAL)
+    async def write_snapshot(self):
+        try:
+            await detector_snapshot.save(self.bot)
+        except Exception as e:
+            logger.error(f"Failed to write detector snapshot: {e}")
+
+    @write_snapshot.before_loop
+    async def before_snapshot(self):
+        await self.bot.wait_until_ready()
+
+# -----------------------------------------------------------------------------
+# End of File: StateSnapshot.py
+# -----------------------------------------------------------------------------
@@ -0,0 +1,281 @@
+# -----------------------------------------------------------------------------
+# File Name   : Sharding/Coordinator.py
+# Description : Cross-process coordination for sharded deployments.
+#
+#               CoordinatorServer runs inside the launcher process. It is the
+#               only process that writes SQLite: workers send write
+#               transactions as (fn, args) and the server runs fn(conn, *args)
+#               on its own writer connection, so all writes in the deployment
+#               are serialized through one connection, the same way
+#               AsyncDatabase serializes them within a single process. Workers
+#               still read the database directly (WAL allows concurrent
+#               readers across processes).
+#
+#               It also relays change notifications: a worker publishes
+#               (topic, payload) after changing guild settings, whitelists or
+#               blocklists, and every other worker's handlers for that topic
+#               run on their event loop to reload the changed guild.
+#
+#               CoordinatorClient is the worker side (module singleton
+#               `coordinator`). Until connect() is called it stays detached:
+#               writes run locally and publish() is a no-op, so unsharded runs
+#               behave exactly as before.
+#
+#               Transport is multiprocessing.connection over TCP with an
+#               authkey. fn is pickled by reference and must be a module-level
+#               function (or a static method).
+#
+# Author      : X
+# Created On  : 17/10/2026
+# Last Updated: 17/10/2026
+# Import Style: from Sharding.Coordinator import coordinator, CoordinatorServer
+# -----------------------------------------------------------------------------
+import os
+import pickle
+import threading
+from collections import defaultdict
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+from ConsoleHelper.ConsoleMessage import ConsoleMessage
+
+logger = ConsoleMessage()
+
+
+def parse_address(text: str):
+    host, port = text.rsplit(":", 1)
+    return host, int(port)
+
+
+def _portable(error: Exception) -> Exception:
+    """The error itself if it survives pickling, else a RuntimeError carrying its text."""
+    try:
+        pickle.loads(pickle.dumps(error))
+        return error
+    except Exception:
+        return RuntimeError(f"{type(error).__name__}: {error}")
+
+
+# -------------------------
+# Server (launcher process)
+# -------------------------
+class CoordinatorServer:
+    """Single SQLite writer and change-notification relay for all workers."""
+
+    def __init__(self, write, authkey: bytes, address=("127.0.0.1", 0)):
+        self._write = write                 # write(fn, args) -> result, one transaction
+        self._listener = Listener(address, authkey=authkey)
+        self.address = self._listener.address
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._subscribers = {}              # worker -> event Connection
+        self._closing = False
+        self.writes = defaultdict(int)      # worker -> committed transactions
+        self.failed = 0
+        self.published = 0
+
+    def start(self):
+        threading.Thread(target=self._accept, name="coordinator-accept", daemon=True).start()
+        logger.info("Coordinator listening on %s:%s", *self.address)
+
+    def _accept(self):
+        while not self._closing:
+            try:
+                conn = self._listener.accept()
+            except AuthenticationError as e:
+                logger.warning(f"Rejected coordinator connection: {e}")
+                continue
+            except OSError:
+                return                      # listener closed
+            threading.Thread(target=self._serve, args=(conn,), name="coordinator-conn", daemon=True).start()
+
+    def _serve(self, conn):
+        try:
+            role, worker = conn.recv()
+        except (EOFError, OSError):
+            conn.close()
+            return
+        if role == "events":
+            with self._lock:
+                self._subscribers[worker] = conn
+            self._relay(conn, worker)
+        else:
+            self._answer(conn, worker)
+        conn.close()
+
+    def _answer(self, conn, worker):
+        """Request/response loop of a worker's RPC connection."""
+        while True:
+            try:
+                request = conn.recv()
+            except (EOFError, OSError):
+                return
+            except Exception as e:          # fn could not be unpickled here
+                self.failed += 1
+                reply = ("error", _portable(e))
+            else:
+                try:
+                    reply = ("ok", self._handle(worker, request))
+                except Exception as e:
+                    self.failed += 1
+                    reply = ("error", _portable(e))
+            try:
+                conn.send(reply)
+            except (EOFError, OSError):
+                return
+            except Exception as e:          # unpicklable result
+                conn.send(("error", RuntimeError(f"unpicklable coordinator result: {e}")))
+
+    def _handle(self, worker, request):
+        op = request[0]
+        if op == "write":
+            _, fn, args = request
+            result = self._write(fn, args)
+            self.writes[worker] += 1
+            return result
+        if op == "status":
+            return self.status()
+        raise ValueError(f"unknown coordinator request {op!r}")
+
+    def _relay(self, conn, worker):
+        """Read a worker's publishes and fan them out to every other worker."""
+        while True:
+            try:
+                topic, payload = conn.recv()
+            except (EOFError, OSError):
+                break
+            except Exception as e:
+                logger.warning(f"Dropped malformed publish from worker {worker}: {e}")
+                continue
+            self.published += 1
+            with self._lock:
+                targets = [(w, c) for w, c in self._subscribers.items() if w != worker]
+            for target, target_conn in targets:
+                try:
+                    with self._send_lock:
+                        target_conn.send((topic, payload, worker))
+                except (OSError, ValueError):
+                    self._drop(target, target_conn)
+        self._drop(worker, conn)
+
+    def _drop(self, worker, conn):
+        with self._lock:
+            if self._subscribers.get(worker) is conn:
+                del self._subscribers[worker]
+
+    def status(self) -> dict:
+        with self._lock:
+            workers = sorted(self._subscribers)
+        return {"workers": workers, "writes": dict(self.writes), "failed": self.failed, "published": self.published}
+
+    def stop(self):
+        self._closing = True
+        self._listener.close()
+        with self._lock:
+            subscribers, self._subscribers = list(self._subscribers.values()), {}
+        for conn in subscribers:
+            conn.close()
+
+
+# -------------------------
+# Client (worker process)
+# -------------------------
+class CoordinatorClient:
+    """Worker-side handle: remote writes, publish, and topic handlers run on the event loop."""
+
+    def __init__(self):
+        self.worker = None
+        self._address = None
+        self._authkey = None
+        self._rpc = None
+        self._events = None
+        self._rpc_lock = threading.Lock()
+        self._event_lock = threading.Lock()
+        self._handlers = defaultdict(list)  # topic -> [callback(payload)]
+        self.received = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._rpc is not None
+
+    def connect(self, address, authkey: bytes, worker: int):
+        self._address, self._authkey, self.worker = address, authkey, worker
+        rpc = Client(address, authkey=authkey)
+        rpc.send(("rpc", worker))
+        self._rpc = rpc
+        logger.debug(f"Worker {worker} attached to coordinator {address[0]}:{address[1]}")
+
+    def connect_from_env(self, worker: int) -> bool:
+        """Attach when the launcher passed SECURITY_BOT_COORDINATOR(_KEY)."""
+        address = os.environ.get("SECURITY_BOT_COORDINATOR")
+        if not address:
+            return False
+        self.connect(parse_address(address), bytes.fromhex(os.environ["SECURITY_BOT_COORDINATOR_KEY"]), worker)
+        return True
+
+    def _call(self, *request):
+        with self._rpc_lock:
+            self._rpc.send(request)
+            status, value = self._rpc.recv()
+        if status == "error":
+            raise value
+        return value
+
+    def write(self, fn, args):
+        """Run fn(conn, *args) in one transaction in the launcher's writer (blocking)."""
+        return self._call("write", fn, args)
+
+    def status(self) -> dict:
+        return self._call("status")
+
+    # --- Change notifications ---
+    def subscribe(self, topic: str, callback):
+        """Run callback(payload) on the event loop when another worker publishes `topic`."""
+        self._handlers[topic].append(callback)
+
+    def publish(self, topic: str, payload):
+        """Tell the other workers about a change (no-op when not sharded)."""
+        if self._events is None:
+            return
+        try:
+            with self._event_lock:
+                self._events.send((topic, payload))
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to publish {topic} change: {e}")
+
+    def start_events(self, loop):
+        """Open the notification stream; handlers are scheduled on `loop`."""
+        if not self.connected or self._events is not None:
+            return
+        events = Client(self._address, authkey=self._authkey)
+        events.send(("events", self.worker))
+        self._events = events
+        threading.Thread(target=self._listen, args=(events, loop), name="coordinator-events", daemon=True).start()
+
+    def _listen(self, events, loop):
+        while True:
+            try:
+                topic, payload, origin = events.recv()
+            except (EOFError, OSError):
+                break
+            self.received += 1
+            for callback in self._handlers.get(topic, ()):
+                try:
+                    loop.call_soon_threadsafe(callback, payload)
+                except RuntimeError:        # loop closed: shutting down
+                    return
+        if self._events is events:
+            logger.warning("Coordinator event stream closed; cross-worker changes will not be seen.")
+
+    def close(self):
+        for conn in (self._events, self._rpc):
+            if conn is not None:
+                conn.close()
+        self._events = self._rpc = None
+
+
+coordinator = CoordinatorClient()
+
+# -----------------------------------------------------------------------------
+# End of File: Coordinator.py
+# -----------------------------------------------------------------------------
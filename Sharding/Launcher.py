@@ -0,0 +1,184 @@
+# -----------------------------------------------------------------------------
+# File Name   : Sharding/Launcher.py
+# Description : Multi-process launcher for large deployments. Splits the
+#               Discord shards into contiguous ranges and runs one bot process
+#               (main.py, an AutoShardedBot limited to its shard_ids) per range,
+#               so gateway traffic is spread over several interpreters. Each
+#               worker only receives events for its own guilds and only loads
+#               their mirrors and detector state (see Sharding/ShardContext.py).
+#
+#               The launcher itself runs the migrations once and then hosts
+#               the CoordinatorServer: the single SQLite writer for all workers
+#               and the relay for config / whitelist / blocklist changes.
+#               Workers that crash are restarted with a backoff; SIGINT or
+#               SIGTERM stops every worker (each flushes its state on close)
+#               before the coordinator's writer shuts down.
+#
+#               Per-worker environment: shard layout, coordinator address and
+#               authkey, metrics port (base + worker), detector snapshot and
+#               log file names.
+#
+# Author      : X
+# Created On  : 17/10/2026
+# Last Updated: 17/10/2026
+# Import Style: python -m Sharding.Launcher --shards 16 --workers 4
+# -----------------------------------------------------------------------------
+import argparse
+import os
+import secrets
+import signal
+import subprocess
+import sys
+import time
+
+from Database.MySqlConnect import pool, run_migrations
+from Database.AsyncDatabase import db
+from Monitoring.Metrics import METRICS_PORT
+from Sharding.Coordinator import CoordinatorServer
+from Sharding.ShardContext import shard_ranges
+from ConsoleHelper.ConsoleMessage import ConsoleMessage
+
+logger = ConsoleMessage()
+
+RESTART_BACKOFF = (1, 2, 5, 10, 30)      # seconds before the 1st, 2nd, ... restart of a worker
+STABLE_SECONDS = 300                     # a worker up this long gets its backoff reset
+STOP_TIMEOUT = 30                        # seconds workers get to flush before being killed
+POLL_INTERVAL = 0.5
+
+
+class WorkerProcess:
+    def __init__(self, index: int, shard_ids: list):
+        self.index = index
+        self.shard_ids = shard_ids
+        self.process = None
+        self.started_at = 0.0
+        self.restarts = 0
+        self.restart_at = None
+        self.finished = False
+
+
+class Launcher:
+    """Starts, supervises and stops the shard workers around one coordinator."""
+
+    def __init__(self, command: list, shard_count: int, workers: int, state_dir: str = ".",
+                 stagger: float = 5.0, restart: bool = True):
+        self.command = command
+        self.shard_count = shard_count
+        self.state_dir = state_dir
+        self.stagger = stagger          # IDENTIFY is rate limited per bot, not per process
+        self.restart = restart
+        self.workers = [WorkerProcess(i, ids) for i, ids in enumerate(shard_ranges(shard_count, workers))]
+        self.server = None
+        self._authkey = secrets.token_bytes(32)
+        self._stopping = False
+
+    def _env(self, worker: WorkerProcess) -> dict:
+        host, port = self.server.address
+        env = dict(os.environ)
+        env.update({
+            "SECURITY_BOT_SHARD_COUNT": str(self.shard_count),
+            "SECURITY_BOT_SHARD_IDS": ",".join(map(str, worker.shard_ids)),
+            "SECURITY_BOT_WORKER": str(worker.index),
+            "SECURITY_BOT_COORDINATOR": f"{host}:{port}",
+            "SECURITY_BOT_COORDINATOR_KEY": self._authkey.hex(),
+            "SECURITY_BOT_METRICS_PORT": str(METRICS_PORT + worker.index),
+            "SECURITY_BOT_SNAPSHOT": os.path.join(self.state_dir, f"detector_state.{worker.index}.bin"),
+            "SECURITY_BOT_LOG_FILE": os.path.join(self.state_dir, f"ConsoleMessage.{worker.index}.log"),
+        })
+        if os.environ.get("SECURITY_BOT_JOIN_TRACE"):
+            env["SECURITY_BOT_JOIN_TRACE"] = f"{os.environ['SECURITY_BOT_JOIN_TRACE']}.{worker.index}"
+        return env
+
+    def _spawn(self, worker: WorkerProcess):
+        worker.process = subprocess.Popen(self.command, env=self._env(worker))
+        worker.started_at = time.monotonic()
+        worker.restart_at = None
+        logger.info("Worker %s started (pid %s, shards %s)", worker.index, worker.process.pid, worker.shard_ids)
+
+    def start(self):
+        run_migrations(pool)
+        self.server = CoordinatorServer(db.write_local, self._authkey)
+        self.server.start()
+        for i, worker in enumerate(self.workers):
+            if i and self.stagger:
+                time.sleep(self.stagger)
+            self._spawn(worker)
+
+    def _check(self, worker: WorkerProcess, now: float):
+        if worker.finished:
+            return
+        if worker.restart_at is not None:
+            if now >= worker.restart_at:
+                self._spawn(worker)
+            return
+        code = worker.process.poll()
+        if code is None:
+            if worker.restarts and now - worker.started_at > STABLE_SECONDS:
+                worker.restarts = 0
+            return
+        if code == 0 or not self.restart:
+            worker.finished = True
+            logger.info("Worker %s exited with code %s", worker.index, code)
+            return
+        delay = RESTART_BACKOFF[min(worker.restarts, len(RESTART_BACKOFF) - 1)]
+        worker.restarts += 1
+        worker.restart_at = now + delay
+        logger.warning(f"Worker {worker.index} died with code {code}; restarting in {delay}s")
+
+    def supervise(self):
+        """Block until every worker exited cleanly or stop() was requested."""
+        while not self._stopping and not all(w.finished for w in self.workers):
+            now = time.monotonic()
+            for worker in self.workers:
+                self._check(worker, now)
+            time.sleep(POLL_INTERVAL)
+
+    def request_stop(self, *_):
+        self._stopping = True
+
+    def stop(self):
+        """SIGTERM the workers (they flush on close), then shut down the writer."""
+        running = [w.process for w in self.workers if w.process is not None and w.process.poll() is None]
+        for process in running:
+            process.send_signal(signal.SIGTERM)
+        deadline = time.monotonic() + STOP_TIMEOUT
+        for process in running:
+            try:
+                process.wait(max(0.1, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                logger.warning(f"Worker pid {process.pid} did not stop in {STOP_TIMEOUT}s; killing it")
+                process.kill()
+                process.wait()
+        if self.server is not None:
+            logger.info("Coordinator stats: %s", self.server.status())
+            self.server.stop()
+        db.shutdown()
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.request_stop)
+        signal.signal(signal.SIGINT, self.request_stop)
+        try:
+            self.start()
+            self.supervise()
+        finally:
+            self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the bot as several shard worker processes")
+    parser.add_argument("--shards", type=int, required=True, help="total shard count")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--stagger", type=float, default=5.0, help="seconds between worker starts")
+    parser.add_argument("--state-dir", default=".", help="directory for per-worker snapshots and logs")
+    args = parser.parse_args()
+
+    main_py = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+    Launcher([sys.executable, main_py], args.shards, args.workers, args.state_dir, args.stagger).run()
+
+
+if __name__ == "__main__":
+    main()
+
+# -----------------------------------------------------------------------------
+# End of File: Launcher.py
+# -----------------------------------------------------------------------------
@@ -0,0 +1,78 @@
+# -----------------------------------------------------------------------------
+# File Name   : Sharding/ShardContext.py
+# Description : Which Discord shards this process owns. The launcher
+#               (Sharding/Launcher.py) starts one worker process per shard
+#               range and describes it through the environment:
+#                 SECURITY_BOT_SHARD_COUNT  total shards across all workers
+#                 SECURITY_BOT_SHARD_IDS    this worker's shards ("0,1,2,3")
+#                 SECURITY_BOT_WORKER       worker index (0 = primary)
+#               Without them the process is unsharded and owns every guild.
+#               Startup loaders use owns() so a worker only mirrors and
+#               restores state for the guilds its shards receive events for.
+#
+# Author      : X
+# Created On  : 17/10/2026
+# Last Updated: 17/10/2026
+# Import Style: from Sharding.ShardContext import shard_context, shard_ranges
+# -----------------------------------------------------------------------------
+import os
+
+
+def shard_for(guild_id: int, shard_count: int) -> int:
+    """Discord's shard routing: (guild_id >> 22) % shard_count."""
+    return (int(guild_id) >> 22) % shard_count
+
+
+def shard_ranges(shard_count: int, workers: int) -> list:
+    """Split shards 0..shard_count-1 into `workers` contiguous, near-equal ranges."""
+    workers = max(1, min(workers, shard_count))
+    size, extra = divmod(shard_count, workers)
+    ranges, start = [], 0
+    for worker in range(workers):
+        end = start + size + (worker < extra)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+
+class ShardContext:
+    """Shard ownership of the current process."""
+
+    def __init__(self, shard_count: int = None, shard_ids=None, worker: int = 0):
+        self.shard_count = shard_count
+        self.shard_ids = tuple(shard_ids) if shard_ids is not None else None
+        self.worker = worker
+        self._owned = frozenset(self.shard_ids or ())
+
+    @classmethod
+    def from_env(cls) -> "ShardContext":
+        count = os.environ.get("SECURITY_BOT_SHARD_COUNT")
+        ids = os.environ.get("SECURITY_BOT_SHARD_IDS")
+        if not count or ids is None:
+            return cls()
+        return cls(int(count), [int(i) for i in ids.split(",") if i.strip()],
+                   int(os.environ.get("SECURITY_BOT_WORKER", "0")))
+
+    @property
+    def sharded(self) -> bool:
+        return self.shard_ids is not None
+
+    @property
+    def primary(self) -> bool:
+        """Runs the once-per-deployment jobs (retention)."""
+        return self.worker == 0
+
+    def owns(self, guild_id) -> bool:
+        return not self.sharded or shard_for(guild_id, self.shard_count) in self._owned
+
+    def __repr__(self):
+        if not self.sharded:
+            return "ShardContext(unsharded)"
+        return f"ShardContext(worker={self.worker}, shards={list(self.shard_ids)}/{self.shard_count})"
+
+
+shard_context = ShardContext.from_env()
+
+# -----------------------------------------------------------------------------
+# End of File: ShardContext.py
+# -----------------------------------------------------------------------------
@@ -1,25 +1,108 @@
 import os
+import signal
 import discord
 from discord.ext import commands
 import asyncio
 from ConsoleHelper.ConsoleMessage import ConsoleMessage
-from Database.MySqlConnect import SQLiteConnectionPool ,run_migrations
+from Database.MySqlConnect import pool, run_migrations
 from Database.DatabaseHelper.Helper import load_mirrors
+from Database.DatabaseHelper.BatchWriter import batch_writer
+from Database.DatabaseHelper.SpamStateStore import spam_state
+from Database.DatabaseHelper.SecurityStats import security_stats
+from Database.AsyncDatabase import db
+from RealTimeProtection.ActionScheduler import action_scheduler
+from RealTimeProtection.LogDispatcher import log_dispatcher
+from RealTimeProtection.DeadlineScheduler import deadline_scheduler
+from RealTimeProtection.StateSnapshot import detector_snapshot
+from Monitoring.Metrics import metrics
+from Monitoring.LoopWatchdog import loop_watchdog
+from Sharding.ShardContext import shard_context
+from Sharding.Coordinator import coordinator
 import Config.Load
 import RealTimeProtection.Load
+import Database.Load
 # ---------------------------------------- Variables ----------------------------------------
 logger =ConsoleMessage()
-pool = SQLiteConnectionPool()
 TOKEN = ""
-if not TOKEN:
-    asyncio.run(logger.error("Bot token not found! Shutting down..."))
-    raise ValueError("Bot token not found!")
 # -------------------------------------------------------------------------------------------
 
 # ---------------------------------- Bot Setup --------------------------------------
+class SecurityBot(commands.AutoShardedBot):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.first_ready_done = False   # on_ready fires again after every gateway reconnect
+        self._close_task = None
+
+    async def setup_hook(self):
+        """One-time startup; runs once after login, before any gateway event is dispatched."""
+        # Client.run only handles KeyboardInterrupt; SIGTERM (launcher, systemd) must flush too
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGTERM, self.request_close)
+        except NotImplementedError:
+            pass    # Windows: no loop signal handlers
+        # Sharded worker: reload guilds whose config another worker changed
+        coordinator.start_events(asyncio.get_running_loop())
+        try:
+            if not shard_context.sharded:
+                run_migrations(pool)    # the launcher migrates once before starting workers
+            load_mirrors()
+            logger.debug(" Database connection established and mirrors loaded.")
+        except Exception as e:
+            logger.error(f" Failed to connect to the database. Bot features may not work properly:{e}.")
+            return
+
+        try:
+            # Load commands
+            await setup_cogs(self)
+            logger.debug(" Cogs loaded successfully.")
+            # Warm restart: join windows, scores and spam trackers continue where they stopped.
+            # Applied before the listeners see their first event, so nothing is counted twice.
+            await detector_snapshot.restore(self)
+            await metrics.start_server()
+            loop_watchdog.start()
+        except Exception as e:
+            logger.error(f" Error during startup: `{e}`")
+
+    def request_close(self):
+        if self._close_task is None:
+            self._close_task = asyncio.get_running_loop().create_task(self.close())
+
+    async def start(self, *args, **kwargs):
+        try:
+            await super().start(*args, **kwargs)
+        finally:
+            # A SIGTERM close runs as its own task and ends the gateway loop half-way through;
+            # wait for its flushes here, or asyncio.run cancels them once the runner returns
+            if self._close_task is not None:
+                await self._close_task
+
+    async def close(self):
+        """Finish queued API calls, disconnect, then drain buffered DB writes."""
+        await log_dispatcher.flush_all()
+        await action_scheduler.drain()
+        await super().close()
+        await metrics.stop_server()
+        await loop_watchdog.stop()
+        await spam_state.flush()
+        await deadline_scheduler.flush()
+        await detector_snapshot.save(self)
+        await security_stats.flush()
+        await batch_writer.stop()
+        db.shutdown()
+        coordinator.close()
+        logger.shutdown()
+
 intents = discord.Intents.all()
 #intents.message_content = True
-bot = commands.Bot(command_prefix="/", intents=intents)
+# Unsharded: discord.py picks the shard count. Under Sharding/Launcher.py: only this worker's shards
+bot = SecurityBot(
+    command_prefix="/", intents=intents,
+    shard_count=shard_context.shard_count,
+    shard_ids=list(shard_context.shard_ids) if shard_context.sharded else None,
+)
+if shard_context.sharded and not coordinator.connect_from_env(shard_context.worker):
+    logger.warning(f"{shard_context} has no coordinator; writing to SQLite directly.")
 
 # ---------------------------------- Event Handlers ---------------------------------
 @bot.event
@@ -27,19 +110,13 @@ async def on_ready():
     logger.debug(f"Bot `{bot.user.name}` has connected to Discord!")
     await bot.change_presence(activity=discord.CustomActivity(name="Working On Security bot"))
     logger.debug("Bot presence Started`")
-    try:
-        with pool.get_connection() as conn:
-            run_migrations(pool)
-            load_mirrors()
-            logger.debug(" Database connection established and mirrors loaded.")
-    except Exception as e:
-        logger.error(f" Failed to connect to the database. Bot features may not work properly:{e}.")
+    if bot.first_ready_done:
         return
+    bot.first_ready_done = True
 
     try:
-        # Load commands
-        await setup_cogs()
-        logger.debug(" Cogs loaded successfully.")
+        # Guilds are cached now, so already-due expirations can find their members
+        await deadline_scheduler.load()
         synced = await bot.tree.sync()
         logger.debug(f" Synced {len(synced)} slash command(s).")
     except Exception as e:
@@ -52,19 +129,25 @@ async def on_message(message):
         return
     await bot.process_commands(message)
 # ---------------------------------- Command and Cog Setup --------------------------
-async def setup_cogs():
+async def setup_cogs(bot):
     """Load all necessary cogs and commands."""
     try:
         await Config.Load.setup(bot)
         await RealTimeProtection.Load.setup(bot)
+        await Database.Load.setup(bot)
     except Exception as e:
         logger.error(f" Error loading cogs: `{e}`")
 # -----------------------------------------------------------------------------------
 
 
 # ---------------------------------- Run the Bot ------------------------------------
-try:
-    bot.run(TOKEN)
-except Exception as e:
-    asyncio.run(logger.error(f" Bot failed to start: `{e}`"))
+# Importable without a token (Benchmark/ShutdownCheck.py drives SecurityBot offline)
+if __name__ == "__main__":
+    if not TOKEN:
+        logger.error("Bot token not found! Shutting down...")
+        raise ValueError("Bot token not found!")
+    try:
+        bot.run(TOKEN)
+    except Exception as e:
+        logger.error(f" Bot failed to start: `{e}`")
 # -----------------------------------------------------------------------------------
\ No newline at end of file